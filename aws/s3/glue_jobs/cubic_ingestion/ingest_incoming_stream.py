@@ -0,0 +1,6 @@
+
+
+from py_cubic_ingestion import ingest_incoming
+
+if __name__ == '__main__':
+    ingest_incoming.run_stream()
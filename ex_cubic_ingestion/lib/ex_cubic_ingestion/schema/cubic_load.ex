@@ -387,6 +387,7 @@ defmodule ExCubicIngestion.Schema.CubicLoad do
     %{
       id: load_rec.id,
       s3_key: load_rec.s3_key,
+      s3_size: load_rec.s3_size,
       source_table_name: source_table_name,
       destination_table_name: destination_table_name,
       source_s3_key: "s3://#{bucket_incoming}/#{prefix_incoming}#{load_rec.s3_key}",
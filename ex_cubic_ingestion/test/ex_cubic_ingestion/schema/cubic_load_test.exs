@@ -484,6 +484,7 @@ defmodule ExCubicIngestion.Schema.CubicLoadTest do
                destination_table_name: "raw_cubic_ods_qlik__sample",
                partition_columns: [%{name: "identifier", value: "LOAD1.csv.gz"}],
                s3_key: ods_load.s3_key,
+               s3_size: 197,
                source_s3_key: "s3://#{incoming_bucket}/#{incoming_prefix}#{ods_load.s3_key}",
                source_table_name: "cubic_ods_qlik__sample"
              } == CubicLoad.glue_job_payload({ods_load, ods_table})
@@ -516,6 +517,7 @@ defmodule ExCubicIngestion.Schema.CubicLoadTest do
                destination_table_name: "raw_cubic_ods_qlik__sample__ct",
                partition_columns: [%{name: "identifier", value: "20220102-204950123.csv.gz"}],
                s3_key: ods_load.s3_key,
+               s3_size: 197,
                source_s3_key: "s3://#{incoming_bucket}/#{incoming_prefix}#{ods_load.s3_key}",
                source_table_name: "cubic_ods_qlik__sample__ct"
              } == CubicLoad.glue_job_payload({ods_load, ods_table})
@@ -43,7 +43,7 @@ defmodule ExCubicIngestion.Workers.IngestTest do
       springboard_prefix =
         Application.fetch_env!(:ex_cubic_ingestion, :s3_bucket_prefix_springboard)
 
-      {_actual_env, actual_input} =
+      {actual_env, actual_input} =
         Ingest.construct_job_payload([
           dmap_load.id,
           ods_load.id
@@ -57,6 +57,7 @@ defmodule ExCubicIngestion.Workers.IngestTest do
               %{name: "identifier", value: "20220101.csv.gz"}
             ],
             s3_key: "cubic/dmap/sample/20220101.csv.gz",
+            s3_size: 197,
             destination_path: "s3a://#{incoming_bucket}/#{springboard_prefix}cubic/dmap/sample",
             destination_table_name: "#{dmap_table.name}",
             source_s3_key: "s3://#{incoming_bucket}/#{incoming_prefix}#{dmap_load.s3_key}",
@@ -72,6 +73,7 @@ defmodule ExCubicIngestion.Workers.IngestTest do
               %{name: "identifier", value: "LOAD1.csv.gz"}
             ],
             s3_key: "cubic/ods_qlik/SAMPLE/LOAD1.csv.gz",
+            s3_size: 197,
             destination_path:
               "s3a://#{springboard_bucket}/#{springboard_prefix}raw/cubic/ods_qlik/SAMPLE",
             destination_table_name: "raw_#{ods_table.name}",
@@ -83,6 +85,9 @@ defmodule ExCubicIngestion.Workers.IngestTest do
 
       assert expected_input[:loads] ==
                Enum.sort_by(actual_input[:loads], & &1[:id])
+
+      # partitions are registered by the Glue job
+      assert "true" == actual_env[:REGISTER_PARTITIONS]
     end
   end
 
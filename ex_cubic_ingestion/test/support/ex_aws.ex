@@ -350,106 +350,6 @@ defmodule MockExAws do
     end
   end
 
-  def request(
-        %{service: :athena, data: %{QueryExecutionIds: ["success_query_id", "success_query_id"]}},
-        _config_overrides
-      ) do
-    {:ok,
-     %{
-       "QueryExecutions" => [
-         %{"Status" => %{"State" => "SUCCEEDED"}},
-         %{"Status" => %{"State" => "SUCCEEDED"}}
-       ]
-     }}
-  end
-
-  def request(
-        %{service: :athena, data: %{QueryExecutionIds: ["success_query_id"]}},
-        _config_overrides
-      ) do
-    {:ok, %{"QueryExecutions" => [%{"Status" => %{"State" => "SUCCEEDED"}}]}}
-  end
-
-  def request(
-        %{
-          service: :athena,
-          data: %{QueryExecutionIds: ["success_query_id_1", "success_query_id_2"]}
-        },
-        _config_overrides
-      ) do
-    {:ok,
-     %{
-       "QueryExecutions" => [
-         %{"Status" => %{"State" => "SUCCEEDED"}},
-         %{"Status" => %{"State" => "SUCCEEDED"}}
-       ]
-     }}
-  end
-
-  def request(
-        %{service: :athena, data: %{QueryExecutionIds: ["cancel_query_id", "fail_query_id"]}},
-        _config_overrides
-      ) do
-    {:ok,
-     %{
-       "QueryExecutions" => [
-         %{"Status" => %{"State" => "CANCELLED"}},
-         %{"Status" => %{"State" => "FAILED"}}
-       ]
-     }}
-  end
-
-  def request(
-        %{
-          service: :athena,
-          data: %{QueryExecutionIds: ["success_query_id", "already_added_partition_query_id"]}
-        },
-        _config_overrides
-      ) do
-    {:ok,
-     %{
-       "QueryExecutions" => [
-         %{"Status" => %{"State" => "SUCCEEDED"}},
-         %{
-           "Status" => %{
-             "State" => "FAILED",
-             "AthenaError" => %{"ErrorMessage" => "Partition already exists."}
-           }
-         }
-       ]
-     }}
-  end
-
-  def request(
-        %{
-          service: :athena,
-          # note: multiple added partitions
-          data: %{QueryExecutionIds: ["success_query_id", "already_added_partitions_query_id"]}
-        },
-        _config_overrides
-      ) do
-    {:ok,
-     %{
-       "QueryExecutions" => [
-         %{"Status" => %{"State" => "SUCCEEDED"}},
-         %{
-           "Status" => %{
-             "State" => "FAILED",
-             "AthenaError" => %{"ErrorMessage" => "Partition entries already exist."}
-           }
-         }
-       ]
-     }}
-  end
-
-  def request(%{service: :athena} = op, _config_overrides) do
-    if Enum.member?(op.headers, {"x-amz-target", "AmazonAthena.StartQueryExecution"}) do
-      {:ok, %{"QueryExecutionId" => "success_query_id"}}
-    else
-      {:error, "athena failed"}
-    end
-  end
-
   @spec request!(ExAws.Operation.t(), keyword) :: term
   def request!(op, config_overrides \\ []) do
     case request(op, config_overrides) do
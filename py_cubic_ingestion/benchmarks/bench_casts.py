@@ -0,0 +1,136 @@
+"""
+Micro-benchmark of casting generated data shaped like 'sample_data/cubic' (see `data_generator`):
+each `custom_udfs` converter on its own, and `job_helpers.df_with_updated_schema` with each cast
+engine on local Spark, at several data sizes.
+
+Rows per second and memory are saved as JSON with --output. With --baseline, the results are
+compared with the ones of a previous run, and the benchmark fails if any is slower by more than
+--tolerance.
+
+Usage: poetry run python benchmarks/bench_casts.py [--sizes N,N] [--runs N] [--output FILE] [--baseline FILE]
+"""
+
+from py_cubic_ingestion import custom_udfs, job_helpers
+from pyspark.sql import SparkSession
+from pyspark.sql.types import StringType, StructField, StructType
+from typing import Callable, List, Tuple
+import argparse
+import data_generator
+import pathlib
+import results
+import sys
+import time
+import tracemalloc
+
+
+# names of the converters, functions returning a new converter, and the generated column they convert
+CONVERTERS: List[Tuple[str, Callable[[], Callable], str]] = [
+    ("as_long", lambda: custom_udfs.as_long, "SAMPLE_COUNT"),
+    ("as_double", lambda: custom_udfs.as_double, "SAMPLE_AMOUNT"),
+    ("as_date", lambda: custom_udfs.as_date, "SAMPLE_DATE"),
+    ("as_timestamp", lambda: custom_udfs.as_timestamp, "EDW_INSERTED_DTM"),
+    ("column_as_date", custom_udfs.column_as_date, "SAMPLE_DATE"),
+    ("column_as_timestamp", custom_udfs.column_as_timestamp, "EDW_INSERTED_DTM"),
+]
+
+
+def bench_converter(name: str, convert: Callable, values: List[str]) -> dict:
+    """
+    Rows per second of converting the values, and the peak of the memory allocated meanwhile.
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for value in values:
+        convert(value)
+    seconds = time.perf_counter() - start
+    _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "benchmark": f"custom_udfs.{name}",
+        "rows": len(values),
+        "rows_per_second": len(values) / seconds,
+        "peak_memory_bytes": peak_memory_bytes,
+    }
+
+
+def bench_df_with_updated_schema(spark: SparkSession, row_count: int, cast_engines: List[str], runs: int) -> List[dict]:
+    """
+    Rows per second of casting a cached DataFrame of generated change tracking rows with each engine,
+    the best of several runs, and the JVM heap in use afterwards.
+    """
+
+    schema_fields = data_generator.schema_fields(change_tracking=True)
+    schema = StructType([StructField(field["name"], StringType()) for field in schema_fields])
+    df = spark.createDataFrame(data_generator.generate_rows(row_count, change_tracking=True), schema).cache()
+    # note: materialize the generated rows before timing the casts
+    df.count()
+
+    # pylint: disable=protected-access
+    runtime = spark.sparkContext._jvm.java.lang.Runtime.getRuntime()  # type: ignore[union-attr]
+    bench_results = []
+    for cast_engine in cast_engines:
+        seconds = float("inf")
+        for _ in range(runs):
+            start = time.perf_counter()
+            job_helpers.df_with_updated_schema(df, schema_fields, cast_engine).write.format("noop").mode(
+                "overwrite"
+            ).save()
+            seconds = min(seconds, time.perf_counter() - start)
+
+        bench_results.append(
+            {
+                "benchmark": f"df_with_updated_schema.{cast_engine}",
+                "rows": row_count,
+                "rows_per_second": row_count / seconds,
+                "jvm_heap_bytes": runtime.totalMemory() - runtime.freeMemory(),
+            }
+        )
+
+    df.unpersist()
+
+    return bench_results
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--sizes", default="10000,100000,1000000", help="comma separated numbers of rows")
+    arg_parser.add_argument("--engines", default=",".join(job_helpers.cast_engines), help="cast engines to run")
+    arg_parser.add_argument("--runs", type=int, default=3, help="times each cast engine is run")
+    arg_parser.add_argument("--output", type=pathlib.Path, help="file to save the results to, as JSON")
+    arg_parser.add_argument("--baseline", type=pathlib.Path, help="results of a previous run to compare with")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="share by which rows/sec can drop")
+    args = arg_parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    spark = SparkSession.builder.master("local[*]").appName("bench_casts").getOrCreate()
+
+    bench_results = []
+    for size in sizes:
+        for name, new_converter, column_name in CONVERTERS:
+            # each column gets a new converter, as with the UDFs
+            convert = new_converter()
+            bench_results.append(bench_converter(name, convert, data_generator.column_values(size, column_name)))
+
+        bench_results += bench_df_with_updated_schema(spark, size, args.engines.split(","), args.runs)
+
+    for result in bench_results:
+        print(f"{result['benchmark']} ({result['rows']} rows): {result['rows_per_second']:.0f} rows/s")
+
+    if args.output:
+        results.save_results(args.output, bench_results)
+
+    if args.baseline:
+        regressions = results.compare_results(
+            bench_results, results.load_results(args.baseline), "rows_per_second", args.tolerance
+        )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
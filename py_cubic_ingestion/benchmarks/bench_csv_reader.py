@@ -0,0 +1,84 @@
+"""
+Benchmark of reading a CSV file like the ones in 'sample_data/cubic' with `job_helpers.df_from_csv`,
+and, when run where `awsglue` is available (such as the 'glue_3_0__local' container), as a
+DynamicFrame converted to a DataFrame.
+
+Usage: poetry run python benchmarks/bench_csv_reader.py [--rows N] [--runs N]
+"""
+
+from py_cubic_ingestion import job_helpers
+from pyspark.sql import DataFrame, SparkSession
+from typing import Callable
+import argparse
+import gzip
+import pathlib
+import tempfile
+import time
+
+COLUMNS = ["SAMPLE_ID", "SAMPLE_NAME", "EDW_INSERTED_DTM", "EDW_UPDATED_DTM"]
+
+
+def write_csv(path: pathlib.Path, rows: int) -> None:
+    """
+    Write a gzipped CSV file in the layout of 'sample_data/cubic/ods_qlik/EDW.SAMPLE', with some
+    quoted multi-line and multibyte fields.
+    """
+
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as csv_file:
+        csv_file.write(",".join(COLUMNS) + "\n")
+        for row in range(rows):
+            name = f'"Sample {row} 🔥\nwith a ""quote"""' if row % 10 == 0 else f'"Sample {row}"'
+            csv_file.write(f"{row},{name},2021-12-01 11:20:30.4444444,2021-12-01 11:20:31.4444444\n")
+
+
+def read_seconds(read: Callable[[], DataFrame], runs: int) -> float:
+    """
+    Best time, in seconds, to read and materialize all the rows.
+    """
+
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        read().write.format("noop").mode("overwrite").save()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rows", type=int, default=1000000, help="rows in the CSV file")
+    arg_parser.add_argument("--runs", type=int, default=3, help="times each reader is run")
+    args = arg_parser.parse_args()
+
+    spark = SparkSession.builder.master("local[*]").appName("bench_csv_reader").getOrCreate()
+    schema_fields = [{"name": column.lower(), "type": "string"} for column in COLUMNS]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / "LOAD1.csv.gz"
+        write_csv(path, args.rows)
+
+        seconds = read_seconds(lambda: job_helpers.df_from_csv(spark, str(path), schema_fields), args.runs)
+        print(f"df_from_csv ({args.rows} rows): {seconds:.3f}s")
+
+        try:
+            from awsglue.context import GlueContext  # pylint: disable=import-error,import-outside-toplevel
+        except ImportError:
+            print("DynamicFrame: skipped, awsglue isn't available")
+            return
+
+        glue_context = GlueContext(spark.sparkContext)
+        seconds = read_seconds(
+            lambda: glue_context.create_dynamic_frame_from_options(
+                "s3",
+                {"paths": [str(path)]},
+                format="csv",
+                format_options={"withHeader": True, "multiline": True},
+            ).toDF(),
+            args.runs,
+        )
+        print(f"DynamicFrame ({args.rows} rows): {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
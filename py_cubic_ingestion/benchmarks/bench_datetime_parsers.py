@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of parsing the date/time values in 'sample_data/cubic' with `isoparse`, and with
+a `DatetimeParser` per column.
+
+Usage: poetry run python benchmarks/bench_datetime_parsers.py [--repeat N]
+"""
+
+from datetime import datetime
+from dateutil import parser
+from py_cubic_ingestion import datetime_parsers
+from typing import Callable, Dict, List
+import argparse
+import csv
+import gzip
+import pathlib
+import time
+
+SAMPLE_DATA_PATH = pathlib.Path(__file__).resolve().parents[2] / "sample_data" / "cubic"
+# columns with date/time values in the sample data
+DATETIME_COLUMNS = ["header__timestamp", "EDW_INSERTED_DTM", "EDW_UPDATED_DTM"]
+
+
+def sample_columns() -> Dict[str, List[str]]:
+    """
+    Date/time values in the sample data, by column.
+    """
+
+    columns: Dict[str, List[str]] = {}
+    for path in sorted(SAMPLE_DATA_PATH.glob("**/*.csv.gz")):
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as sample_file:
+            for row in csv.DictReader(sample_file):
+                for column in DATETIME_COLUMNS:
+                    if row.get(column):
+                        columns.setdefault(column, []).append(row[column])
+
+    return columns
+
+
+def parse_seconds(parse: Callable[[str], datetime], values: List[str]) -> float:
+    """
+    Seconds taken to parse all the values.
+    """
+
+    start = time.perf_counter()
+    for value in values:
+        parse(value)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=20000, help="times each column's values are parsed")
+    args = arg_parser.parse_args()
+
+    for column, values in sample_columns().items():
+        # each column gets a new parser, as with the UDFs
+        column_values = values * args.repeat
+        isoparse_seconds = parse_seconds(parser.isoparse, column_values)
+        parser_seconds = parse_seconds(datetime_parsers.DatetimeParser().parse, column_values)
+
+        print(
+            f"{column} ({values[0]}, {len(column_values)} values): "
+            f"isoparse {isoparse_seconds:.3f}s, DatetimeParser {parser_seconds:.3f}s, "
+            f"{isoparse_seconds / parser_seconds:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Macro-benchmark of the read, cast and write pipeline of `ingest_incoming`, with
+`load_pipeline.LoadPipeline` on local Spark. Generated 'EDW.SAMPLE' snapshot and 'EDW.SAMPLE__ct'
+change tracking loads (see `data_generator`) are kept in a local directory that stands in for S3,
+and the Glue catalog is stubbed with botocore's `Stubber`.
+
+Reports the seconds and throughput of reading, of reading and casting, and of the whole pipeline,
+with its seconds by stage. Results are saved as JSON with --output. With --baseline, the benchmark
+fails if the pipeline's seconds regressed by more than --tolerance compared to a previous run.
+
+Usage: poetry run python benchmarks/bench_ingest.py [--snapshot-rows N] [--ct-loads N] [--ct-rows N]
+    [--env KEY=VALUE ...] [--output FILE] [--baseline FILE]
+"""
+
+from botocore.stub import Stubber
+from py_cubic_ingestion import data_layout, job_helpers, load_pipeline, load_runner
+from pyspark.sql import DataFrame, SparkSession
+from typing import Callable, Dict, List, Optional
+import argparse
+import boto3
+import data_generator
+import os
+import pathlib
+import results
+import shutil
+import sys
+import tempfile
+import time
+
+GLUE_TYPES = {"long": "bigint", "double": "double", "date": "date", "timestamp": "timestamp", "string": "string"}
+
+
+class LocalS3Client:
+    """
+    Stand-in for the S3 client calls of the pipeline, on the local file system. Objects are files
+    at 'file:///path' URIs, which split into an empty bucket and the path as the key.
+    """
+
+    def get_object(self, Bucket: str, Key: str) -> dict:  # pylint: disable=invalid-name
+        return {"Body": open(os.path.join("/", Bucket, Key), "rb")}  # pylint: disable=consider-using-with
+
+    def upload_file(self, path: str, bucket: str, key: str) -> None:
+        os.makedirs(os.path.dirname(os.path.join("/", bucket, key)), exist_ok=True)
+        shutil.copyfile(path, os.path.join("/", bucket, key))
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> None:  # pylint: disable=invalid-name
+        for deleted_object in Delete["Objects"]:
+            os.remove(os.path.join("/", Bucket, deleted_object["Key"]))
+
+
+def glue_table(table_name: str, change_tracking: bool) -> dict:
+    """
+    Glue table of the generated data, as returned by the Glue API.
+    """
+
+    return {
+        "Name": table_name,
+        "StorageDescriptor": {
+            "Columns": [
+                {"Name": field["name"], "Type": GLUE_TYPES[field["type"]]}
+                for field in data_generator.schema_fields(change_tracking)
+            ]
+        },
+    }
+
+
+def generate_loads(root: pathlib.Path, snapshot_rows: int, ct_loads: int, ct_rows: int) -> List[dict]:
+    """
+    Write the CSV files of the loads under the root, and return the loads, as in the job's INPUT.
+    """
+
+    loads = []
+    files = [("EDW.SAMPLE", "LOAD1.csv.gz", snapshot_rows, False)] + [
+        ("EDW.SAMPLE__ct", f"20211201-1122334{index:02d}.csv.gz", ct_rows, True) for index in range(ct_loads)
+    ]
+
+    for load_id, (table, file_name, row_count, change_tracking) in enumerate(files, start=1):
+        table_name = f"cubic_ods_qlik__{table.lower().replace('.', '_')}"
+        path = root / "incoming" / "cubic" / "ods_qlik" / table / file_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data_generator.write_csv(path, row_count, change_tracking, seed=load_id)
+
+        loads.append(
+            {
+                "id": load_id,
+                "s3_key": f"cubic/ods_qlik/{table}/{file_name}",
+                "s3_size": path.stat().st_size,
+                "row_count": row_count,
+                "source_table_name": table_name,
+                "source_s3_key": f"file://{path}",
+                "destination_table_name": table_name,
+                "destination_path": f"file://{root}/springboard/cubic/ods_qlik/{table}/",
+                "partition_columns": [
+                    {"name": "snapshot", "value": "20211201T000000Z"},
+                    {"name": "identifier", "value": file_name},
+                ],
+            }
+        )
+
+    return loads
+
+
+def stub_glue_client(loads: List[dict]) -> Stubber:
+    """
+    Stubbed Glue client, with the tables of the loads returned for both databases.
+    """
+
+    glue_client = boto3.client("glue", region_name="us-east-1")
+    stubber = Stubber(glue_client)
+    tables = [
+        glue_table(load["destination_table_name"], load["destination_table_name"].endswith("__ct"))
+        for load in {load["destination_table_name"]: load for load in loads}.values()
+    ]
+    for _ in ["springboard", "incoming"]:
+        stubber.add_response("get_tables", {"TableList": tables})
+
+    return stubber
+
+
+def timed_result(benchmark: str, rows: int, input_bytes: int, run: Callable[[], object]) -> dict:
+    """
+    Seconds and throughput of running the stage.
+    """
+
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    return {
+        "benchmark": benchmark,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds,
+        "input_bytes_per_second": input_bytes / seconds,
+    }
+
+
+def write_noop(dfs: List[DataFrame]) -> None:
+    for df in dfs:
+        df.write.format("noop").mode("overwrite").save()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--snapshot-rows", type=int, default=10000000, help="rows of the snapshot load")
+    arg_parser.add_argument("--ct-loads", type=int, default=4, help="number of change tracking loads")
+    arg_parser.add_argument("--ct-rows", type=int, default=1000000, help="rows of each change tracking load")
+    arg_parser.add_argument("--env", action="append", default=[], help="ENV of the pipeline, as KEY=VALUE")
+    arg_parser.add_argument("--directory", type=pathlib.Path, help="directory standing in for S3, kept if given")
+    arg_parser.add_argument("--output", type=pathlib.Path, help="file to save the results to, as JSON")
+    arg_parser.add_argument("--baseline", type=pathlib.Path, help="results of a previous run to compare with")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="share by which seconds can increase")
+    args = arg_parser.parse_args(argv)
+
+    env_dict: Dict[str, str] = {
+        "GLUE_DATABASE_INCOMING": "incoming",
+        "GLUE_DATABASE_SPRINGBOARD": "springboard",
+        "CSV_READER": "spark",
+    }
+    env_dict.update(setting.split("=", 1) for setting in args.env)
+
+    spark_builder = SparkSession.builder.master("local[*]").appName("bench_ingest")
+    if int(env_dict.get("LOAD_CONCURRENCY", 1)) > 1:
+        spark_builder = spark_builder.config("spark.scheduler.mode", "FAIR")
+        load_runner.pin_threads()
+    spark = spark_builder.getOrCreate()
+    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
+    data_layout.disable_planned_write(spark)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        root = (args.directory or pathlib.Path(temporary_directory)).resolve()
+        env_dict.setdefault("RECHUNK_URI", f"file://{root}/rechunked/")
+
+        loads = generate_loads(root, args.snapshot_rows, args.ct_loads, args.ct_rows)
+        rows = sum(load["row_count"] for load in loads)
+        input_bytes = sum(load["s3_size"] for load in loads)
+        print(f"Generated {len(loads)} loads, {rows} rows, {input_bytes} bytes of gzipped CSV")
+
+        with stub_glue_client(loads) as stubber:
+            pipeline = load_pipeline.LoadPipeline(
+                spark, env_dict, stubber.client, LocalS3Client()  # type: ignore[arg-type]
+            )
+            pipeline.prefetch(loads)
+
+            read_dfs = [pipeline.read_load(load, load["source_s3_key"]) for load in loads]
+            cast_dfs = [
+                job_helpers.df_with_updated_schema(
+                    df,
+                    pipeline.destination_schemas.schema_fields(load["destination_table_name"]),
+                    env_dict.get("CAST_ENGINE", "udf"),
+                )
+                for df, load in zip(read_dfs, loads)
+            ]
+
+            bench_results = [
+                timed_result("ingest.read", rows, input_bytes, lambda: write_noop(read_dfs)),
+                timed_result("ingest.read_cast", rows, input_bytes, lambda: write_noop(cast_dfs)),
+                timed_result("ingest.pipeline", rows, input_bytes, lambda: pipeline.run(loads)),
+            ]
+
+    for result in bench_results:
+        print(
+            f"{result['benchmark']}: {result['seconds']:.1f}s, {result['rows_per_second']:.0f} rows/s, "
+            f"{result['input_bytes_per_second'] / 1024 / 1024:.1f} MiB/s of gzipped CSV"
+        )
+    print(f"Pipeline seconds by stage: {pipeline.stage_seconds}")
+    bench_results[-1]["stage_seconds"] = pipeline.stage_seconds
+
+    if args.output:
+        results.save_results(args.output, bench_results)
+
+    if args.baseline:
+        regressions = results.compare_results(
+            bench_results, results.load_results(args.baseline), "seconds", args.tolerance, higher_is_better=False
+        )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
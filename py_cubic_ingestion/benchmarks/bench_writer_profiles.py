@@ -0,0 +1,156 @@
+"""
+Comparison of the Parquet writer profiles of `writer_profiles` on a sample load. The load is
+rewritten under each profile, and the size of the files, of their row groups, and of each column
+is reported, along with the bytes Athena would scan, and what it would cost, for a query of all the
+columns and for the queries of --query.
+
+The sample load is either Parquet files, such as a load's partition copied from Springboard, or a
+generated 'EDW.SAMPLE' snapshot (see `data_generator`), cast with the Springboard schema.
+
+Usage: poetry run python benchmarks/bench_writer_profiles.py [--parquet PATH] [--rows N]
+    [--profile NAME ...] [--profiles FILE] [--query COLUMN,COLUMN ...] [--output FILE]
+"""
+
+from py_cubic_ingestion import job_helpers, writer_profiles
+from pyspark.sql import DataFrame, SparkSession
+from typing import Dict, List
+import argparse
+import data_generator
+import math
+import pathlib
+import pyarrow.parquet
+import results
+import tempfile
+import time
+
+# Athena's price per TB scanned, with the bytes of each query rounded up to a MB, and at least 10 MB
+ATHENA_PRICE_PER_TB = 5.0
+ATHENA_MIN_BYTES = 10 * 1000**2
+
+
+def athena_cost(scanned_bytes: int) -> float:
+    """
+    Cost, in dollars, of an Athena query that scans the bytes.
+    """
+
+    billed_bytes = max(ATHENA_MIN_BYTES, math.ceil(scanned_bytes / 1000**2) * 1000**2)
+
+    return billed_bytes / 1000**4 * ATHENA_PRICE_PER_TB
+
+
+def column_bytes(directory: pathlib.Path) -> Dict[str, int]:
+    """
+    Compressed bytes of each column in the Parquet files of the directory, which a query of the
+    column scans, from the files' footers.
+    """
+
+    bytes_by_column: Dict[str, int] = {}
+    for path in directory.glob("**/*.parquet"):
+        metadata = pyarrow.parquet.read_metadata(path)
+        for row_group in range(metadata.num_row_groups):
+            for column in range(metadata.num_columns):
+                chunk = metadata.row_group(row_group).column(column)
+                bytes_by_column[chunk.path_in_schema] = (
+                    bytes_by_column.get(chunk.path_in_schema, 0) + chunk.total_compressed_size
+                )
+
+    return bytes_by_column
+
+
+def row_group_count(directory: pathlib.Path) -> int:
+    return sum(pyarrow.parquet.read_metadata(path).num_row_groups for path in directory.glob("**/*.parquet"))
+
+
+def generated_df(spark: SparkSession, directory: pathlib.Path, rows: int) -> DataFrame:
+    """
+    Generated snapshot load, cast with its Springboard schema.
+    """
+
+    path = directory / "LOAD1.csv.gz"
+    data_generator.write_csv(path, rows)
+
+    return job_helpers.df_with_updated_schema(
+        job_helpers.df_from_csv(
+            spark, str(path), [{**field, "type": "string"} for field in data_generator.schema_fields()]
+        ),
+        data_generator.schema_fields(),
+        "native",
+    )
+
+
+def bench_profile(
+    df: DataFrame, rows: int, name: str, profile: dict, directory: pathlib.Path, queries: List[List[str]]
+) -> dict:
+    """
+    Rewrite the load with the profile, and measure its files and the bytes scanned by the queries.
+    """
+
+    start = time.perf_counter()
+    job_helpers.write_partitioned_parquet(
+        df, [], str(directory), writer_options=writer_profiles.writer_options(profile)
+    )
+    seconds = time.perf_counter() - start
+
+    bytes_by_column = column_bytes(directory)
+    scanned_bytes = {"*": sum(bytes_by_column.values())}
+    for query in queries:
+        scanned_bytes[",".join(query)] = sum(bytes_by_column.get(column, 0) for column in query)
+
+    return {
+        "benchmark": f"writer_profile.{name}",
+        "rows": rows,
+        "profile": profile,
+        "write_seconds": seconds,
+        "bytes": sum(path.stat().st_size for path in directory.glob("**/*.parquet")),
+        "file_count": len(list(directory.glob("**/*.parquet"))),
+        "row_group_count": row_group_count(directory),
+        "column_bytes": bytes_by_column,
+        "scanned_bytes": scanned_bytes,
+        "athena_cost": {query: athena_cost(query_bytes) for query, query_bytes in scanned_bytes.items()},
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--parquet", help="path of the Parquet files of a sample load, instead of generated data")
+    arg_parser.add_argument("--rows", type=int, default=1000000, help="rows of the generated load")
+    arg_parser.add_argument("--profile", action="append", default=[], help="profile to compare, all if not given")
+    arg_parser.add_argument("--profiles", type=pathlib.Path, help="JSON file of more profiles, as WRITER_PROFILES")
+    arg_parser.add_argument("--query", action="append", default=[], help="columns scanned by a query, comma separated")
+    arg_parser.add_argument("--output", type=pathlib.Path, help="file to save the results to, as JSON")
+    args = arg_parser.parse_args()
+
+    profiles = writer_profiles.profiles_from_json(args.profiles.read_text(encoding="utf-8") if args.profiles else None)
+    queries = [query.split(",") for query in args.query]
+    spark = SparkSession.builder.master("local[*]").appName("bench_writer_profiles").getOrCreate()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = pathlib.Path(temporary_directory)
+        df = spark.read.parquet(args.parquet) if args.parquet else generated_df(spark, directory, args.rows)
+        # note: the load is read and cast once, so that only the writes are timed
+        df = df.localCheckpoint()
+        rows = df.count()
+
+        bench_results = [
+            bench_profile(df, rows, name, profiles[name], directory / name, queries)
+            for name in args.profile or profiles
+        ]
+
+    for result in bench_results:
+        print(
+            f"{result['benchmark']} ({result['rows']} rows): {result['bytes'] / 1024 / 1024:.1f} MiB in "
+            f"{result['file_count']} file(s) and {result['row_group_count']} row group(s), "
+            f"written in {result['write_seconds']:.1f}s"
+        )
+        for query, scanned_bytes in result["scanned_bytes"].items():
+            print(
+                f"  {query}: {scanned_bytes / 1024 / 1024:.1f} MiB scanned, "
+                f"${result['athena_cost'][query]:.6f} per query"
+            )
+
+    if args.output:
+        results.save_results(args.output, bench_results)
+
+
+if __name__ == "__main__":
+    main()
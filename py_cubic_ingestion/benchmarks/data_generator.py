@@ -0,0 +1,141 @@
+"""
+Generator of synthetic CSV data shaped like the files in 'sample_data/cubic': Qlik change tracking
+header columns, ids, amounts, dates and timestamps in the formats the files use, blank values, and
+quoted names with emoji, commas and line breaks.
+
+Used by the benchmarks, the rows are generated lazily so that large files can be written without
+holding them in memory.
+"""
+
+from typing import Callable, Iterator, List, NamedTuple
+import csv
+import datetime
+import gzip
+import io
+import pathlib
+import random
+
+
+class Column(NamedTuple):
+    """
+    Column of the generated data, with its Springboard type.
+    """
+
+    name: str
+    type: str
+    # generates a non-blank value
+    value: Callable[[random.Random, int], str]
+
+
+def timestamp_value(fraction_digits: int) -> Callable[[random.Random, int], str]:
+    def value(rng: random.Random, row: int) -> str:  # pylint: disable=unused-argument
+        timestamp = datetime.datetime(2021, 12, 1) + datetime.timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        fraction = "".join(rng.choice("0123456789") for _ in range(fraction_digits))
+
+        return f"{timestamp:%Y-%m-%d %H:%M:%S}.{fraction}" if fraction_digits else f"{timestamp:%Y-%m-%d %H:%M:%S}"
+
+    return value
+
+
+def date_value(rng: random.Random, row: int) -> str:  # pylint: disable=unused-argument
+    return f"{datetime.date(2021, 12, 1) + datetime.timedelta(days=rng.randrange(365)):%Y-%m-%d}"
+
+
+def name_value(rng: random.Random, row: int) -> str:
+    name = f"Sample {row} " + "🔥" * rng.randrange(4)
+    # some names need quoting, as in the sample data
+    if row % 50 == 0:
+        name += ", with a comma"
+    if row % 200 == 0:
+        name += '\nand a "line break"'
+
+    return name
+
+
+# columns in the layout of 'EDW.SAMPLE', with a column of each Springboard type
+COLUMNS = [
+    Column("SAMPLE_ID", "long", lambda _rng, row: str(row)),
+    Column("SAMPLE_NAME", "string", name_value),
+    Column("SAMPLE_COUNT", "long", lambda rng, _row: str(rng.randrange(-1000, 100000))),
+    Column("SAMPLE_AMOUNT", "double", lambda rng, _row: f"{rng.uniform(-100, 10000):.2f}"),
+    Column("SAMPLE_DATE", "date", date_value),
+    Column("EDW_INSERTED_DTM", "timestamp", timestamp_value(7)),
+    Column("EDW_UPDATED_DTM", "timestamp", timestamp_value(0)),
+]
+
+# header columns added by Qlik to the change tracking ('__ct') files
+CT_COLUMNS = [
+    Column("header__change_seq", "string", lambda _rng, row: f"{20210915031230320000000000000000000 + row}"),
+    Column("header__change_oper", "string", lambda rng, _row: rng.choice("IUUUD")),
+    Column("header__timestamp", "timestamp", timestamp_value(6)),
+]
+
+
+def columns(change_tracking: bool = False) -> List[Column]:
+    return CT_COLUMNS + COLUMNS if change_tracking else COLUMNS
+
+
+def schema_fields(change_tracking: bool = False) -> List[dict]:
+    """
+    Springboard schema fields of the generated data, as used by `job_helpers.df_with_updated_schema`.
+    """
+
+    return [{"name": column.name.lower(), "type": column.type} for column in columns(change_tracking)]
+
+
+def generate_rows(
+    row_count: int, change_tracking: bool = False, blank_rate: float = 0.05, seed: int = 0
+) -> Iterator[List[str]]:
+    """
+    Rows of generated values, as strings, with blanks ('') at the blank rate in all but the id column.
+
+    Parameters
+    ----------
+    row_count : int
+        Number of rows
+    change_tracking : bool
+        Whether to generate the header columns of change tracking files
+    blank_rate : float
+        Share of blank values
+    seed : int
+        Seed of the random values, the same seed generates the same rows
+
+    Returns
+    -------
+    Iterator
+        Rows of values, in the order of `columns`
+    """
+
+    rng = random.Random(seed)
+    generated_columns = columns(change_tracking)
+
+    for row in range(1, row_count + 1):
+        yield [
+            "" if column.name != "SAMPLE_ID" and rng.random() < blank_rate else column.value(rng, row)
+            for column in generated_columns
+        ]
+
+
+def column_values(row_count: int, column_name: str, blank_rate: float = 0.05, seed: int = 0) -> List[str]:
+    """
+    Generated values of a single column.
+    """
+
+    index = [column.name for column in columns(True)].index(column_name)
+
+    return [row[index] for row in generate_rows(row_count, True, blank_rate, seed)]
+
+
+def write_csv(
+    path: pathlib.Path, row_count: int, change_tracking: bool = False, blank_rate: float = 0.05, seed: int = 0
+) -> None:
+    """
+    Write the rows as a gzipped CSV file, with a header row, quoting values with commas, quotes or
+    line breaks, and escaping quotes by doubling them.
+    """
+
+    with gzip.open(path, "wb", compresslevel=1) as gzip_file:
+        with io.TextIOWrapper(gzip_file, encoding="utf-8", newline="") as csv_file:
+            writer = csv.writer(csv_file, quoting=csv.QUOTE_MINIMAL, doublequote=True, lineterminator="\n")
+            writer.writerow([column.name for column in columns(change_tracking)])
+            writer.writerows(generate_rows(row_count, change_tracking, blank_rate, seed))
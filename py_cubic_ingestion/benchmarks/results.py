@@ -0,0 +1,75 @@
+"""
+Saving benchmark results as JSON, and comparing them with the results of a previous run, so that
+regressions show up before deploying.
+"""
+
+from typing import Dict, List, Tuple
+import json
+import pathlib
+import platform
+import pyspark
+
+
+def save_results(path: pathlib.Path, results: List[dict]) -> None:
+    """
+    Save the results, each a dict with the 'benchmark' name, the number of 'rows' and its measures,
+    along with the Python and Spark versions they were measured with.
+    """
+
+    path.write_text(
+        json.dumps(
+            {"python": platform.python_version(), "spark": pyspark.__version__, "results": results},
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+
+def load_results(path: pathlib.Path) -> List[dict]:
+    results: List[dict] = json.loads(path.read_text(encoding="utf-8"))["results"]
+    return results
+
+
+def compare_results(
+    results: List[dict], baseline_results: List[dict], measure: str, tolerance: float, higher_is_better: bool = True
+) -> List[str]:
+    """
+    Regressions of a measure compared to the baseline, for the benchmarks and row counts in both.
+
+    Parameters
+    ----------
+    results : list
+        Results of this run
+    baseline_results : list
+        Results of a previous run, such as from `load_results`
+    measure : str
+        Key of the measure to compare, such as 'rows_per_second'
+    tolerance : float
+        Share by which the measure can be worse than the baseline before it's a regression
+    higher_is_better : bool
+        Whether a higher value of the measure is better
+
+    Returns
+    -------
+    list
+        Description of each regression, empty if there aren't any
+    """
+
+    baseline_by_key: Dict[Tuple[str, int], dict] = {
+        (result["benchmark"], result["rows"]): result for result in baseline_results
+    }
+    regressions = []
+
+    for result in results:
+        baseline = baseline_by_key.get((result["benchmark"], result["rows"]))
+        if baseline is None or not baseline.get(measure):
+            continue
+
+        change = (result[measure] - baseline[measure]) / baseline[measure]
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(
+                f"{result['benchmark']} ({result['rows']} rows): {measure} {result[measure]:.1f}, "
+                f"was {baseline[measure]:.1f} ({change:+.0%})"
+            )
+
+    return regressions
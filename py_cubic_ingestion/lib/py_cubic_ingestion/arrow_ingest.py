@@ -0,0 +1,399 @@
+"""
+Ingestion of loads with pyarrow, in a plain Python process without Spark, for the many small loads
+(such as the daily DMAP 'agg_*' files and small '__ct' files) that take less time to ingest than
+starting Spark does. It takes the same payload as `ingest_incoming` and writes the same Parquet
+files to Springboard:
+
+- the CSV file is streamed in blocks through pyarrow's CSV reader, with all the columns as strings
+  and the same quoting as `job_helpers.df_from_csv`, blank values becoming NULLs
+- each block is cast with the conversions of `custom_udfs`, as with the 'udf' cast engine
+- the blocks are written, a row group at a time, to a Parquet file in the load's partition, which
+  then replaces the partition's other files, as with dynamic partition overwrite. Timestamps are
+  written as INT96, as Spark 3.1 writes them
+
+Memory is bounded by the CSV block size and the row group size, and everything runs on one thread.
+Only the 'compression', 'dictionary', 'page_size_bytes' and 'row_group_size_bytes' (of the data in
+memory) settings of the writer profiles apply (see `writer_profiles`).
+
+Needs pyarrow, which Glue 3.0 provides, and which elsewhere comes with the package's 'arrow' extra.
+
+Usage: python -m py_cubic_ingestion.arrow_ingest --ENV '{...}' --INPUT '{"loads": [...]}'
+"""
+
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import custom_udfs, partition_registry, schema_cache, writer_profiles
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import argparse
+import boto3
+import json
+import logging
+import os
+import pyarrow
+import pyarrow.csv
+import pyarrow.fs
+import pyarrow.parquet
+import time
+import uuid
+
+
+log_prefix = "[py_cubic_ingestion] [arrow_ingest]"
+
+DEFAULT_BLOCK_SIZE_BYTES = 1024 * 1024
+# Parquet's default row group size, as used by Spark
+DEFAULT_ROW_GROUP_SIZE_BYTES = 128 * 1024 * 1024
+
+# Arrow types of the Spark types, and the conversions of their values, as in `job_helpers.udf_casts`
+arrow_types = {
+    "string": pyarrow.string(),
+    "long": pyarrow.int64(),
+    "double": pyarrow.float64(),
+    "date": pyarrow.date32(),
+    "timestamp": pyarrow.timestamp("us"),
+}
+conversions: Dict[str, Callable[[], Callable[[Optional[str]], Any]]] = {
+    "long": lambda: custom_udfs.as_long,
+    "double": lambda: custom_udfs.as_double,
+    "date": custom_udfs.column_as_date,
+    "timestamp": custom_udfs.column_as_timestamp,
+}
+
+# extensions of the Parquet files Spark writes, by compression codec
+codec_extensions = {
+    "uncompressed": "",
+    "snappy": ".snappy",
+    "gzip": ".gz",
+    "brotli": ".br",
+    "lz4": ".lz4",
+    "zstd": ".zstd",
+}
+
+
+def file_system_path(uri: str) -> Tuple[pyarrow.fs.FileSystem, str]:
+    """
+    File system and path of a URI, such as an 's3a://' destination path, or of a local path.
+    """
+
+    if uri.startswith("s3a://"):
+        uri = f"s3://{uri[len('s3a://'):]}"
+    if "://" not in uri:
+        uri = os.path.abspath(uri)
+
+    file_system, path = pyarrow.fs.FileSystem.from_uri(uri)
+
+    return file_system, str(path)
+
+
+def parquet_writer_options(profile: dict, column_names: List[str]) -> dict:
+    """
+    Options of pyarrow's Parquet writer for a writer profile, see the module's documentation.
+
+    Parameters
+    ----------
+    profile : dict
+        Writer profile, see `writer_profiles`
+    column_names : list
+        Names of all the columns written, as the columns the profile's 'columns' setting doesn't
+        override keep the profile's 'dictionary' setting
+
+    Returns
+    -------
+    dict
+        Keyword arguments of `pyarrow.parquet.ParquetWriter`
+    """
+
+    # fail on the same invalid profiles as Spark would
+    writer_profiles.writer_options(profile)
+
+    compression = profile.get("compression", "snappy")
+    if compression not in codec_extensions:
+        raise ValueError(f"Parquet compression '{compression}' isn't supported by the arrow engine")
+
+    options: dict = {
+        "compression": "none" if compression == "uncompressed" else compression,
+        "use_dictionary": profile.get("dictionary", True),
+    }
+    if "columns" in profile:
+        options["use_dictionary"] = [
+            column_name
+            for column_name in column_names
+            if profile["columns"].get(column_name, {}).get("dictionary", options["use_dictionary"])
+        ]
+    if "page_size_bytes" in profile:
+        options["data_page_size"] = profile["page_size_bytes"]
+
+    return options
+
+
+def arrow_schema(schema_fields: List[dict]) -> pyarrow.Schema:
+    """
+    Arrow schema of the Springboard schema fields.
+    """
+
+    unsupported_fields = [field for field in schema_fields if field["type"] not in arrow_types]
+    if unsupported_fields:
+        raise ValueError(f"Types not supported by the arrow engine: {unsupported_fields}")
+
+    return pyarrow.schema([pyarrow.field(field["name"], arrow_types[field["type"]]) for field in schema_fields])
+
+
+def read_batches(source_path: str, column_names: List[str], block_size_bytes: int) -> Iterator[pyarrow.RecordBatch]:
+    """
+    Stream the rows of a gzipped CSV file, in batches of about the block size, with all the columns
+    as strings, in the order of the Incoming table's columns, skipping the header row.
+
+    Parameters
+    ----------
+    source_path : str
+        Path of the CSV file, such as the load's `source_s3_key`
+    column_names : list
+        Names of the columns of the Incoming table
+    block_size_bytes : int
+        Bytes of CSV of each batch
+
+    Returns
+    -------
+    Iterator
+        Batches of rows
+    """
+
+    file_system, path = file_system_path(source_path)
+    with file_system.open_input_stream(path, compression="detect") as stream:
+        reader = pyarrow.csv.open_csv(
+            stream,
+            read_options=pyarrow.csv.ReadOptions(
+                use_threads=False, block_size=block_size_bytes, skip_rows=1, column_names=column_names
+            ),
+            # quoted fields can have line breaks, and quotes are escaped by doubling them
+            parse_options=pyarrow.csv.ParseOptions(quote_char='"', double_quote=True, newlines_in_values=True),
+            # note: Spark's CSV reader reads blank values, quoted or not, as NULLs
+            convert_options=pyarrow.csv.ConvertOptions(
+                column_types={column_name: pyarrow.string() for column_name in column_names},
+                null_values=[""],
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=True,
+            ),
+        )
+        yield from reader
+
+
+def cast_batch(
+    batch: pyarrow.RecordBatch,
+    schema: pyarrow.Schema,
+    column_conversions: Dict[str, Callable[[Optional[str]], Any]],
+) -> pyarrow.RecordBatch:
+    """
+    Cast a batch of strings to the Springboard schema, with each column's conversion.
+    """
+
+    arrays = []
+    for field in schema:
+        values = batch.column(batch.schema.get_field_index(field.name))
+        if field.name in column_conversions:
+            convert = column_conversions[field.name]
+            values = pyarrow.array([convert(value) for value in values.to_pylist()], field.type)
+        arrays.append(values)
+
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def partition_path(destination: str, partition_columns: list) -> str:
+    """
+    Path of the load's partition, as in `file_planner.partition_path`.
+    """
+
+    return "/".join([destination.rstrip("/")] + [f"{column['name']}={column['value']}" for column in partition_columns])
+
+
+def ingest_load(
+    load: dict,
+    source_fields: List[dict],
+    destination_fields: List[dict],
+    profile: dict,
+    block_size_bytes: int = DEFAULT_BLOCK_SIZE_BYTES,
+) -> dict:
+    """
+    Read the CSV file of a load, cast it with the Springboard schema, and write it as Parquet to the
+    load's partition, replacing the partition's files if it has any rows.
+
+    Parameters
+    ----------
+    load : dict
+        Load from the job's INPUT
+    source_fields : list
+        Schema fields of the Incoming table, only their names are used
+    destination_fields : list
+        Schema fields of the Springboard table
+    profile : dict
+        Writer profile of the load, see `writer_profiles`
+    block_size_bytes : int
+        Bytes of CSV read at a time
+
+    Returns
+    -------
+    dict
+        Metrics of the load: 'rows_written', 'output_bytes' and 'seconds'
+    """
+
+    start = time.perf_counter()
+    schema = arrow_schema(destination_fields)
+    # each column gets its own conversion, as with the UDFs
+    column_conversions = {
+        field["name"]: conversions[field["type"]]() for field in destination_fields if field["type"] in conversions
+    }
+    writer_options = parquet_writer_options(profile, schema.names)
+    row_group_size_bytes = profile.get("row_group_size_bytes", DEFAULT_ROW_GROUP_SIZE_BYTES)
+    file_system, directory = file_system_path(
+        partition_path(load["destination_path"], load.get("partition_columns", []))
+    )
+    file_name = f"part-00000-{uuid.uuid4()}.c000{codec_extensions[profile.get('compression', 'snappy')]}.parquet"
+    file_path = f"{directory}/{file_name}"
+
+    writer: Optional[pyarrow.parquet.ParquetWriter] = None
+    row_group: List[pyarrow.RecordBatch] = []
+    rows_written = 0
+    try:
+        for batch in read_batches(load["source_s3_key"], [field["name"] for field in source_fields], block_size_bytes):
+            row_group.append(cast_batch(batch, schema, column_conversions))
+            # note: a row group is written once it's big enough, or at the end of the file, and as
+            # with Spark, a load without any rows doesn't replace its partition
+            if sum(row_group_batch.nbytes for row_group_batch in row_group) < row_group_size_bytes:
+                continue
+
+            writer = writer or new_writer(file_system, file_path, schema, writer_options)
+            rows_written += write_row_group(writer, row_group)
+            row_group = []
+
+        if sum(row_group_batch.num_rows for row_group_batch in row_group) > 0:
+            writer = writer or new_writer(file_system, file_path, schema, writer_options)
+            rows_written += write_row_group(writer, row_group)
+    except Exception:
+        # the partition is left as it was
+        if writer is not None:
+            writer.close()
+            file_system.delete_file(file_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+
+    output_bytes = 0
+    if writer is not None:
+        # the new file replaces the others once it's written
+        for file_info in file_system.get_file_info(pyarrow.fs.FileSelector(directory)):
+            if file_info.base_name == file_name:
+                output_bytes = file_info.size
+            elif file_info.is_file:
+                file_system.delete_file(file_info.path)
+            else:
+                file_system.delete_dir(file_info.path)
+
+    return {
+        "load_id": load["id"],
+        "rows_written": rows_written,
+        "output_bytes": output_bytes,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def write_row_group(writer: pyarrow.parquet.ParquetWriter, batches: List[pyarrow.RecordBatch]) -> int:
+    """
+    Write the batches as a row group, and return its number of rows.
+    """
+
+    table = pyarrow.Table.from_batches(batches)
+    num_rows = int(table.num_rows)
+    writer.write_table(table, row_group_size=max(1, num_rows))
+
+    return num_rows
+
+
+def new_writer(
+    file_system: pyarrow.fs.FileSystem, path: str, schema: pyarrow.Schema, writer_options: dict
+) -> pyarrow.parquet.ParquetWriter:
+    """
+    Parquet writer of a file that Spark reads like its own files.
+    """
+
+    file_system.create_dir(os.path.dirname(path), recursive=True)
+
+    return pyarrow.parquet.ParquetWriter(
+        path, schema, filesystem=file_system, flavor="spark", use_deprecated_int96_timestamps=True, **writer_options
+    )
+
+
+def run_loads(loads: List[dict], env_dict: dict, glue_client: GlueClient) -> List[dict]:
+    """
+    Ingest the loads of a job's INPUT, one at a time.
+
+    Parameters
+    ----------
+    loads : list
+        Loads from the job's INPUT
+    env_dict : dict
+        The job's ENV, with the Glue databases, and optionally WRITER_PROFILES and WRITER_PROFILE,
+        ARROW_BLOCK_SIZE_BYTES, and REGISTER_PARTITIONS to register the loads' partitions in the
+        Glue catalog (see `partition_registry`)
+    glue_client : GlueClient
+        Boto3 client for Glue
+
+    Returns
+    -------
+    list
+        Metrics of each load, see `ingest_load`
+    """
+
+    destination_schemas = schema_cache.GlueSchemaCache(glue_client, env_dict["GLUE_DATABASE_SPRINGBOARD"])
+    source_schemas = schema_cache.GlueSchemaCache(glue_client, env_dict["GLUE_DATABASE_INCOMING"])
+    destination_schemas.prefetch(load["destination_table_name"] for load in loads)
+    source_schemas.prefetch(load["source_table_name"] for load in loads)
+
+    profiles = writer_profiles.profiles_from_json(env_dict.get("WRITER_PROFILES"))
+    default_profile_name = env_dict.get("WRITER_PROFILE", writer_profiles.DEFAULT_PROFILE_NAME)
+    block_size_bytes = int(env_dict.get("ARROW_BLOCK_SIZE_BYTES", DEFAULT_BLOCK_SIZE_BYTES))
+
+    load_metrics = []
+    for load in loads:
+        profile_name = writer_profiles.profile_name(load, default_profile_name)
+        if profile_name not in profiles:
+            raise ValueError(f"Unknown writer profile '{profile_name}' of load {load['id']}")
+
+        metrics = ingest_load(
+            load,
+            source_schemas.schema_fields(load["source_table_name"]),
+            destination_schemas.schema_fields(load["destination_table_name"]),
+            profiles[profile_name],
+            block_size_bytes,
+        )
+        logging.info("%s %s", log_prefix, json.dumps(metrics))
+        load_metrics.append(metrics)
+
+    if str(env_dict.get("REGISTER_PARTITIONS", "false")).lower() == "true":
+        partition_results = partition_registry.register_loads(glue_client, destination_schemas, loads)
+        if any(result["status"] == "failed" for result in partition_results.values()):
+            raise partition_registry.PartitionRegistrationError(partition_results)
+
+    return load_metrics
+
+
+def run(argv: Optional[List[str]] = None) -> None:
+    """
+    Reads CSV files from Incoming bucket, and writes them as Parquet files in the Springboard
+    bucket, with the job's ENV and INPUT as arguments, like `ingest_incoming`.
+    """
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--ENV", required=True, help="environment variables, as JSON")
+    arg_parser.add_argument("--INPUT", required=True, help="job data with the 'loads', as JSON")
+    # note: other arguments, such as the ones Glue adds for a Python shell job, are ignored
+    args, _ = arg_parser.parse_known_args(argv)
+
+    # one thread, as the loads are small
+    pyarrow.set_cpu_count(1)
+    pyarrow.set_io_thread_count(1)
+
+    run_loads(json.loads(args.INPUT).get("loads", []), json.loads(args.ENV), boto3.client("glue"))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run()
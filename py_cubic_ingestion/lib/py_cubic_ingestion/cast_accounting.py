@@ -0,0 +1,145 @@
+"""
+Opt-in accounting of the casts of a load group, in the same pass as the cast and the write. Values
+that can't be cast are counted by column, along with a few samples of them, in a Spark accumulator,
+and cast to NULL instead of failing the whole job run. Once written, the number of rows is checked
+against the 'recordCount' of the loads' '.dfm' files, as provided by Qlik.
+
+A load group with more failed values than allowed, or with a different number of rows than its
+'.dfm' files, is rejected: its partitions are removed from Springboard and a `LoadRejectedError` is
+raised, so that its loads fail like for any other error.
+
+Note: Spark can run a task more than once, such as when an executor is lost, and the failures of
+each run are added to the accumulator, so the counts are an upper bound.
+"""
+
+from py_cubic_ingestion import spark_files
+from pyspark.accumulators import Accumulator, AccumulatorParam
+from pyspark.sql.session import SparkSession
+from typing import Callable, Dict, List, Optional, TypeVar
+import functools
+
+
+T = TypeVar("T")
+
+DEFAULT_SAMPLE_SIZE = 5
+
+
+# note: pyspark's classes are only generic in its stubs, so their type parameters are in quotes
+class FailuresAccumulatorParam(AccumulatorParam):
+    """
+    Spark accumulator of cast failures, by column name, as the number of values that couldn't be
+    cast and up to `sample_size` of those values.
+    """
+
+    def __init__(self, sample_size: int = DEFAULT_SAMPLE_SIZE) -> None:
+        self.sample_size = sample_size
+
+    def zero(self, value: Dict[str, dict]) -> Dict[str, dict]:
+        return {}
+
+    def addInPlace(self, value1: Dict[str, dict], value2: Dict[str, dict]) -> Dict[str, dict]:
+        for column_name, failures in value2.items():
+            column_failures = value1.get(column_name, {"count": 0, "samples": []})
+            value1[column_name] = {
+                "count": column_failures["count"] + failures["count"],
+                "samples": (column_failures["samples"] + failures["samples"])[: self.sample_size],
+            }
+
+        return value1
+
+
+class LoadRejectedError(Exception):
+    """
+    Raised when the casts of a load group don't account for its rows.
+    """
+
+    def __init__(self, load_ids: List[int], reasons: List[str]) -> None:
+        self.load_ids = load_ids
+        self.reasons = reasons
+        super().__init__(f"Load(s) {', '.join(str(load_id) for load_id in load_ids)} rejected: {'; '.join(reasons)}")
+
+
+def accounted(
+    column_name: str,
+    convert: Callable[[Optional[str]], Optional[T]],
+    accumulator: "Accumulator[Dict[str, dict]]",
+) -> Callable[[Optional[str]], Optional[T]]:
+    """
+    Wrap a conversion from `custom_udfs` so that values it can't convert are added to the column's
+    failures in the accumulator, and converted to NULL.
+
+    Parameters
+    ----------
+    column_name : str
+        Name of the column the conversion is for
+    convert : Callable
+        Conversion from `custom_udfs`, such as `custom_udfs.as_long`
+    accumulator : Accumulator
+        Spark accumulator, from `FailuresAccumulatorParam`
+
+    Returns
+    -------
+    Callable
+        Conversion with the same results as `convert`, and None instead of errors
+    """
+
+    @functools.wraps(convert)
+    def wrapper(s: Optional[str]) -> Optional[T]:
+        try:
+            return convert(s)
+        except ValueError:
+            accumulator.add({column_name: {"count": 1, "samples": [s]}})
+
+            return None
+
+    return wrapper
+
+
+def dfm_record_count(spark: SparkSession, source_path: str) -> int:
+    """
+    Number of rows of a load, from the 'recordCount' of its '.dfm' file.
+    """
+
+    return int(spark_files.read_dfm(spark, source_path)["fileInfo"]["recordCount"])
+
+
+def rejection_reasons(
+    cast_failures: Dict[str, dict], failure_limit: int, rows_written: Optional[int], record_count: Optional[int]
+) -> List[str]:
+    """
+    Reasons to reject a load group, if any.
+
+    Parameters
+    ----------
+    cast_failures : dict
+        Value of the accumulator from `FailuresAccumulatorParam`
+    failure_limit : int
+        Number of values of the load group that can fail to cast
+    rows_written : int
+        Number of rows written to Springboard, None if the rows aren't reconciled
+    record_count : int
+        Number of rows of the loads, from their '.dfm' files, None for loads without any, such as
+        the DMAP loads
+
+    Returns
+    -------
+    list
+        Reasons, empty if the load group is accounted for
+    """
+
+    reasons = []
+
+    failure_count = sum(failures["count"] for failures in cast_failures.values())
+    if failure_count > failure_limit:
+        reasons.append(
+            f"{failure_count} value(s) couldn't be cast, more than the limit of {failure_limit}: "
+            + ", ".join(
+                f"{column_name} ({failures['count']}, such as {failures['samples']})"
+                for column_name, failures in sorted(cast_failures.items())
+            )
+        )
+
+    if record_count is not None and rows_written != record_count:
+        reasons.append(f"{rows_written} row(s) written, but the '.dfm' files have a recordCount of {record_count}")
+
+    return reasons
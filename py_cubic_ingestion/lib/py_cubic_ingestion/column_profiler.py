@@ -0,0 +1,195 @@
+"""
+Profiling of the columns of loads, to find the narrowest type each column could safely have in
+Springboard instead of 'string' (see ADR 0007).
+
+Every value of a load is checked, unlike the Glue crawler's sample, with the Spark SQL expressions
+of `native_casts`, which follow the same rules as `custom_udfs`, in a single aggregation without
+any Python workers. A column can have a type if none of its non-blank values fail to cast to it,
+and the narrowest such type, in the order of `CANDIDATE_TYPES`, is proposed. A value only counts
+as cast if it round-trips, so that nothing but surrounding whitespace is lost:
+
+* for 'long', the value must be written the way the number is, so codes with leading zeros such
+  as '007', or with a '+' sign, are kept as strings
+* for 'double', the value must be a finite number with no leading zeros and at most
+  `DOUBLE_DIGITS` significant digits, so integral values outside the range of 'long', such as
+  the 35-digit 'header__change_seq' of the '__ct' loads, are kept as strings
+* for 'date', the values can't have a time of day (other than midnight)
+
+Along with the proposed schema, the evidence for each column is kept: the rate of blank values,
+which become NULL, and for each type, the number of values that can't be cast, with examples.
+"""
+
+from py_cubic_ingestion import native_casts
+from pyspark.sql.column import Column
+from pyspark.sql.dataframe import DataFrame
+from pyspark.sql.functions import (
+    abs as abs_value,
+    col,
+    count,
+    length,
+    lit,
+    max as max_value,
+    min as min_value,
+    regexp_extract,
+    regexp_replace,
+    sum as sum_values,
+    when,
+)
+from pyspark.sql.types import TimestampType
+from typing import Callable, Dict, List
+
+
+# Spark types that a string column can be promoted to, narrowest first, and their Athena types
+CANDIDATE_TYPES = {
+    "long": "bigint",
+    "double": "double",
+    "date": "date",
+    "timestamp": "timestamp",
+}
+
+# significant digits that any decimal number can have and still be the same after a round-trip
+# through a double
+DOUBLE_DIGITS = 15
+# whether a number has leading zeros, such as '007' or '-00.5'
+LEADING_ZEROS_PATTERN = r"^[+-]?0[0-9]"
+
+
+def long_failure(value: Column) -> Column:
+    """
+    Whether the value can't be cast to a long, or isn't written the way the long is.
+    """
+
+    long = native_casts.long_value(value)
+
+    return long.isNull() | (long.cast("string") != regexp_extract(value, native_casts.LONG_PATTERN, 1))
+
+
+def double_failure(value: Column) -> Column:
+    """
+    Whether the value can't be cast to a double, or would change on the way, as an integral value
+    outside the range of 'long', or one with leading zeros, too many significant digits or an
+    exponent out of range.
+    """
+
+    double = native_casts.double_value(value)
+    number = regexp_extract(value, native_casts.DECIMAL_PATTERN, 1)
+    mantissa_digits = regexp_replace(regexp_extract(number, r"^[+-]?([0-9.]*)", 1), r"\.", "")
+    significant_digits = regexp_replace(mantissa_digits, r"^0+|0+$", "")
+
+    return (
+        double.isNull()
+        | (number == "")
+        # exponents out of the range of a double
+        | (abs_value(double) == float("inf"))
+        | ((double == 0) & (significant_digits != ""))
+        | number.rlike(LEADING_ZEROS_PATTERN)
+        | (length(significant_digits) > DOUBLE_DIGITS)
+        | (number.rlike(r"^[+-]?[0-9]+$") & native_casts.long_value(value).isNull())
+    )
+
+
+def date_failure(value: Column) -> Column:
+    """
+    Whether the value can't be cast to a date, or has a time of day that would be lost.
+    """
+
+    date = native_casts.date_value(value)
+    timestamp = native_casts.timestamp_value(value)
+
+    return date.isNull() | timestamp.isNull() | (timestamp != date.cast(TimestampType()))
+
+
+# whether a non-blank value fails to cast to each of the candidate types
+failure_checks: Dict[str, Callable[[Column], Column]] = {
+    "long": long_failure,
+    "double": double_failure,
+    "date": date_failure,
+    "timestamp": lambda value: native_casts.timestamp_value(value).isNull(),
+}
+
+
+def profile_columns(column_name: str) -> List[Column]:
+    """
+    Aggregations of the column's profile, named '<column>:<measure>'.
+    """
+
+    value = col(column_name)
+    not_blank = ~native_casts.is_blank(value)
+    aggregations = [sum_values(when(not_blank, 1).otherwise(0)).alias(f"{column_name}:non_blank_count")]
+
+    for spark_type, failure_check in failure_checks.items():
+        failed_value = when(not_blank & failure_check(value), value)
+        aggregations += [
+            count(failed_value).alias(f"{column_name}:{spark_type}:failure_count"),
+            min_value(failed_value).alias(f"{column_name}:{spark_type}:min_counterexample"),
+            max_value(failed_value).alias(f"{column_name}:{spark_type}:max_counterexample"),
+        ]
+
+    return aggregations
+
+
+def proposed_type(evidence: dict) -> str:
+    """
+    Narrowest Athena type of a column that none of its values fail to cast to, 'string' if there
+    isn't any, or if all the values are blank.
+    """
+
+    if evidence["non_blank_count"] == 0:
+        return "string"
+
+    for spark_type, athena_type in CANDIDATE_TYPES.items():
+        if evidence["types"][spark_type]["failure_count"] == 0:
+            return athena_type
+
+    return "string"
+
+
+def profile_df(df: DataFrame) -> dict:
+    """
+    Profile the columns of a DataFrame of strings, such as the loads of a table read from CSV.
+
+    Parameters
+    ----------
+    df : DataFrame
+        DataFrame with string columns
+
+    Returns
+    -------
+    dict
+        'row_count', the proposed 'columns', with 'Name' and 'Type' like in the Glue API, and the
+        'evidence' for each column, by name
+    """
+
+    aggregations = [count(lit(1)).alias("row_count")]
+    for column_name in df.columns:
+        aggregations += profile_columns(column_name)
+
+    result = df.agg(*aggregations).collect()[0].asDict()
+    row_count = result["row_count"]
+
+    evidence = {}
+    for column_name in df.columns:
+        non_blank_count = result[f"{column_name}:non_blank_count"] or 0
+        evidence[column_name] = {
+            "non_blank_count": non_blank_count,
+            "null_rate": (row_count - non_blank_count) / row_count if row_count else None,
+            "types": {
+                spark_type: {
+                    "failure_count": result[f"{column_name}:{spark_type}:failure_count"],
+                    "counterexamples": sorted(
+                        {result[f"{column_name}:{spark_type}:{measure}_counterexample"] for measure in ["min", "max"]}
+                        - {None}
+                    ),
+                }
+                for spark_type in failure_checks
+            },
+        }
+
+    return {
+        "row_count": row_count,
+        "columns": [
+            {"Name": column_name, "Type": proposed_type(column_evidence)}
+            for column_name, column_evidence in evidence.items()
+        ],
+        "evidence": evidence,
+    }
@@ -0,0 +1,158 @@
+"""
+Opt-in, size-bounded LRU caches for the conversions in `custom_udfs`, for columns with few
+distinct values, such as 'header__change_oper' or the inserted/updated timestamps of a load.
+
+There is one cache per conversion (such as 'timestamp') in each Python process. The caches are
+looked up by name when a value is converted, so a Spark Python worker keeps its caches across
+the columns and tasks it runs. Only successful conversions are cached, so a bad value raises
+the same `ValueError` every time.
+"""
+
+from collections import OrderedDict
+from pyspark.accumulators import Accumulator, AccumulatorParam
+from typing import Callable, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+STATS = ["hits", "misses", "evictions"]
+
+
+# note: pyspark's classes are only generic in its stubs, so their type parameters are in quotes
+class StatsAccumulatorParam(AccumulatorParam):
+    """
+    Spark accumulator of cache stats, by '<cache name>.<stat>'.
+    """
+
+    def zero(self, value: Dict[str, int]) -> Dict[str, int]:
+        return {}
+
+    def addInPlace(self, value1: Dict[str, int], value2: Dict[str, int]) -> Dict[str, int]:
+        for key, count in value2.items():
+            value1[key] = value1.get(key, 0) + count
+
+        return value1
+
+
+class LRUCache:
+    """
+    Least recently used cache of converted values, keyed by the original value.
+    """
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.values: "OrderedDict[str, object]" = OrderedDict()
+        self.stats = {stat: 0 for stat in STATS}
+        # single stat updates to send to a Spark accumulator
+        self.stat_updates = {stat: {f"{name}.{stat}": 1} for stat in STATS}
+
+    def record(self, stat: str, accumulator: "Optional[Accumulator[Dict[str, int]]]") -> None:
+        """
+        Count the stat in this process, and in the Spark accumulator, if any.
+        """
+
+        self.stats[stat] += 1
+        if accumulator is not None:
+            accumulator.add(self.stat_updates[stat])
+
+    def get(
+        self,
+        value: str,
+        convert: Callable[[str], T],
+        accumulator: "Optional[Accumulator[Dict[str, int]]]" = None,
+    ) -> T:
+        """
+        Converted value, from the cache if the value has been converted already.
+
+        Parameters
+        ----------
+        value : str
+            Value to convert
+        convert : Callable
+            Conversion from `custom_udfs`, only called on a cache miss
+        accumulator : Accumulator
+            Optional Spark accumulator to record the stats in, along with this process' stats
+
+        Returns
+        -------
+        object
+            Converted value
+        """
+
+        if value in self.values:
+            self.values.move_to_end(value)
+            self.record("hits", accumulator)
+
+            return self.values[value]  # type: ignore[return-value]
+
+        self.record("misses", accumulator)
+        # errors are raised before anything is cached
+        converted = convert(value)
+
+        self.values[value] = converted
+        if len(self.values) > self.maxsize:
+            self.values.popitem(last=False)
+            self.record("evictions", accumulator)
+
+        return converted
+
+
+# caches of this process, by name
+caches: Dict[str, LRUCache] = {}
+
+
+def get_cache(name: str, maxsize: int) -> LRUCache:
+    """
+    Cache of this process with the name, created the first time it's used.
+    """
+
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches[name] = LRUCache(name, maxsize)
+
+    return cache
+
+
+def cached(
+    name: str,
+    convert: Callable[[Optional[str]], Optional[T]],
+    maxsize: int,
+    accumulator: "Optional[Accumulator[Dict[str, int]]]" = None,
+) -> Callable[[Optional[str]], Optional[T]]:
+    """
+    Wrap a conversion from `custom_udfs` so that it goes through the process' cache with the name.
+
+    Parameters
+    ----------
+    name : str
+        Name of the cache, shared by all the conversions to the same type
+    convert : Callable
+        Conversion from `custom_udfs`, such as `custom_udfs.as_long`
+    maxsize : int
+        Maximum number of values in the cache
+    accumulator : Accumulator
+        Optional Spark accumulator, from `StatsAccumulatorParam`, to report the cache stats to
+
+    Returns
+    -------
+    Callable
+        Conversion with the same results and errors as `convert`
+    """
+
+    def wrapper(s: Optional[str]) -> Optional[T]:
+        # NULL values don't need a conversion
+        if s is None:
+            return None
+
+        return get_cache(name, maxsize).get(s, convert, accumulator)
+
+    return wrapper
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """
+    Stats of the caches in this process, by name, including the number of values in each.
+    """
+
+    return {name: {**cache.stats, "size": len(cache.values)} for name, cache in caches.items()}
@@ -0,0 +1,285 @@
+"""
+Compaction of the change tracking ('__ct') loads of an ODS table into a current-state table, so
+that Athena queries don't have to rebuild the current state of every row out of all the changes.
+
+The compacted table is next to the '__ct' table, with '__compacted' instead of '__ct' in its path,
+and is partitioned by 'snapshot' and by 'key_bucket', a hash of the primary key of the rows. For a
+snapshot, it starts out as the snapshot's load(s) from the table without '__ct'. Then, each batch
+of changes is merged in: for each primary key, the latest of the current row and the changes, by
+'header__change_seq' and then by the file they're from, is kept, unless it's a delete. Only the
+buckets of the keys with changes are read and written again, with dynamic partition overwrite, and
+the buckets left without any rows are deleted. Each bucket is written as a single file, and the
+merged rows of the buckets are staged under '_merge/' in the compacted table's path (which readers
+of the table skip, as it starts with an underscore) before the buckets they're read from are
+overwritten, so that a lost executor recomputes them from the staged files, not the overwritten ones.
+
+Changes are merged into a compacted table one batch at a time, such as when load groups of the
+same table run concurrently (see `load_runner` and `ingest_service`), as each batch reads and
+overwrites the same buckets.
+
+The compacted table's Glue table is named like the '__ct' table, with '__compacted' instead of
+'__ct', and is partitioned the same way: with REGISTER_PARTITIONS, `load_pipeline` registers the
+buckets it writes (see `compacted_partitions`).
+
+Note: the snapshot's load(s) have to be in Springboard before its changes are compacted, and the
+batches are only merged one at a time within a process: separate job runs for the same table
+mustn't overlap.
+"""
+
+from py_cubic_ingestion import job_helpers, spark_files
+from pyspark.sql.column import Column
+from pyspark.sql.dataframe import DataFrame
+from pyspark.sql.functions import col, hash as hash_columns, lit, pmod, row_number
+from pyspark.sql.session import SparkSession
+from pyspark.sql.window import Window
+from typing import Dict, List, Optional, Tuple
+import threading
+
+
+DEFAULT_BUCKET_COUNT = 16
+
+CHANGE_SEQ = "header__change_seq"
+CHANGE_OPER = "header__change_oper"
+
+# directory of the compacted table where the merged rows are staged
+STAGING_DIRECTORY = "_merge"
+
+# locks of the compacted tables, by path, see `table_lock`
+table_locks: Dict[str, threading.Lock] = {}
+table_locks_lock = threading.Lock()
+
+
+def table_paths(ct_destination_path: str) -> Tuple[str, str]:
+    """
+    Paths of the snapshot table and of the compacted table of a '__ct' table.
+
+    Parameters
+    ----------
+    ct_destination_path : str
+        Destination path of the '__ct' table's loads
+
+    Returns
+    -------
+    str, str
+        Path of the table without '__ct', and path of the compacted table
+    """
+
+    path = ct_destination_path.rstrip("/")
+    if not path.endswith("__ct"):
+        raise ValueError(f"Not the path of a change tracking table: {ct_destination_path}")
+
+    base_path = path[: -len("__ct")]
+
+    return (base_path, f"{base_path}__compacted")
+
+
+def compacted_partitions(ct_load: dict, snapshot: str, buckets: List[int]) -> List[dict]:
+    """
+    Partitions of key buckets of a snapshot of the compacted table of a '__ct' load, as the loads
+    that `partition_registry.register_partitions` takes, with the partition's path as their id.
+
+    Parameters
+    ----------
+    ct_load : dict
+        Load of the '__ct' table, from the job's INPUT
+    snapshot : str
+        Value of the 'snapshot' partition
+    buckets : list
+        Key buckets written, such as returned by `compact_changes`
+
+    Returns
+    -------
+    list
+        Partition of each bucket, with its 'id', 'destination_table_name', 'destination_path' and
+        'partition_columns'
+    """
+
+    table_name = ct_load["destination_table_name"]
+    if not table_name.endswith("__ct"):
+        raise ValueError(f"Not a change tracking table: {table_name}")
+
+    compacted_table_name = f"{table_name[: -len('__ct')]}__compacted"
+    _, compacted_path = table_paths(ct_load["destination_path"])
+
+    return [
+        {
+            "id": f"{compacted_table_name}/snapshot={snapshot}/key_bucket={bucket}",
+            "destination_table_name": compacted_table_name,
+            "destination_path": compacted_path,
+            "partition_columns": [
+                {"name": "snapshot", "value": snapshot},
+                {"name": "key_bucket", "value": str(bucket)},
+            ],
+        }
+        for bucket in buckets
+    ]
+
+
+def table_lock(compacted_path: str) -> threading.Lock:
+    """
+    Lock of a compacted table, held while a batch of changes is merged into it.
+    """
+
+    with table_locks_lock:
+        return table_locks.setdefault(compacted_path.rstrip("/"), threading.Lock())
+
+
+def primary_keys(dfm: dict) -> List[str]:
+    """
+    Names of the primary key columns in a '.dfm' file, in the order of the key, as in Springboard.
+    """
+
+    key_columns = sorted(
+        (column for column in dfm["dataInfo"]["columns"] if column.get("primaryKeyPos", 0) > 0),
+        key=lambda column: column["primaryKeyPos"],
+    )
+    if not key_columns:
+        raise ValueError(f"No primary key in the '.dfm' file of {dfm['fileInfo']['name']}")
+
+    return [column["name"].lower() for column in key_columns]
+
+
+def key_bucket(keys: List[str], bucket_count: int) -> Column:
+    """
+    Bucket of the rows' primary key, from 0 to `bucket_count` - 1.
+    """
+
+    return pmod(hash_columns(*[col(key) for key in keys]), lit(bucket_count))
+
+
+def path_exists(spark: SparkSession, path: str) -> bool:
+    """
+    Whether the path exists, using Hadoop's file system so that it works for local paths and S3 alike.
+    """
+
+    # pylint: disable=protected-access
+    hadoop_path = spark._jvm.org.apache.hadoop.fs.Path(path)  # type: ignore[union-attr]
+    exists: bool = hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration()).exists(hadoop_path)
+
+    return exists
+
+
+def df_with_changes(current_df: DataFrame, changes_df: DataFrame, keys: List[str]) -> DataFrame:
+    """
+    Current state of the rows, with the changes applied.
+
+    Parameters
+    ----------
+    current_df : DataFrame
+        Current rows, with the columns of the compacted table, including 'header__change_seq' of
+        their last change (NULL if it's from the snapshot) and 'key_bucket'
+    changes_df : DataFrame
+        Changes, with the columns of the '__ct' table, including 'identifier', and 'key_bucket'
+    keys : list
+        Names of the primary key columns
+
+    Returns
+    -------
+    DataFrame
+        Latest row of each primary key, without the deleted ones, with the columns of `current_df`
+    """
+
+    columns = current_df.columns
+    rows_df = current_df.withColumn(CHANGE_OPER, lit(None).cast("string")).withColumn(
+        "identifier", lit(None).cast("string")
+    )
+    changes_df = changes_df.withColumn(CHANGE_SEQ, col(CHANGE_SEQ).cast("string")).select(
+        columns + [CHANGE_OPER, "identifier"]
+    )
+
+    # the current rows are older than the changes with the same sequence, as are changes from earlier files
+    latest = Window.partitionBy(*keys).orderBy(col(CHANGE_SEQ).desc_nulls_last(), col("identifier").desc_nulls_last())
+
+    return (
+        rows_df.unionByName(changes_df)
+        .withColumn("row_number", row_number().over(latest))
+        .where((col("row_number") == 1) & (col(CHANGE_OPER).isNull() | (col(CHANGE_OPER) != "D")))
+        .select(columns)
+    )
+
+
+def write_buckets(df: DataFrame, compacted_path: str, snapshot: str, writer_options: Optional[Dict[str, str]]) -> None:
+    """
+    Write the rows of the key buckets of a snapshot, overwriting the buckets, with a single file for
+    each bucket rather than one for each partition of the merge's shuffle.
+    """
+
+    job_helpers.write_partitioned_parquet(
+        df.repartition("key_bucket").withColumn("snapshot", lit(snapshot)),
+        ["snapshot", "key_bucket"],
+        compacted_path,
+        writer_options=writer_options,
+    )
+
+
+def compact_changes(
+    spark: SparkSession,
+    changes_df: DataFrame,
+    ct_destination_path: str,
+    snapshot: str,
+    keys: List[str],
+    bucket_count: int = DEFAULT_BUCKET_COUNT,
+    writer_options: Optional[Dict[str, str]] = None,
+) -> List[int]:
+    """
+    Merge a batch of changes of a snapshot into the compacted table.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session, with dynamic partition overwrite
+    changes_df : DataFrame
+        Changes, as written to the '__ct' table, with the 'identifier' of the file they're from
+    ct_destination_path : str
+        Destination path of the '__ct' table
+    snapshot : str
+        Value of the 'snapshot' partition of the changes
+    keys : list
+        Names of the primary key columns
+    bucket_count : int
+        Number of key buckets of the compacted table, which can't change once it's written
+    writer_options : dict
+        Options of the Parquet writer, such as from `writer_profiles.writer_options`
+
+    Returns
+    -------
+    list
+        Key buckets written
+    """
+
+    base_path, compacted_path = table_paths(ct_destination_path)
+
+    # note: each batch reads the current rows of the buckets it overwrites
+    with table_lock(compacted_path):
+        snapshot_path = f"{compacted_path}/snapshot={snapshot}"
+        changes_df = changes_df.withColumn("key_bucket", key_bucket(keys, bucket_count))
+
+        if not path_exists(spark, snapshot_path):
+            # the snapshot's rows go in all the buckets, even if they have no changes
+            base_df = spark.read.parquet(f"{base_path}/snapshot={snapshot}").drop("identifier")
+            current_df = base_df.select(
+                [lit(None).cast("string").alias(CHANGE_SEQ)]
+                + [col(column_name) for column_name in base_df.columns]
+                + [key_bucket(keys, bucket_count).alias("key_bucket")]
+            )
+            write_buckets(df_with_changes(current_df, changes_df, keys), compacted_path, snapshot, writer_options)
+
+            return list(range(bucket_count))
+
+        buckets = sorted(row.key_bucket for row in changes_df.select("key_bucket").distinct().collect())
+        current_df = spark.read.parquet(snapshot_path).where(col("key_bucket").isin(buckets))
+        # note: the changed buckets are staged before they're overwritten, and so that the ones left
+        # without rows, which dynamic partition overwrite wouldn't touch, can be deleted
+        staging_path = f"{compacted_path}/{STAGING_DIRECTORY}/snapshot={snapshot}"
+        df_with_changes(current_df, changes_df, keys).write.parquet(staging_path, mode="overwrite")
+        compacted_df = spark.read.parquet(staging_path)
+        written_buckets = {row.key_bucket for row in compacted_df.select("key_bucket").distinct().collect()}
+
+        write_buckets(compacted_df, compacted_path, snapshot, writer_options)
+        spark_files.delete_paths(
+            spark,
+            [f"{snapshot_path}/key_bucket={bucket}" for bucket in buckets if bucket not in written_buckets]
+            + [staging_path],
+        )
+
+        return buckets
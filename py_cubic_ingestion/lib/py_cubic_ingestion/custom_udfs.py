@@ -5,6 +5,7 @@ Custome Spark user-defined functions (UDFs) for processing dataframes.
 from datetime import date, datetime
 from dateutil import parser
 from dateutil.tz import UTC
+from py_cubic_ingestion import datetime_parsers
 from typing import Callable, Optional, TypeVar
 import functools
 
@@ -54,12 +55,39 @@ def as_date(s: str) -> date:
     return parser.isoparse(s).date()
 
 
-@optional
-@capture_error
-def as_timestamp(s: str) -> datetime:
-    val = parser.isoparse(s)
+def utc_naive(val: datetime) -> datetime:
     # if we have picked up a timezone, then localize to UTC and drop it
     if val.tzinfo:
         val = val.astimezone(UTC).replace(tzinfo=None)
 
     return val
+
+
+@optional
+@capture_error
+def as_timestamp(s: str) -> datetime:
+    return utc_naive(parser.isoparse(s))
+
+
+# versions of 'as_date' and 'as_timestamp' for the values of a single column, which parse the
+# values with a parser that learns the layout of the column, instead of 'isoparse' for every value
+def column_as_date() -> Callable[[Optional[str]], Optional[date]]:
+    datetime_parser = datetime_parsers.DatetimeParser()
+
+    @optional
+    @capture_error
+    def parse_date(s: str) -> date:
+        return datetime_parser.parse(s).date()
+
+    return parse_date
+
+
+def column_as_timestamp() -> Callable[[Optional[str]], Optional[datetime]]:
+    datetime_parser = datetime_parsers.DatetimeParser()
+
+    @optional
+    @capture_error
+    def parse_timestamp(s: str) -> datetime:
+        return utc_naive(datetime_parser.parse(s))
+
+    return parse_timestamp
@@ -0,0 +1,159 @@
+"""
+Layout of the rows of a table in its Parquet files, so that engines reading Springboard can skip
+the row groups whose min/max statistics, or bloom filters, rule out a query's filters, instead of
+having rows in the order they arrived in. The layout of a table is in the payload of its loads:
+
+- 'cluster_columns': columns the rows of each file are sorted by, such as ['sample_id']
+- 'cluster_method': 'sort' (the default), to sort by the columns in order, or 'z_order', to sort
+  two columns by their Z-order (Morton) value, so that filters on either column can skip row groups
+- 'bloom_filter_columns': high cardinality columns, such as ids, to write bloom filters for, for
+  filters on values within a row group's min/max
+
+Note: Z-ordering needs the min and max of the columns, which reads the loads an extra time. Bloom
+filters are only written from Parquet 1.12, the option is ignored with Spark 3.1 (Glue 3.0).
+"""
+
+from functools import reduce
+from pyspark.sql.column import Column
+from pyspark.sql.dataframe import DataFrame
+from pyspark.sql.functions import col, datediff, floor, lit, max as max_value, min as min_value, when
+from pyspark.sql.session import SparkSession
+from pyspark.sql.types import DataType, DateType, NumericType, TimestampType
+from typing import Dict, List
+
+
+CLUSTER_METHODS = ["sort", "z_order"]
+
+# bits of each column in the Z-order value, which fits in a long
+Z_ORDER_BITS = 16
+
+# Spark version from which a write is sorted by its partition columns as planned, see `disable_planned_write`
+PLANNED_WRITE_SPARK_VERSION = (3, 4)
+
+
+def cluster_columns(load: dict) -> List[str]:
+    """
+    Names of the cluster columns of a load, as in Springboard.
+    """
+
+    return [column_name.lower() for column_name in load.get("cluster_columns", [])]
+
+
+def ordinal_value(column: Column, data_type: DataType) -> Column:
+    """
+    Value of a column as a double, in the same order as the column's values.
+    """
+
+    if isinstance(data_type, DateType):
+        return datediff(column, lit("1970-01-01")).cast("double")
+
+    if isinstance(data_type, (NumericType, TimestampType)):
+        return column.cast("double")
+
+    raise ValueError(f"Can't Z-order a column of type {data_type.simpleString()}")
+
+
+def z_order_value(df: DataFrame, column_names: List[str]) -> Column:
+    """
+    Z-order value of two columns: their values scaled from their min and max to integers of
+    `Z_ORDER_BITS` bits, with the bits interleaved. NULLs are ordered first.
+
+    Parameters
+    ----------
+    df : DataFrame
+        DataFrame with the columns, whose min and max are computed
+    column_names : list
+        Names of the two columns, which are numbers, dates or timestamps
+
+    Returns
+    -------
+    Column
+        Z-order value, as a long
+    """
+
+    if len(column_names) != 2:
+        raise ValueError(f"Z-ordering needs two columns, not {column_names}")
+
+    data_types = {field.name: field.dataType for field in df.schema.fields}
+    values = [ordinal_value(col(column_name), data_types[column_name]) for column_name in column_names]
+    bounds = df.agg(*[aggregate(value) for value in values for aggregate in [min_value, max_value]]).collect()[0]
+    max_scaled = 2**Z_ORDER_BITS - 1
+
+    scaled_values = []
+    for index, value in enumerate(values):
+        minimum, maximum = bounds[2 * index], bounds[2 * index + 1]
+        if minimum is None or minimum == maximum:
+            scaled_values.append(lit(0))
+        else:
+            scaled_values.append(
+                when(value.isNull(), 0).otherwise(floor((value - minimum) / (maximum - minimum) * max_scaled))
+            )
+
+    # bit i of the first column is bit 2i of the value, and of the second column bit 2i + 1
+    return reduce(
+        Column.__add__,
+        [
+            when(scaled.bitwiseAND(1 << bit) != 0, lit(1 << (2 * bit + index))).otherwise(lit(0))
+            for bit in range(Z_ORDER_BITS)
+            for index, scaled in enumerate(scaled_values)
+        ],
+    )
+
+
+def df_with_layout(df: DataFrame, load: dict, partition_column_names: List[str]) -> DataFrame:
+    """
+    Sort the rows of each of the DataFrame's partitions with the load's layout, if it has one.
+
+    Parameters
+    ----------
+    df : DataFrame
+        DataFrame to be written, already partitioned as the files to write
+    load : dict
+        Load with the layout of its table
+    partition_column_names : list
+        Names of the partition columns, which the rows are sorted by first, as for the write
+
+    Returns
+    -------
+    DataFrame
+        DataFrame with its rows sorted
+    """
+
+    column_names = cluster_columns(load)
+    if not column_names:
+        return df
+
+    missing_columns = [column_name for column_name in column_names if column_name not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Unknown cluster columns of load {load['id']}: {missing_columns}")
+
+    cluster_method = load.get("cluster_method", "sort")
+    if cluster_method == "sort":
+        return df.sortWithinPartitions(*partition_column_names, *column_names)
+
+    if cluster_method == "z_order":
+        return df.sortWithinPartitions(*partition_column_names, z_order_value(df, column_names))
+
+    raise ValueError(f"Unknown cluster method '{cluster_method}', expected one of {CLUSTER_METHODS}")
+
+
+def bloom_filter_options(load: dict) -> Dict[str, str]:
+    """
+    Options of the Parquet writer for the bloom filters of the load's table, if any.
+    """
+
+    return {
+        f"parquet.bloom.filter.enabled#{column_name.lower()}": "true"
+        for column_name in load.get("bloom_filter_columns", [])
+    }
+
+
+def disable_planned_write(spark: SparkSession) -> None:
+    """
+    From Spark 3.4, the planned sort of a write by its partition columns replaces the sort of
+    `df_with_layout`, as the partition columns of the loads are literals. Turn it off on those
+    versions, and leave the configuration of older ones, such as Spark 3.1 of Glue 3.0, as it is.
+    """
+
+    if tuple(int(part) for part in spark.version.split(".")[:2]) >= PLANNED_WRITE_SPARK_VERSION:
+        spark.conf.set("spark.sql.optimizer.plannedWrite.enabled", "false")
@@ -0,0 +1,227 @@
+"""
+Parsing of the ISO 8601 date/time values of a column, which learns the layout of the column
+from its values. Values in the learned layout are parsed by slicing out each field, and only
+values in any other layout are parsed with `dateutil`'s `isoparse`.
+"""
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from dateutil import parser
+from typing import Match, NamedTuple, Optional, Pattern, Tuple
+import functools
+import re
+import string
+
+# layouts that can be learned: a full date, optionally followed by a time with seconds, an optional
+# fraction of a second, and an optional UTC offset. as with 'isoparse', the date/time separator can
+# be any character, and the use of '-' and ':' has to be consistent
+LEARNABLE_PATTERN = re.compile(
+    r"(?P<year>[0-9]{4})(?P<date_separator>-?)(?P<month>[0-9]{2})(?P=date_separator)(?P<day>[0-9]{2})"
+    r"(?:.(?P<hour>[0-9]{2})(?P<time_separator>:?)(?P<minute>[0-9]{2})(?P=time_separator)(?P<second>[0-9]{2})"
+    r"(?:[.,](?P<fraction>[0-9]+))?"
+    r"(?P<offset>[Zz]|(?P<offset_sign>[+-])(?P<offset_hours>[0-9]{2}):?(?P<offset_minutes>[0-9]{2})?)?)?"
+)
+# number of consecutive values not in the learned layout after which the layout is learned again
+RELEARN_AFTER = 100
+
+
+@functools.lru_cache(maxsize=None)
+def offset_timezone(sign: str, hours: int, minutes: int) -> tzinfo:
+    """
+    Timezone for a UTC offset, shared by all the values with that offset.
+    """
+
+    offset = timedelta(hours=hours, minutes=minutes)
+
+    return timezone(-offset if sign == "-" else offset)
+
+
+class Layout(NamedTuple):
+    """
+    Fixed layout of date/time values, with the position of each field in the values.
+    """
+
+    pattern: Pattern[str]
+    year: slice
+    month: slice
+    day: slice
+    # hour, minute and second, None for dates
+    time: Optional[Tuple[slice, slice, slice]]
+    # truncated to microseconds, which are then the value times 'fraction_scale'
+    fraction: Optional[slice]
+    fraction_scale: int
+    # 'Z' or '+HH[[:]MM]', with minutes optional
+    offset: Optional[slice]
+    offset_minutes: Optional[slice]
+
+    def parse(self, value: str) -> Optional[datetime]:
+        """
+        Parse the value if it is in this layout.
+
+        Parameters
+        ----------
+        value : str
+            ISO 8601 date/time
+
+        Returns
+        -------
+        datetime
+            Parsed value, None if it isn't in this layout or if it isn't a valid date/time (such
+            as '24:00:00', which is left to 'isoparse')
+        """
+
+        if not self.pattern.fullmatch(value):
+            return None
+
+        try:
+            if self.time is None:
+                return datetime(int(value[self.year]), int(value[self.month]), int(value[self.day]))
+
+            hour, minute, second = self.time
+
+            return datetime(
+                int(value[self.year]),
+                int(value[self.month]),
+                int(value[self.day]),
+                int(value[hour]),
+                int(value[minute]),
+                int(value[second]),
+                int(value[self.fraction]) * self.fraction_scale if self.fraction else 0,
+                self.timezone(value),
+            )
+        except ValueError:
+            return None
+
+    def timezone(self, value: str) -> Optional[tzinfo]:
+        """
+        Timezone of the UTC offset in the value, None if the layout has no offset.
+        """
+
+        if self.offset is None:
+            return None
+
+        offset = value[self.offset]
+        if offset in ("Z", "z"):
+            return timezone.utc
+
+        minutes = int(value[self.offset_minutes]) if self.offset_minutes else 0
+        # note: as with 'isoparse', the minutes are under 60, and the hours under 24 (see 'timezone')
+        if minutes >= 60:
+            raise ValueError(f"Invalid minutes in the UTC offset of {value}")
+
+        return offset_timezone(offset[0], int(offset[1:3]), minutes)
+
+
+@functools.lru_cache(maxsize=64)
+def compiled_pattern(pattern: str) -> Pattern[str]:
+    """
+    Compiled regular expression, cached so that relearning a layout doesn't compile it again.
+    """
+
+    return re.compile(pattern)
+
+
+def group_slice(match: Match[str], group: str) -> Optional[slice]:
+    """
+    Position of a group of the match, None if the group didn't participate in the match.
+    """
+
+    start, end = match.span(group)
+
+    return slice(start, end) if start >= 0 else None
+
+
+def learn_layout(value: str) -> Optional[Layout]:
+    """
+    Learn the layout of a date/time value.
+
+    Parameters
+    ----------
+    value : str
+        ISO 8601 date/time
+
+    Returns
+    -------
+    Layout
+        Layout of the value, None if the layout isn't one of the layouts we can learn
+    """
+
+    match = LEARNABLE_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+
+    # digits can change from value to value, as can the sign of the offset
+    sign_position = match.start("offset_sign")
+    pattern_parts = [
+        "[0-9]" if character in string.digits else "[+-]" if position == sign_position else re.escape(character)
+        for position, character in enumerate(value)
+    ]
+
+    fraction = group_slice(match, "fraction")
+    if fraction is not None:
+        digits = min(fraction.stop - fraction.start, 6)
+        fraction = slice(fraction.start, fraction.start + digits)
+
+    return Layout(
+        pattern=compiled_pattern("".join(pattern_parts)),
+        year=slice(*match.span("year")),
+        month=slice(*match.span("month")),
+        day=slice(*match.span("day")),
+        time=(
+            (slice(*match.span("hour")), slice(*match.span("minute")), slice(*match.span("second")))
+            if match.group("hour")
+            else None
+        ),
+        fraction=fraction,
+        fraction_scale=10 ** (6 - (fraction.stop - fraction.start)) if fraction else 1,
+        offset=group_slice(match, "offset"),
+        offset_minutes=group_slice(match, "offset_minutes"),
+    )
+
+
+class DatetimeParser:
+    """
+    Parser for the ISO 8601 date/time values of a single column. The layout of the column is
+    learned from the first value in a layout that can be learned, and is learned again if the
+    layout of the column seems to have changed.
+    """
+
+    def __init__(self) -> None:
+        self.layout: Optional[Layout] = None
+        self.misses = 0
+
+    def parse(self, value: str) -> datetime:
+        """
+        Parse the value like `dateutil.parser.isoparse`, including raising a ValueError for
+        invalid values.
+
+        Parameters
+        ----------
+        value : str
+            ISO 8601 date/time
+
+        Returns
+        -------
+        datetime
+            Parsed value, with a timezone if the value has a UTC offset
+        """
+
+        if self.layout is not None:
+            result = self.layout.parse(value)
+            if result is not None:
+                self.misses = 0
+                return result
+
+            self.misses += 1
+            if self.misses >= RELEARN_AFTER:
+                self.layout = None
+
+        if self.layout is None:
+            self.layout = learn_layout(value)
+            self.misses = 0
+
+            if self.layout is not None:
+                result = self.layout.parse(value)
+                if result is not None:
+                    return result
+
+        return parser.isoparse(value)
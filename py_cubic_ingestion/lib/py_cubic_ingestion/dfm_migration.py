@@ -0,0 +1,174 @@
+"""
+Migration of a Springboard Glue table to the types of the '.dfm' files of its ODS loads, to be run
+for each ODS table before DFM_TYPES is enabled (see `dfm_schema`).
+
+The types are read from the '.dfm' file of one of the table's loads, and the columns of the Glue
+table that don't have them are given them, in an `update_table` call. Only the table's columns are
+updated: its existing partitions keep their columns, which describe their existing files, until
+they are rewritten by reprocessing the table's loads, which also registers the partitions with the
+new columns (see `partition_registry`).
+
+By default, the input of the `update_table` call is printed, as JSON that `aws glue update-table
+--cli-input-json` takes, without updating the table; with '--apply', the table is updated.
+
+Usage: python -m py_cubic_ingestion.dfm_migration --database DATABASE --table TABLE
+    --source-path s3a://.../LOAD1.csv.gz [--apply]
+"""
+
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import dfm_schema, schema_cache, spark_files
+from pyspark.sql.session import SparkSession
+from typing import List, Optional
+import argparse
+import boto3
+import json
+import logging
+
+
+log_prefix = "[py_cubic_ingestion] [dfm_migration]"
+
+# Athena types of the Spark types, the inverse of `schema_cache.athena_type_to_spark_type`
+spark_type_to_athena_type = {
+    spark_type: athena_type for athena_type, spark_type in schema_cache.athena_type_to_spark_type.items()
+}
+
+# keys of a table, as returned by the Glue API, that `update_table` takes in its 'TableInput'
+TABLE_INPUT_KEYS = [
+    "Name",
+    "Description",
+    "Owner",
+    "LastAccessTime",
+    "LastAnalyzedTime",
+    "Retention",
+    "StorageDescriptor",
+    "PartitionKeys",
+    "ViewOriginalText",
+    "ViewExpandedText",
+    "TableType",
+    "Parameters",
+    "TargetTable",
+]
+
+
+def athena_type(spark_type: str) -> str:
+    """
+    Athena type of a Spark type, such as 'int' for 'integer'. Decimal types keep their precision
+    and scale, as in 'decimal(10,2)'.
+    """
+
+    return spark_type_to_athena_type.get(spark_type, spark_type)
+
+
+def migrated_table_input(table: dict, dfm_fields: List[dict]) -> Optional[dict]:
+    """
+    Input of the `update_table` call that gives the columns of a table the types of the '.dfm'
+    file's fields of the same name, or None if they already have them.
+
+    Parameters
+    ----------
+    table : dict
+        Glue data catalog table
+    dfm_fields : list
+        Schema fields of the '.dfm' file, from `dfm_schema.schema_fields`
+
+    Returns
+    -------
+    dict
+        'TableInput' of the `update_table` call, or None if the table doesn't need to be migrated
+    """
+
+    mismatched_columns = dfm_schema.mismatched_columns(schema_cache.schema_fields_from_table(table), dfm_fields)
+    if not mismatched_columns:
+        return None
+
+    dfm_types = {field["name"]: field["type"] for field in dfm_fields}
+
+    return {
+        **{key: table[key] for key in TABLE_INPUT_KEYS if key in table},
+        "StorageDescriptor": {
+            **table["StorageDescriptor"],
+            "Columns": [
+                (
+                    {**column, "Type": athena_type(dfm_types[column["Name"].lower()])}
+                    if column["Name"] in mismatched_columns
+                    else column
+                )
+                for column in table["StorageDescriptor"]["Columns"]
+            ],
+        },
+    }
+
+
+def migrate_table(
+    spark: SparkSession,
+    glue_client: GlueClient,
+    database_name: str,
+    table_name: str,
+    source_path: str,
+    apply: bool = False,
+) -> Optional[dict]:
+    """
+    Migrate a table to the types of the '.dfm' file of one of its loads.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session to read the '.dfm' file with
+    glue_client : GlueClient
+        Boto3 client for Glue
+    database_name : str
+        Glue database of the table, GLUE_DATABASE_SPRINGBOARD
+    table_name : str
+        Name of the table, such as 'cubic_ods_qlik__edw_sample'
+    source_path : str
+        Path of the '.csv.gz' file of one of the table's loads
+    apply : bool
+        Whether to update the table, instead of only returning the update
+
+    Returns
+    -------
+    dict
+        Input of the `update_table` call, with the 'DatabaseName' and 'TableInput', or None if
+        the table already has the types of the '.dfm' file
+    """
+
+    table_input = migrated_table_input(
+        dict(glue_client.get_table(DatabaseName=database_name, Name=table_name)["Table"]),
+        dfm_schema.schema_fields(spark_files.read_dfm(spark, source_path)),
+    )
+    if table_input is None:
+        logging.info("%s %s already has the types of %s", log_prefix, table_name, spark_files.dfm_path(source_path))
+        return None
+
+    update = {"DatabaseName": database_name, "TableInput": table_input}
+    if apply:
+        glue_client.update_table(DatabaseName=database_name, TableInput=table_input)  # type: ignore[arg-type]
+        logging.info("%s Updated the columns of %s", log_prefix, table_name)
+
+    return update
+
+
+def run(argv: Optional[List[str]] = None) -> None:
+    """
+    Print, or apply, the migration of a table to the types of the '.dfm' file of one of its loads.
+    """
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--database", required=True, help="Glue database of the table, GLUE_DATABASE_SPRINGBOARD")
+    arg_parser.add_argument("--table", required=True, help="name of the table, such as 'cubic_ods_qlik__edw_sample'")
+    arg_parser.add_argument(
+        "--source-path", required=True, help="path of the '.csv.gz' file of one of the table's loads"
+    )
+    arg_parser.add_argument("--apply", action="store_true", help="update the table, instead of printing the update")
+    args = arg_parser.parse_args(argv)
+
+    spark = SparkSession.builder.appName("dfm_migration").getOrCreate()
+    update = migrate_table(spark, boto3.client("glue"), args.database, args.table, args.source_path, args.apply)
+    spark.stop()
+
+    print(json.dumps(update, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run()
@@ -0,0 +1,151 @@
+"""
+Types of the columns of ODS loads from the Qlik '.dfm' file next to each load, which has the type
+of each column in the source database, including the precision and scale of numeric columns.
+
+The types are mapped to the most precise Spark type that holds all of the column's values, such as
+'decimal(10,2)' for 'NUMERIC' columns and 'integer' for 'INT4' ones, instead of the 'double' or
+'string' of the Glue crawler (see ADR 0007).
+
+Athena reads the Parquet files with the columns of the Springboard Glue table, and of each of its
+partitions as they were when the partition was added, so the Springboard tables have to be migrated
+to these types, their columns along with their existing partitions and files, before DFM_TYPES is
+enabled (see `dfm_migration`). The loads are then cast with the types of the Glue table, as without DFM_TYPES, which
+checks that they are the types of the loads' '.dfm' files, so that the loads of a table that isn't
+migrated, or whose source columns changed types, fail instead of writing files that the catalog
+doesn't describe (see `mismatched_columns`).
+"""
+
+from py_cubic_ingestion import spark_files
+from pyspark.sql.session import SparkSession
+from typing import Dict, List
+import logging
+import threading
+
+
+log_prefix = "[py_cubic_ingestion] [dfm_schema]"
+
+# Spark types of the Qlik types, other than 'NUMERIC'. Unsigned types get the next wider type, and
+# the types that aren't here are kept as strings
+qlik_type_to_spark_type = {
+    "INT1": "byte",
+    "INT2": "short",
+    "INT4": "integer",
+    "INT8": "long",
+    "UINT1": "short",
+    "UINT2": "integer",
+    "UINT4": "long",
+    "UINT8": "decimal(20,0)",
+    "REAL4": "double",
+    "REAL8": "double",
+    "DATE": "date",
+    "DATETIME": "timestamp",
+}
+
+# maximum precision of Spark's DecimalType
+MAX_DECIMAL_PRECISION = 38
+
+
+def spark_type(column: dict) -> str:
+    """
+    Spark type of a column of a '.dfm' file.
+
+    Parameters
+    ----------
+    column : dict
+        Column from the 'dataInfo' of a '.dfm' file, with its 'type', 'precision' and 'scale'
+
+    Returns
+    -------
+    str
+        Spark type name, such as 'integer' or 'decimal(10,2)'
+    """
+
+    if column["type"] == "NUMERIC":
+        precision = column.get("precision", 0)
+        scale = column.get("scale", 0)
+        # numeric columns without a precision, or too precise for Spark, are kept as strings
+        if 0 < precision <= MAX_DECIMAL_PRECISION and scale in range(precision + 1):
+            return f"decimal({precision},{scale})"
+
+        return "string"
+
+    return qlik_type_to_spark_type.get(column["type"], "string")
+
+
+def schema_fields(dfm: dict) -> List[dict]:
+    """
+    Schema fields of the columns of a '.dfm' file, with the names of the columns in Springboard.
+    """
+
+    return [
+        {"name": column["name"].lower(), "type": spark_type(column)}
+        for column in sorted(dfm["dataInfo"]["columns"], key=lambda column: column.get("ordinal", 0))
+    ]
+
+
+def mismatched_columns(fields: List[dict], dfm_fields: List[dict]) -> List[str]:
+    """
+    Names of the schema fields, such as the fields of the Springboard table, that don't have the
+    type of the '.dfm' file's field of the same name. Fields that aren't in the '.dfm' file, such
+    as the partition columns, are left out.
+    """
+
+    dfm_types = {field["name"]: field["type"] for field in dfm_fields}
+
+    return [field["name"] for field in fields if dfm_types.get(field["name"].lower(), field["type"]) != field["type"]]
+
+
+def is_ods_load(load: dict) -> bool:
+    """
+    Whether the load is from Qlik, with a '.dfm' file.
+    """
+
+    return "/ods_qlik/" in load["source_s3_key"]
+
+
+class DfmSchemaCache:
+    """
+    Schema fields of the '.dfm' files of the tables of a Glue job run, read once for each table,
+    from the first load of the table, and shared by the threads running the loads.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session to read the '.dfm' files with
+    """
+
+    def __init__(self, spark: SparkSession) -> None:
+        self.spark = spark
+        self.fields_by_table: Dict[str, List[dict]] = {}
+        self.lock = threading.Lock()
+
+    def schema_fields(self, table_name: str, source_path: str) -> List[dict]:
+        """
+        Schema fields of the table, from the '.dfm' file of the load at the source path if the
+        table's haven't been read yet.
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the load's table
+        source_path : str
+            Path of the load's '.csv.gz' file, such as its `source_s3_key`
+
+        Returns
+        -------
+        list
+            List of fields with name and type
+        """
+
+        with self.lock:
+            if table_name not in self.fields_by_table:
+                self.fields_by_table[table_name] = schema_fields(spark_files.read_dfm(self.spark, source_path))
+                logging.info(
+                    "%s Types of %s from %s: %s",
+                    log_prefix,
+                    table_name,
+                    spark_files.dfm_path(source_path),
+                    self.fields_by_table[table_name],
+                )
+
+            return self.fields_by_table[table_name]
@@ -0,0 +1,157 @@
+"""
+Planning of the Parquet files written for a load. Each load writes a single `snapshot=`/`identifier=`
+partition, so the number of files is the number of partitions of the DataFrame written. Left as
+is, small change tracking ('__ct') loads get many tiny files and large snapshots a few huge ones.
+
+The output size is estimated from the load's input bytes (its gzipped CSV size), with a ratio
+of output to input bytes that can be tuned from the sizes reported for previous loads. The rows
+aren't counted, as that would read (and decompress) the input an extra time: when a row count is
+needed, for loads written together, it's estimated with a number of input bytes per row, which
+can be tuned from the 'input_bytes' and 'rows_written' reported for previous loads.
+"""
+
+from pyspark.sql.dataframe import DataFrame
+from pyspark.sql.session import SparkSession
+from typing import Dict, List, NamedTuple, Sequence
+import math
+
+# note: gzipped CSV and snappy compressed Parquet files are usually of a similar size
+DEFAULT_OUTPUT_BYTES_PER_INPUT_BYTE = 1.0
+
+
+class FilePlan(NamedTuple):
+    """
+    Files to write for a load.
+    """
+
+    estimated_bytes: int
+    file_count: int
+    # 0 if there is no limit
+    max_records_per_file: int
+
+
+def plan_files(
+    input_bytes: int,
+    row_count: int,
+    target_file_size_bytes: int,
+    output_bytes_per_input_byte: float = DEFAULT_OUTPUT_BYTES_PER_INPUT_BYTE,
+) -> FilePlan:
+    """
+    Plan the files for a load so that they are close to the target size.
+
+    Parameters
+    ----------
+    input_bytes : int
+        Size of the load's input, such as its `s3_size`
+    row_count : int
+        Number of rows in the load, or an estimate (see `estimated_row_count`), 0 if unknown
+    target_file_size_bytes : int
+        Size the files should be close to
+    output_bytes_per_input_byte : float
+        Estimated ratio of the size of the output to the size of the input
+
+    Returns
+    -------
+    FilePlan
+        Planned files, at least one
+    """
+
+    estimated_bytes = int(input_bytes * output_bytes_per_input_byte)
+    file_count = max(1, math.ceil(estimated_bytes / target_file_size_bytes))
+    # note: the records limit is only needed when a task writes the rows of several files, such as
+    # the loads written together, see `df_with_file_plan`
+    max_records_per_file = math.ceil(row_count / file_count) if row_count > file_count else 0
+
+    return FilePlan(estimated_bytes, file_count, max_records_per_file)
+
+
+def estimated_row_count(input_bytes: int, input_bytes_per_row: float) -> int:
+    """
+    Estimated number of rows of a load from the size of its input, 0 if the bytes per row aren't
+    known.
+    """
+
+    return math.ceil(input_bytes / input_bytes_per_row) if input_bytes_per_row > 0 else 0
+
+
+def df_with_file_plan(df: DataFrame, plan: FilePlan, partition_column_names: Sequence[str] = ()) -> DataFrame:
+    """
+    Repartition the DataFrame to the planned number of files, without a shuffle if that's fewer
+    files than there are partitions.
+
+    Parameters
+    ----------
+    df : DataFrame
+        DataFrame to be written
+    plan : FilePlan
+        Planned files
+    partition_column_names : Sequence
+        If the DataFrame has the data of several partitions (see `load_groups`), the names of the
+        partition columns, so that each partition's rows are kept together
+
+    Returns
+    -------
+    DataFrame
+        Repartitioned DataFrame
+    """
+
+    if partition_column_names:
+        # note: each partition is then written by a single task, and split by the records limit of
+        # the plan, leaving a smaller last file for each partition
+        return df.repartition(plan.file_count, *partition_column_names)
+
+    # note: otherwise each task writes a single file, and the records limit isn't needed: with
+    # partitions of uneven sizes, as after a 'coalesce', it would split off small files
+
+    if plan.file_count < df.rdd.getNumPartitions():
+        return df.coalesce(plan.file_count)
+
+    return df.repartition(plan.file_count)
+
+
+def partition_path(destination: str, partition_columns: list) -> str:
+    """
+    Path of the partition written with the partition columns, under the destination.
+    """
+
+    return "/".join([destination.rstrip("/")] + [f"{column['name']}={column['value']}" for column in partition_columns])
+
+
+def written_files(spark: SparkSession, path: str) -> Dict[str, int]:
+    """
+    Sizes of the Parquet files written to a path, by file name, using Hadoop's file system so that
+    it works for local paths and S3 alike. There are none if the path doesn't exist.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session with the Hadoop configuration to use
+    path : str
+        Path of the directory the files were written to
+
+    Returns
+    -------
+    dict
+        Sizes of the files, in bytes, by name, in the order they're listed
+    """
+
+    # pylint: disable=protected-access
+    hadoop_path = spark._jvm.org.apache.hadoop.fs.Path(path)  # type: ignore[union-attr]
+    file_system = hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration())
+    if not file_system.exists(hadoop_path):
+        return {}
+
+    return {
+        status.getPath().getName(): status.getLen()
+        for status in file_system.listStatus(hadoop_path)
+        if status.isFile() and status.getPath().getName().startswith("part-")
+    }
+
+
+def written_file_sizes(spark: SparkSession, path: str) -> List[int]:
+    """
+    Sizes of the Parquet files written to a path, in bytes, in the order they're listed, see
+    `written_files`.
+    """
+
+    return list(written_files(spark, path).values())
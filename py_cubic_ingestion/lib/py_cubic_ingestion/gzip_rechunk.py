@@ -0,0 +1,158 @@
+"""
+Re-chunking of large gzipped CSV loads. A '.csv.gz' file can't be split, so Spark reads and
+parses it in a single task. Streaming the file once and writing it back out as several smaller
+chunks, each with the header row, lets Spark read the chunks with a task each.
+
+Chunks only end on record boundaries: a line break is only the end of a record when it's not
+inside a quoted field. Quotes inside quoted fields are escaped by doubling them, as Qlik does,
+so a line break is inside a quoted field when an odd number of quotes came before it.
+"""
+
+from mypy_boto3_s3.client import S3Client
+from typing import IO, Callable, Iterable, Tuple, cast
+from urllib.parse import urlparse
+import gzip
+import os
+import tempfile
+
+# size of the chunks, before compression
+DEFAULT_CHUNK_SIZE_BYTES = 128 * 1024 * 1024
+
+
+def rechunk_lines(
+    lines: Iterable[bytes], open_chunk: Callable[[int], IO[bytes]], chunk_size_bytes: int = DEFAULT_CHUNK_SIZE_BYTES
+) -> int:
+    """
+    Write the lines of a CSV file out as chunks of whole records, each starting with the header.
+
+    Parameters
+    ----------
+    lines : Iterable
+        Lines of the CSV file, starting with the header, including their line breaks
+    open_chunk : Callable
+        Opens the chunk with the index for writing, the chunk is closed once written
+    chunk_size_bytes : int
+        Size after which a chunk ends at the next record boundary
+
+    Returns
+    -------
+    int
+        Number of chunks written, at least one even if there are no records
+    """
+
+    line_iterator = iter(lines)
+    header = next(line_iterator, b"")
+
+    chunk_count = 0
+    chunk = None
+    chunk_size = 0
+    in_quotes = False
+
+    for line in line_iterator:
+        if chunk is None:
+            chunk = open_chunk(chunk_count)
+            chunk.write(header)
+            chunk_count += 1
+
+        chunk.write(line)
+        chunk_size += len(line)
+        if line.count(b'"') % 2 == 1:
+            in_quotes = not in_quotes
+
+        if not in_quotes and chunk_size >= chunk_size_bytes:
+            chunk.close()
+            chunk = None
+            chunk_size = 0
+
+    if chunk is not None:
+        chunk.close()
+    elif chunk_count == 0:
+        # keep files without any records, as a chunk with just the header
+        with open_chunk(0) as empty_chunk:
+            empty_chunk.write(header)
+        chunk_count = 1
+
+    return chunk_count
+
+
+def chunk_name(index: int) -> str:
+    return f"part-{index:05d}.csv.gz"
+
+
+def split_s3_uri(uri: str) -> Tuple[str, str]:
+    """
+    Bucket and key of an 's3://bucket/key' URI.
+    """
+
+    parsed_uri = urlparse(uri)
+
+    return (parsed_uri.netloc, parsed_uri.path.lstrip("/"))
+
+
+def rechunk_s3_object(
+    s3_client: S3Client, source_uri: str, destination_uri: str, chunk_size_bytes: int = DEFAULT_CHUNK_SIZE_BYTES
+) -> int:
+    """
+    Stream a '.csv.gz' object from S3 and upload it again as gzipped chunks under a prefix.
+
+    Parameters
+    ----------
+    s3_client : S3Client
+        Boto3 client for S3
+    source_uri : str
+        URI of the object, such as the load's `source_s3_key`
+    destination_uri : str
+        URI of the prefix to upload the chunks under, ending with a '/'
+    chunk_size_bytes : int
+        Size of the chunks, before compression
+
+    Returns
+    -------
+    int
+        Number of chunks uploaded
+    """
+
+    source_bucket, source_key = split_s3_uri(source_uri)
+    destination_bucket, destination_prefix = split_s3_uri(destination_uri)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        def upload_chunk(index: int) -> None:
+            path = os.path.join(directory, chunk_name(index))
+            s3_client.upload_file(path, destination_bucket, f"{destination_prefix}{chunk_name(index)}")
+            os.remove(path)
+
+        def open_chunk(index: int) -> IO[bytes]:
+            # upload the previous chunk once it's written, so only one chunk is on disk at a time
+            if index > 0:
+                upload_chunk(index - 1)
+
+            # note: chunks are compressed quickly, they're only read once
+            return cast(IO[bytes], gzip.open(os.path.join(directory, chunk_name(index)), "wb", compresslevel=1))
+
+        response = s3_client.get_object(Bucket=source_bucket, Key=source_key)
+        with gzip.GzipFile(fileobj=response["Body"]) as source_file:
+            chunk_count = rechunk_lines(source_file, open_chunk, chunk_size_bytes)
+
+        upload_chunk(chunk_count - 1)
+
+    return chunk_count
+
+
+def delete_s3_chunks(s3_client: S3Client, destination_uri: str, chunk_count: int) -> None:
+    """
+    Delete the chunks uploaded by `rechunk_s3_object`.
+    """
+
+    destination_bucket, destination_prefix = split_s3_uri(destination_uri)
+
+    for start in range(0, chunk_count, 1000):
+        s3_client.delete_objects(
+            Bucket=destination_bucket,
+            Delete={
+                "Objects": [
+                    {"Key": f"{destination_prefix}{chunk_name(index)}"}
+                    for index in range(start, min(start + 1000, chunk_count))
+                ]
+            },
+        )
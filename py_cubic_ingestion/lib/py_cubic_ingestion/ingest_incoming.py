@@ -1,13 +1,16 @@
 """
 Module contains the 'run' function utilized by the Glue Job defined
-in `aws/s3/glue_jobs/cubic_ingestion/ingest_incoming.py`.
+in `aws/s3/glue_jobs/cubic_ingestion/ingest_incoming.py`, and the 'run_stream' function of
+`aws/s3/glue_jobs/cubic_ingestion/ingest_incoming_stream.py`.
 """
 
 from awsglue.context import GlueContext  # pylint: disable=import-error
 from awsglue.job import Job  # pylint: disable=import-error
 from awsglue.utils import getResolvedOptions  # pylint: disable=import-error
-from py_cubic_ingestion import job_helpers
+from py_cubic_ingestion import data_layout, job_helpers, load_pipeline, load_runner, schema_cache, stream_ingest
+from pyspark.conf import SparkConf
 from pyspark.context import SparkContext
+from pyspark.sql.dataframe import DataFrame
 import boto3
 import sys
 
@@ -18,45 +21,92 @@ def run() -> None:
     Springboard bucket.
     """
 
-    glue_context = GlueContext(SparkContext())
-    spark = glue_context.spark_session
-    # spark config for allowing overwriting a specific partition
-    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
-    args = getResolvedOptions(sys.argv, ["JOB_NAME", "ENV", "INPUT"])
-
-    # glue client
-    glue_client = boto3.client("glue")
+    args = getResolvedOptions(sys.argv, ["JOB_NAME", "JOB_RUN_ID", "ENV", "INPUT"])
 
     # read arguments
     job_name = args["JOB_NAME"]
     # parse out ENV and INPUT into dicts
     env_dict, input_dict = job_helpers.parse_args(args["ENV"], args["INPUT"])
 
+    # optionally run the loads concurrently, each in its own FAIR scheduler pool, and with its own
+    # job group, see `load_runner`
+    spark_conf = SparkConf()
+    if int(env_dict.get("LOAD_CONCURRENCY", 1)) > 1:
+        spark_conf.set("spark.scheduler.mode", "FAIR")
+        load_runner.pin_threads()
+
+    glue_context = GlueContext(SparkContext(conf=spark_conf))
+    spark = glue_context.spark_session
+    # spark config for allowing overwriting a specific partition
+    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
+    data_layout.disable_planned_write(spark)
+
+    def read_dynamic_frame(load: dict, source_path: str) -> DataFrame:
+        """
+        Reads the CSV file(s) of a load, at the source path.
+        """
+
+        # create table dataframe using the data catalog table in glue
+        table_df: DataFrame = glue_context.create_dynamic_frame.from_catalog(
+            database=env_dict["GLUE_DATABASE_INCOMING"],
+            table_name=load["source_table_name"],
+            additional_options={"paths": [source_path]},
+            transformation_ctx="table_df_read",
+        ).toDF()
+
+        return table_df
+
+    # note: clients are created once, as they are thread-safe but creating them isn't
+    pipeline = load_pipeline.LoadPipeline(spark, env_dict, boto3.client("glue"), boto3.client("s3"), read_dynamic_frame)
+
     # create job using the glue context
     job = Job(glue_context)
     # initialize job
     job.init(job_name, args)
 
     # run glue transformations for each cubic load
-    for load in input_dict.get("loads", []):
-        destination_schema_fields = job_helpers.get_glue_table_schema_fields_by_load(
-            glue_client,
-            env_dict["GLUE_DATABASE_SPRINGBOARD"],
-            load["destination_table_name"],
-        )
+    pipeline.run(input_dict.get("loads", []), job_name, args["JOB_RUN_ID"])
+
+    job.commit()
 
-        # create table dataframe using the data catalog table in glue
-        table_df = glue_context.create_dynamic_frame.from_catalog(
-            database=env_dict["GLUE_DATABASE_INCOMING"],
-            table_name=load["source_table_name"],
-            additional_options={"paths": [load["source_s3_key"]]},
-            transformation_ctx="table_df_read",
-        )
 
-        # cast columns with the springboard schema
-        updated_table_df = job_helpers.df_with_updated_schema(table_df.toDF(), destination_schema_fields)
+def run_stream() -> None:
+    """
+    Streams the CSV files of the Incoming tables of the job's INPUT to the Springboard bucket, as
+    Parquet files, until the streams stop or one of them fails, see `stream_ingest`.
+    """
+
+    args = getResolvedOptions(sys.argv, ["JOB_NAME", "ENV", "INPUT"])
+    env_dict, input_dict = job_helpers.parse_args(args["ENV"], args["INPUT"])
+    tables = input_dict.get("tables", [])
 
-        # write out to springboard bucket using the same prefix as incoming
-        job_helpers.write_parquet(updated_table_df, load.get("partition_columns", []), load["destination_path"])
+    glue_context = GlueContext(SparkContext())
+    spark = glue_context.spark_session
+    # spark config for allowing overwriting a specific partition
+    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
+
+    glue_client = boto3.client("glue")
+    source_schemas = schema_cache.GlueSchemaCache(glue_client, env_dict["GLUE_DATABASE_INCOMING"])
+    destination_schemas = schema_cache.GlueSchemaCache(glue_client, env_dict["GLUE_DATABASE_SPRINGBOARD"])
+    source_schemas.prefetch(table["source_table_name"] for table in tables)
+    destination_schemas.prefetch(table["destination_table_name"] for table in tables)
+
+    job = Job(glue_context)
+    job.init(args["JOB_NAME"], args)
+
+    queries = [
+        stream_ingest.start_stream(
+            spark,
+            table,
+            source_schemas.schema_fields(table["source_table_name"]),
+            destination_schemas.schema_fields(table["destination_table_name"]),
+            env_dict,
+            destination_schemas,
+        )
+        for table in tables
+    ]
+    # note: raises the error of a stream that failed
+    for query in queries:
+        query.awaitTermination()
 
     job.commit()
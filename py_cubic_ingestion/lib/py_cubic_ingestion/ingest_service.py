@@ -0,0 +1,330 @@
+"""
+Long-lived ingestion driver, which keeps one Spark session warm and runs batches of loads, each
+with the same ENV and INPUT as a run of the `ingest_incoming` Glue job, without the minutes of
+starting and stopping Spark for each batch.
+
+Batches are submitted to an `IngestService`, in the process, or through its server, which accepts
+one JSON request per line on a local socket, and answers each with one JSON line:
+
+- {"command": "submit", "ENV": "{...}", "INPUT": "{...}", "batch_id": "...", "wait": true}: queue a
+  batch, with its ENV and INPUT as JSON strings, as passed to the Glue job. The 'batch_id' is
+  optional, and is the id of the metrics summary written to the METRICS_URI. With 'wait', the
+  answer is the batch's result, otherwise its id
+- {"command": "result", "batch_id": "..."}: result of a batch, once it has run
+- {"command": "status"}: health and status of the service, see `IngestService.status`
+- {"command": "drain"}: stop accepting batches, and answer once the queued ones have run
+
+A batch runs its loads with a new `LoadPipeline`, so its ENV only applies to it. Up to
+`max_concurrent_batches` run at the same time, each in its own FAIR scheduler pool, in PySpark's
+pinned thread mode (see `load_runner`).
+
+Usage: python -m py_cubic_ingestion.ingest_service --port 8642 [--master local[*]]
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from mypy_boto3_glue.client import GlueClient
+from mypy_boto3_s3.client import S3Client
+from py_cubic_ingestion import data_layout, job_helpers, load_pipeline, load_runner
+from pyspark.sql.dataframe import DataFrame
+from pyspark.sql.session import SparkSession
+from typing import Callable, Dict, Optional
+import argparse
+import boto3
+import itertools
+import json
+import logging
+import signal
+import socketserver
+import threading
+import time
+
+
+log_prefix = "[py_cubic_ingestion] [ingest_service]"
+
+# results of the batches kept for the 'result' command, the oldest are dropped first
+MAX_RESULTS = 1000
+
+
+class ServiceDrainingError(Exception):
+    """
+    Raised when a batch is submitted to a service that is draining.
+    """
+
+
+class IngestService:
+    """
+    Runs batches of loads with a warm Spark session.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session to run the batches with, with dynamic partition overwrite, and the FAIR
+        scheduler mode to run batches concurrently
+    glue_client : GlueClient
+        Boto3 client for Glue, shared by the batches
+    s3_client : S3Client
+        Boto3 client for S3, shared by the batches
+    max_concurrent_batches : int
+        Maximum number of batches running at the same time
+    read_dynamic_frame : Callable
+        Reads a load's Incoming table at a path as a DataFrame, for the 'dynamic_frame' CSV reader,
+        see `LoadPipeline`. Without it, the batches default to the 'spark' CSV reader, as the ENV of
+        the `ex_cubic_ingestion` app doesn't set a CSV_READER
+    """
+
+    def __init__(
+        self,
+        spark: SparkSession,
+        glue_client: GlueClient,
+        s3_client: S3Client,
+        max_concurrent_batches: int = 1,
+        read_dynamic_frame: Optional[Callable[[dict, str], DataFrame]] = None,
+    ) -> None:
+        self.spark = spark
+        self.glue_client = glue_client
+        self.s3_client = s3_client
+        self.read_dynamic_frame = read_dynamic_frame
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=load_runner.max_thread_concurrency(spark.sparkContext, max_concurrent_batches),
+            thread_name_prefix="batch",
+        )
+        self.started_at = time.time()
+        self.draining = False
+        self.batch_ids = (f"batch_{number}" for number in itertools.count(1))
+        # futures of the batches, by batch id, in the order they were submitted
+        self.batches: "OrderedDict[str, Future[dict]]" = OrderedDict()
+        self.counts = {"running": 0, "succeeded": 0, "failed": 0}
+        self.lock = threading.Lock()
+
+    def submit(self, env_arg: str, input_arg: str, batch_id: Optional[str] = None) -> str:
+        """
+        Queue a batch, with its ENV and INPUT as passed to the Glue job, and return its id.
+        """
+
+        # fail on invalid arguments when submitting, rather than in the batch's result
+        env_dict, input_dict = job_helpers.parse_args(env_arg, input_arg)
+        if self.read_dynamic_frame is None:
+            if env_dict.get("CSV_READER") == "dynamic_frame":
+                raise ValueError(
+                    "The service has no function to read DynamicFrames, for the 'dynamic_frame' CSV reader"
+                )
+
+            env_dict = {**env_dict, "CSV_READER": env_dict.get("CSV_READER", "spark")}
+
+        with self.lock:
+            if self.draining:
+                raise ServiceDrainingError("The service is draining, and doesn't accept batches")
+
+            batch_id = batch_id or next(self.batch_ids)
+            if batch_id in self.batches:
+                raise ValueError(f"Batch '{batch_id}' was already submitted")
+
+            self.batches[batch_id] = self.executor.submit(self.run_batch, batch_id, env_dict, input_dict)
+            # note: batches that haven't run yet are always kept
+            while len(self.batches) > MAX_RESULTS and next(iter(self.batches.values())).done():
+                self.batches.popitem(last=False)
+
+        logging.info("%s Batch %s submitted", log_prefix, batch_id)
+
+        return batch_id
+
+    def run_batch(self, batch_id: str, env_dict: dict, input_dict: dict) -> dict:
+        """
+        Run the loads of a batch, in the batch's scheduler pool, and return its result.
+
+        Parameters
+        ----------
+        batch_id : str
+            Id of the batch, also the id of its metrics summary
+        env_dict : dict
+            The batch's ENV
+        input_dict : dict
+            The batch's INPUT, with its 'loads'
+
+        Returns
+        -------
+        dict
+            'batch_id', 'status' ('succeeded' or 'failed'), 'seconds', and the 'summary' of the
+            run's metrics (see `LoadPipeline.run`) or the 'error'
+        """
+
+        with self.lock:
+            self.counts["running"] += 1
+
+        self.spark.sparkContext.setLocalProperty("spark.scheduler.pool", batch_id)
+        start = time.monotonic()
+        result: Dict[str, object] = {"batch_id": batch_id}
+
+        try:
+            pipeline = load_pipeline.LoadPipeline(
+                self.spark, env_dict, self.glue_client, self.s3_client, self.read_dynamic_frame
+            )
+            result["summary"] = pipeline.run(input_dict.get("loads", []), "ingest_service", batch_id)
+            result["status"] = "succeeded"
+        except Exception as exc:  # pylint: disable=broad-except
+            # isolate the failure to this batch, the service keeps running the others
+            logging.exception("%s Batch %s failed", log_prefix, batch_id)
+            result["status"] = "failed"
+            result["error"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            self.spark.sparkContext.setLocalProperty("spark.scheduler.pool", None)  # type: ignore[arg-type]
+
+        result["seconds"] = time.monotonic() - start
+        logging.info("%s Batch %s %s in %.1f seconds", log_prefix, batch_id, result["status"], result["seconds"])
+
+        with self.lock:
+            self.counts["running"] -= 1
+            self.counts[str(result["status"])] += 1
+
+        return result
+
+    def result(self, batch_id: str, timeout: Optional[float] = None) -> dict:
+        """
+        Result of a batch, see `run_batch`, waiting up to `timeout` seconds for it to run.
+        """
+
+        with self.lock:
+            if batch_id not in self.batches:
+                raise KeyError(f"Unknown batch '{batch_id}'")
+            future = self.batches[batch_id]
+
+        return future.result(timeout)
+
+    def status(self) -> dict:
+        """
+        Health and status of the service: its 'state' ('running' or 'draining'), whether its Spark
+        context is still up, the number of batches 'queued', 'running', 'succeeded' and 'failed',
+        and its 'uptime_seconds'.
+        """
+
+        # pylint: disable=protected-access
+        spark_up = self.spark.sparkContext._jsc is not None and not self.spark.sparkContext._jsc.sc().isStopped()
+
+        with self.lock:
+            submitted = sum(1 for future in self.batches.values() if not future.done())
+            return {
+                "state": "draining" if self.draining else "running",
+                "healthy": spark_up,
+                "queued": max(submitted - self.counts["running"], 0),
+                **self.counts,
+                "uptime_seconds": time.time() - self.started_at,
+            }
+
+    def drain(self) -> None:
+        """
+        Stop accepting batches, and wait for the submitted ones to run.
+        """
+
+        with self.lock:
+            self.draining = True
+
+        logging.info("%s Draining", log_prefix)
+        self.executor.shutdown(wait=True)
+        logging.info("%s Drained: %s", log_prefix, json.dumps(self.status()))
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers the JSON requests of a connection, one per line, see the module's documentation.
+    """
+
+    server: "IngestServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                response = self.server.answer(json.loads(line))
+            except Exception as exc:  # pylint: disable=broad-except
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class IngestServer(socketserver.ThreadingTCPServer):
+    """
+    Server of an `IngestService`, with a thread for each connection.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service: IngestService, host: str, port: int) -> None:
+        self.service = service
+        super().__init__((host, port), RequestHandler)
+
+    def answer(self, request: dict) -> dict:
+        """
+        Answer to a request, see the module's documentation.
+        """
+
+        command = request.get("command")
+
+        if command == "submit":
+            batch_id = self.service.submit(request["ENV"], request["INPUT"], request.get("batch_id"))
+            return self.service.result(batch_id) if request.get("wait") else {"batch_id": batch_id}
+
+        if command == "result":
+            return self.service.result(request["batch_id"])
+
+        if command == "status":
+            return self.service.status()
+
+        if command == "drain":
+            self.service.drain()
+            # note: shutdown waits for `serve_forever` to return, which it can't do in this thread
+            threading.Thread(target=self.shutdown).start()
+            return self.service.status()
+
+        raise ValueError(f"Unknown command '{command}', expected 'submit', 'result', 'status' or 'drain'")
+
+
+def run() -> None:
+    """
+    Start a Spark session, and serve batches of loads until drained, or until SIGTERM or SIGINT.
+    """
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    arg_parser.add_argument("--port", type=int, default=8642, help="port to listen on")
+    arg_parser.add_argument("--master", help="Spark master, such as 'local[*]' to run on local Spark")
+    arg_parser.add_argument("--max-concurrent-batches", type=int, default=1, help="batches running at the same time")
+    args = arg_parser.parse_args()
+
+    # note: the batches' scheduler pools and job groups are local properties of their threads
+    load_runner.pin_threads()
+    builder = SparkSession.builder.appName("ingest_service")
+    if args.master:
+        builder = builder.master(args.master)
+    # run the batches concurrently, each in its own FAIR scheduler pool
+    spark = builder.config("spark.scheduler.mode", "FAIR").getOrCreate()
+    # spark config for allowing overwriting a specific partition
+    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
+    data_layout.disable_planned_write(spark)
+
+    # note: clients are created once, as they are thread-safe but creating them isn't
+    service = IngestService(spark, boto3.client("glue"), boto3.client("s3"), args.max_concurrent_batches)
+    server = IngestServer(service, args.host, args.port)
+
+    def stop(signal_number: int, frame: object) -> None:  # pylint: disable=unused-argument
+        logging.info("%s Received signal %s", log_prefix, signal_number)
+        threading.Thread(target=server.answer, args=({"command": "drain"},)).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logging.info("%s Listening on %s:%s", log_prefix, *server.server_address[:2])
+    with server:
+        server.serve_forever()
+
+    spark.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run()
@@ -4,28 +4,83 @@ in the Glue Job.
 """
 
 from mypy_boto3_glue.client import GlueClient
-from py_cubic_ingestion import custom_udfs
+from py_cubic_ingestion import (
+    cast_accounting,
+    conversion_cache,
+    custom_udfs,
+    load_metrics,
+    native_casts,
+    schema_cache,
+    vectorized_udfs,
+)
+from pyspark.accumulators import Accumulator
+from pyspark.sql.column import Column
 from pyspark.sql.dataframe import DataFrame
-from pyspark.sql.functions import col, lit, udf
-from pyspark.sql.types import DateType, DoubleType, LongType, TimestampType
-from typing import Tuple
+from pyspark.sql.functions import col, lit, pandas_udf, udf
+from pyspark.sql.session import SparkSession
+from pyspark.sql.types import (
+    DataType,
+    DateType,
+    DoubleType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+from typing import Callable, Dict, Optional, Tuple
 import json
 import logging
 
-
-# helper variables
-athena_type_to_spark_type = {
-    "string": "string",
-    "bigint": "long",
-    "double": "double",
-    "date": "date",
-    "timestamp": "timestamp",
-}
-
 as_long_udf = udf(custom_udfs.as_long, LongType())
 as_double_udf = udf(custom_udfs.as_double, DoubleType())
-as_date_udf = udf(custom_udfs.as_date, DateType())
-as_timestamp_udf = udf(custom_udfs.as_timestamp, TimestampType())
+
+
+def as_date_udf(column_name: str) -> Column:
+    """
+    UDF casting a column to dates, with its own parser so that it learns the layout of the column.
+    """
+
+    return udf(custom_udfs.column_as_date(), DateType())(column_name)
+
+
+def as_timestamp_udf(column_name: str) -> Column:
+    """
+    UDF casting a column to timestamps, with its own parser so that it learns the layout of the column.
+    """
+
+    return udf(custom_udfs.column_as_timestamp(), TimestampType())(column_name)
+
+
+# note: the type of pandas UDF is inferred from type hints, which pyspark's stubs don't cover
+as_long_pandas_udf = pandas_udf(vectorized_udfs.as_long, LongType())  # type: ignore[call-overload]
+as_double_pandas_udf = pandas_udf(vectorized_udfs.as_double, DoubleType())  # type: ignore[call-overload]
+as_date_pandas_udf = pandas_udf(vectorized_udfs.as_date, DateType())  # type: ignore[call-overload]
+as_timestamp_pandas_udf = pandas_udf(vectorized_udfs.as_timestamp, TimestampType())  # type: ignore[call-overload]
+
+# casting engines available to 'df_with_updated_schema', by Spark type. 'udf' sends one value
+# at a time to Python, 'pandas' sends Arrow batches to the vectorized versions of the UDFs, and
+# 'native' casts with Spark SQL expressions, without any Python workers
+cast_engines = {
+    "udf": {
+        "long": as_long_udf,
+        "double": as_double_udf,
+        "date": as_date_udf,
+        "timestamp": as_timestamp_udf,
+    },
+    "pandas": {
+        "long": as_long_pandas_udf,
+        "double": as_double_pandas_udf,
+        "date": as_date_pandas_udf,
+        "timestamp": as_timestamp_pandas_udf,
+    },
+    "native": {
+        "long": native_casts.as_long,
+        "double": native_casts.as_double,
+        "date": native_casts.as_date,
+        "timestamp": native_casts.as_timestamp,
+    },
+}
 
 
 def parse_args(env_arg: str, input_arg: str) -> Tuple[dict, dict]:
@@ -97,13 +152,90 @@ def get_glue_table_schema_fields_by_load(glue_client: GlueClient, database_name:
 
     response = glue_client.get_table(DatabaseName=database_name, Name=table_name)
 
-    return [
-        {"name": column["Name"], "type": athena_type_to_spark_type.get(column["Type"], "string")}
-        for column in response["Table"]["StorageDescriptor"]["Columns"]
-    ]
+    return schema_cache.schema_fields_from_table(dict(response["Table"]))
+
+
+def udf_casts(
+    cache_size: int = 0,
+    cache_stats: "Optional[Accumulator[Dict[str, int]]]" = None,
+    python_seconds: "Optional[Accumulator[Dict[str, float]]]" = None,
+    cast_failures: "Optional[Accumulator[Dict[str, dict]]]" = None,
+) -> Dict[str, Callable[[str], Column]]:
+    """
+    Casts of the 'udf' engine, with the conversions optionally going through the caches of
+    `conversion_cache` in each Python worker, optionally accounting for the values that can't be
+    cast (see `cast_accounting`), and optionally timed.
+
+    Parameters
+    ----------
+    cache_size : int
+        Maximum number of values in the cache of each type, 0 for no cache
+    cache_stats : Accumulator
+        Optional Spark accumulator, from `conversion_cache.StatsAccumulatorParam`, for the cache stats
+    python_seconds : Accumulator
+        Optional Spark accumulator, from `load_metrics.SecondsAccumulatorParam`, for the seconds
+        spent in the conversions of each type (see `load_metrics.timed`)
+    cast_failures : Accumulator
+        Optional Spark accumulator, from `cast_accounting.FailuresAccumulatorParam`, for the values
+        that can't be cast, which are then cast to NULL
+
+    Returns
+    -------
+    dict
+        Casts by Spark type, like the ones in `cast_engines`
+    """
+
+    def python_udf(name: str, conversion: Callable[[], Callable], return_type: DataType) -> Callable[[str], Column]:
+        def cast(column_name: str) -> Column:
+            # each column gets its own conversion, as with `as_date_udf`, but they share the cache
+            convert = conversion()
+            if cache_size:
+                convert = conversion_cache.cached(name, convert, cache_size, cache_stats)
+            # note: failures are accounted for outside of the cache, which only has successful conversions
+            if cast_failures is not None:
+                convert = cast_accounting.accounted(column_name, convert, cast_failures)
+            if python_seconds is not None:
+                convert = load_metrics.timed(name, convert, python_seconds)
+
+            return udf(convert, return_type)(column_name)
 
+        return cast
 
-def df_with_updated_schema(df: DataFrame, schema_fields: list) -> DataFrame:
+    return {
+        "long": python_udf("long", lambda: custom_udfs.as_long, LongType()),
+        "double": python_udf("double", lambda: custom_udfs.as_double, DoubleType()),
+        "date": python_udf("date", custom_udfs.column_as_date, DateType()),
+        "timestamp": python_udf("timestamp", custom_udfs.column_as_timestamp, TimestampType()),
+    }
+
+
+def timed_pandas_casts(python_seconds: "Accumulator[Dict[str, float]]") -> Dict[str, Callable[[str], Column]]:
+    """
+    Casts of the 'pandas' engine, with the seconds spent in each batch's conversion added to the
+    accumulator (see `load_metrics.timed`).
+    """
+
+    def timed_pandas_udf(name: str, convert: Callable, return_type: DataType) -> Callable[[str], Column]:
+        # note: the wrapper keeps the type hints the type of pandas UDF is inferred from
+        return pandas_udf(load_metrics.timed(name, convert, python_seconds), return_type)  # type: ignore
+
+    return {
+        "long": timed_pandas_udf("long", vectorized_udfs.as_long, LongType()),
+        "double": timed_pandas_udf("double", vectorized_udfs.as_double, DoubleType()),
+        "date": timed_pandas_udf("date", vectorized_udfs.as_date, DateType()),
+        "timestamp": timed_pandas_udf("timestamp", vectorized_udfs.as_timestamp, TimestampType()),
+    }
+
+
+def df_with_updated_schema(
+    df: DataFrame,
+    schema_fields: list,
+    cast_engine: str = "udf",
+    cache_size: int = 0,
+    cache_stats: "Optional[Accumulator[Dict[str, int]]]" = None,
+    python_seconds: "Optional[Accumulator[Dict[str, float]]]" = None,
+    cast_failures: "Optional[Accumulator[Dict[str, dict]]]" = None,
+) -> DataFrame:
     """
     Construct a new DataFrame with an updated schema. Columns will
     be cast with the indicated type. If unable to cast, Spark will
@@ -115,6 +247,19 @@ def df_with_updated_schema(df: DataFrame, schema_fields: list) -> DataFrame:
         DataFrame containing the data
     schema_fields : list
         List of fields that will be used to update the schema
+    cast_engine : str
+        Name of the engine in `cast_engines` to cast the columns with
+    cache_size : int
+        If set, the 'udf' engine caches up to this many converted values of each type (see
+        `conversion_cache`), which helps with columns with few distinct values
+    cache_stats : Accumulator
+        Optional Spark accumulator, from `conversion_cache.StatsAccumulatorParam`, for the cache stats
+    python_seconds : Accumulator
+        Optional Spark accumulator, from `load_metrics.SecondsAccumulatorParam`, for the seconds
+        spent converting values in the Python workers, by type
+    cast_failures : Accumulator
+        If set, the 'udf' engine adds the values that can't be cast to this Spark accumulator, from
+        `cast_accounting.FailuresAccumulatorParam`, and casts them to NULL instead of failing
 
     Returns
     -------
@@ -122,26 +267,84 @@ def df_with_updated_schema(df: DataFrame, schema_fields: list) -> DataFrame:
         Updated DataFrame containing an updated schema
     """
 
+    if cast_engine not in cast_engines:
+        raise ValueError(f"Unknown cast engine '{cast_engine}', expected one of: {', '.join(cast_engines)}")
+
+    if cache_size and cast_engine != "udf":
+        raise ValueError(f"Caching converted values is only supported by the 'udf' cast engine, not '{cast_engine}'")
+
+    if cast_failures is not None and cast_engine != "udf":
+        raise ValueError(f"Cast accounting is only supported by the 'udf' cast engine, not '{cast_engine}'")
+
+    casts = cast_engines[cast_engine]
+    if cast_engine == "udf" and (cache_size or python_seconds is not None or cast_failures is not None):
+        casts = udf_casts(cache_size, cache_stats, python_seconds, cast_failures)
+    elif cast_engine == "pandas" and python_seconds is not None:
+        casts = timed_pandas_casts(python_seconds)
+
     columns = []
     for field in schema_fields:
         field_name = field["name"]
         column = col(field_name)
 
         # override if we can cast successfully
-        if field["type"] == "long":
-            column = as_long_udf(field_name)
-        elif field["type"] == "double":
-            column = as_double_udf(field_name)
-        elif field["type"] == "date":
-            column = as_date_udf(field_name)
-        elif field["type"] == "timestamp":
-            column = as_timestamp_udf(field_name)
+        # note: the precise types, such as decimals, are always cast natively, see `native_casts.precise_cast`
+        precise_cast = native_casts.precise_cast(field["type"])
+        if field["type"] in casts:
+            column = casts[field["type"]](field_name)
+        elif precise_cast is not None:
+            column = precise_cast(field_name)
 
         columns.append(column.alias(field_name))
 
     return df.select(columns)
 
 
+# options of Spark's CSV reader for the files in Incoming, also read as a stream by `stream_ingest`
+csv_options = {
+    "header": "true",
+    "encoding": "UTF-8",
+    # quoted fields can have line breaks, and quotes are escaped by doubling them
+    "multiLine": "true",
+    "quote": '"',
+    "escape": '"',
+    # rows that don't match the schema fail the read, instead of becoming NULLs
+    "mode": "FAILFAST",
+}
+
+
+def csv_schema(schema_fields: list) -> StructType:
+    """
+    Schema of the CSV files of an Incoming table, with all the columns as strings (see ADR 0007).
+    """
+
+    return StructType([StructField(field["name"], StringType()) for field in schema_fields])
+
+
+def df_from_csv(spark: SparkSession, source_path: str, schema_fields: list) -> DataFrame:
+    """
+    Read a CSV file from Incoming directly with Spark's CSV reader, as an alternative to reading
+    it as a DynamicFrame from the Glue catalog. All the columns are read as strings (see ADR 0007),
+    in the order of the Incoming catalog table's columns, and the header row is skipped.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session to read with
+    source_path : str
+        Path to the CSV file, such as the load's `source_s3_key`
+    schema_fields : list
+        List of fields of the Incoming table, only their names are used
+
+    Returns
+    -------
+    DataFrame
+        DataFrame containing the data
+    """
+
+    return spark.read.schema(csv_schema(schema_fields)).options(**csv_options).csv(source_path)
+
+
 def df_with_partition_columns(df: DataFrame, partition_columns: list) -> DataFrame:
     """
     Construct a new DataFrame with partition columns added
@@ -165,7 +368,13 @@ def df_with_partition_columns(df: DataFrame, partition_columns: list) -> DataFra
     return df
 
 
-def write_parquet(df: DataFrame, partition_columns: list, destination: str) -> None:
+def write_parquet(
+    df: DataFrame,
+    partition_columns: list,
+    destination: str,
+    max_records_per_file: int = 0,
+    writer_options: Optional[Dict[str, str]] = None,
+) -> None:
     """
     Write a DataFrame to Parquet in the designated path
 
@@ -177,8 +386,50 @@ def write_parquet(df: DataFrame, partition_columns: list, destination: str) -> N
         List of dicts with partition information
     destination : str
         Path to write to
+    max_records_per_file : int
+        Maximum number of rows in each file, 0 for no limit
+    writer_options : dict
+        Options of the Parquet writer, such as from `writer_profiles.writer_options`
+    """
+
+    write_partitioned_parquet(
+        df_with_partition_columns(df, partition_columns),
+        [column["name"] for column in partition_columns],
+        destination,
+        max_records_per_file,
+        writer_options,
+    )
+
+
+def write_partitioned_parquet(
+    df: DataFrame,
+    partition_column_names: list,
+    destination: str,
+    max_records_per_file: int = 0,
+    writer_options: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Write a DataFrame that already has its partition columns to Parquet in the designated path,
+    overwriting the partitions it has data for
+
+    Parameters
+    ----------
+    df : DataFrame
+        DataFrame containing the data and the partition columns
+    partition_column_names : list
+        Names of the partition columns
+    destination : str
+        Path to write to
+    max_records_per_file : int
+        Maximum number of rows in each file, 0 for no limit
+    writer_options : dict
+        Options of the Parquet writer, such as from `writer_profiles.writer_options`
     """
 
-    df_with_partition_columns(df, partition_columns).write.mode("overwrite").partitionBy(
-        [column["name"] for column in partition_columns]
-    ).parquet(destination)
+    writer = df.write.mode("overwrite")
+    if max_records_per_file > 0:
+        writer = writer.option("maxRecordsPerFile", max_records_per_file)
+    if writer_options:
+        writer = writer.options(**writer_options)
+
+    writer.partitionBy(partition_column_names).parquet(destination)
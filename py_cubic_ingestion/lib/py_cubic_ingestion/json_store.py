@@ -0,0 +1,120 @@
+"""
+Stores of JSON entries by key, on local disk or under an S3 prefix (such as the operations
+prefix), shared by the schemas of `schema_cache`, the manifests of `load_manifests`, the profiles
+of `column_profiler` and the run summaries of `load_metrics`.
+
+Keys can have '/', such as '<database name>/<table name>', and each entry is a JSON file named
+'<key>.json'.
+"""
+
+from abc import ABC, abstractmethod
+from botocore.exceptions import ClientError
+from mypy_boto3_s3.client import S3Client
+from typing import Optional
+from urllib.parse import urlparse
+import json
+import os
+
+
+class JsonStore(ABC):
+    """
+    Store of JSON entries by key.
+    """
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[dict]:
+        """
+        Entry stored with the key, None if there isn't one.
+        """
+
+    @abstractmethod
+    def write(self, key: str, entry: dict) -> None:
+        """
+        Store the entry with the key, replacing any previous one.
+        """
+
+
+class LocalJsonStore(JsonStore):
+    """
+    Entries as JSON files in a local directory.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def read(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.path(key), encoding="utf-8") as entry_file:
+                entry: dict = json.load(entry_file)
+                return entry
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: str, entry: dict) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as entry_file:
+            json.dump(entry, entry_file)
+
+
+class S3JsonStore(JsonStore):
+    """
+    Entries as JSON objects under an S3 prefix.
+    """
+
+    def __init__(self, s3_client: S3Client, bucket: str, prefix: str) -> None:
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.json"
+
+    def read(self, key: str) -> Optional[dict]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") == "NoSuchKey":
+                return None
+
+            raise error
+
+        entry: dict = json.loads(response["Body"].read())
+        return entry
+
+    def write(self, key: str, entry: dict) -> None:
+        self.s3_client.put_object(Bucket=self.bucket, Key=self.object_key(key), Body=json.dumps(entry).encode("utf-8"))
+
+
+def store_from_uri(uri: str, s3_client: Optional[S3Client] = None) -> JsonStore:
+    """
+    Store for a 's3://bucket/prefix/' URI, or for a local directory path.
+
+    Parameters
+    ----------
+    uri : str
+        Location of the store
+    s3_client : S3Client
+        Boto3 client for S3 stores
+
+    Returns
+    -------
+    JsonStore
+        Store at the location
+    """
+
+    parsed_uri = urlparse(uri)
+    if parsed_uri.scheme != "s3":
+        return LocalJsonStore(uri)
+
+    if s3_client is None:
+        raise ValueError(f"An S3 client is required for the store at '{uri}'")
+
+    prefix = parsed_uri.path.lstrip("/")
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+
+    return S3JsonStore(s3_client, parsed_uri.netloc, prefix)
@@ -0,0 +1,111 @@
+"""
+Grouping of the loads of a Glue job run that write to the same destination table, so that they
+are cast and written together, with one Spark job and one commit for the table instead of one for
+each load (such as consecutive change tracking files of 'EDW.SAMPLE__ct').
+
+The loads of a group are unioned, each with the values of its own partition columns, and written
+once partitioned by those columns. With dynamic partition overwrite, each load's partition ends up
+with the same data as when the loads are written one by one. The group is written with the layout
+(see `data_layout`) and writer profile of its loads, so only the loads that have the same ones are
+grouped.
+"""
+
+from functools import reduce
+from py_cubic_ingestion import data_layout, job_helpers
+from pyspark.sql.dataframe import DataFrame
+from typing import Dict, List, Tuple
+
+
+# destination table name and path, partition column names, cluster columns and method, bloom filter
+# columns and writer profile of a load
+GroupKey = Tuple[str, str, Tuple[str, ...], Tuple[str, ...], str, Tuple[str, ...], str]
+
+
+def load_group(loads: List[dict]) -> dict:
+    """
+    Group of loads, which can be run like a load by `load_runner`.
+
+    Parameters
+    ----------
+    loads : list
+        Loads from the job's INPUT, all writing to the same destination table
+
+    Returns
+    -------
+    dict
+        Group with the 'loads', and an 'id' made of the ids of the loads
+    """
+
+    return {"id": "+".join(str(load["id"]) for load in loads), "loads": loads}
+
+
+def group_key(load: dict) -> GroupKey:
+    """
+    Loads with the same key can be written together.
+    """
+
+    return (
+        load["destination_table_name"],
+        load["destination_path"],
+        tuple(column["name"] for column in load.get("partition_columns", [])),
+        tuple(data_layout.cluster_columns(load)),
+        load.get("cluster_method", "sort"),
+        tuple(column_name.lower() for column_name in load.get("bloom_filter_columns", [])),
+        load.get("writer_profile") or "",
+    )
+
+
+def partition_values(load: dict) -> Tuple[str, ...]:
+    return tuple(column["value"] for column in load.get("partition_columns", []))
+
+
+def group_loads(loads: List[dict]) -> List[dict]:
+    """
+    Group the loads that write to the same destination table, with the same layout and writer
+    profile, in the order of their first load.
+
+    Parameters
+    ----------
+    loads : list
+        Loads from the job's INPUT
+
+    Returns
+    -------
+    list
+        Groups of loads, see `load_group`
+    """
+
+    groups: Dict[GroupKey, List[List[dict]]] = {}
+
+    for load in loads:
+        key_groups = groups.setdefault(group_key(load), [[]])
+        # loads writing the same partition can't be unioned, the last one has to overwrite the others
+        if partition_values(load) in [partition_values(group_load) for group_load in key_groups[-1]]:
+            key_groups.append([])
+
+        key_groups[-1].append(load)
+
+    return [load_group(key_group) for key_groups in groups.values() for key_group in key_groups]
+
+
+def df_with_loads(dfs: List[DataFrame], loads: List[dict]) -> DataFrame:
+    """
+    Union of the DataFrames of the loads, each with the values of its partition columns.
+
+    Parameters
+    ----------
+    dfs : list
+        DataFrame of each load, with the same columns
+    loads : list
+        Loads of a group, in the order of `dfs`
+
+    Returns
+    -------
+    DataFrame
+        DataFrame containing the data of all the loads
+    """
+
+    return reduce(
+        DataFrame.unionByName,
+        [job_helpers.df_with_partition_columns(df, load.get("partition_columns", [])) for df, load in zip(dfs, loads)],
+    )
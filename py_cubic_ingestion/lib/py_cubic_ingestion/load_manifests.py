@@ -0,0 +1,96 @@
+"""
+Completion manifests of the loads, so that a retried job run skips the loads that an earlier
+attempt already wrote, instead of reading, casting and writing them all again.
+
+Once the loads of a load group are written (and compacted), a manifest is written for each load,
+keyed by its id, to the store at MANIFEST_URI (see `json_store.store_from_uri`), with:
+
+- the 'fingerprint' of the load: its source key, the size and ETag of the source object (or the
+  modification time of a local file), and its destination path and partition columns
+- the 'output_files' in the load's partition, with their sizes
+- the 'rows_written' to the partition
+
+A load is skipped if its manifest has the same fingerprint, and its partition still has the same
+files. So a load whose source object was replaced, or whose partition was changed since, is
+ingested again.
+"""
+
+from mypy_boto3_s3.client import S3Client
+from py_cubic_ingestion import file_planner, gzip_rechunk, json_store
+from pyspark.sql.session import SparkSession
+from typing import Dict
+import os
+
+
+def source_fingerprint(s3_client: S3Client, source_path: str) -> dict:
+    """
+    Size and ETag of an 's3://' source object, or size and modification time of a local file.
+    """
+
+    if source_path.startswith("s3://"):
+        bucket, key = gzip_rechunk.split_s3_uri(source_path)
+        response = s3_client.head_object(Bucket=bucket, Key=key)
+        return {"size": response["ContentLength"], "etag": response["ETag"]}
+
+    stat = os.stat(source_path)
+
+    return {"size": stat.st_size, "modified_ns": stat.st_mtime_ns}
+
+
+def load_fingerprint(s3_client: S3Client, load: dict) -> dict:
+    """
+    Fingerprint of a load, see the module's documentation.
+    """
+
+    return {
+        "source_s3_key": load["source_s3_key"],
+        **source_fingerprint(s3_client, load["source_s3_key"]),
+        "destination_path": load["destination_path"],
+        "partition_columns": load.get("partition_columns", []),
+    }
+
+
+def is_complete(store: json_store.JsonStore, spark: SparkSession, load: dict, fingerprint: dict) -> bool:
+    """
+    Whether the load's manifest has its fingerprint, and its partition still has the output files
+    of the manifest.
+
+    Parameters
+    ----------
+    store : JsonStore
+        Store of the manifests
+    spark : SparkSession
+        Spark session to list the load's partition with
+    load : dict
+        Load from the job's INPUT
+    fingerprint : dict
+        Current fingerprint of the load, see `load_fingerprint`
+
+    Returns
+    -------
+    bool
+        True if the load can be skipped
+    """
+
+    manifest = store.read(str(load["id"]))
+    if manifest is None or manifest["fingerprint"] != fingerprint:
+        return False
+
+    output_files = file_planner.written_files(
+        spark, file_planner.partition_path(load["destination_path"], load.get("partition_columns", []))
+    )
+
+    return bool(output_files) and output_files == manifest["output_files"]
+
+
+def write_manifest(
+    store: json_store.JsonStore, load: dict, fingerprint: dict, output_files: Dict[str, int], rows_written: int
+) -> None:
+    """
+    Write the manifest of a load that was written, see the module's documentation.
+    """
+
+    store.write(
+        str(load["id"]),
+        {"load_id": load["id"], "fingerprint": fingerprint, "output_files": output_files, "rows_written": rows_written},
+    )
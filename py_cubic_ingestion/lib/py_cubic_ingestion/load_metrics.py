@@ -0,0 +1,182 @@
+"""
+Metrics of the loads of a Glue job run: wall time by stage, input and output sizes, rows read and
+written, and the time spent in Spark tasks and in the Python workers' conversions.
+
+Stage metrics of the Spark jobs are read from the Spark UI's REST API (`/api/v1`), which is the
+same across Spark versions, for the jobs of the job group each load group's write runs in. If the
+UI isn't enabled, those metrics are left out.
+
+Note: as Spark is lazy, the CSV files are read and cast while the Parquet files are written, so the
+'read' and 'cast' wall times only cover setting up the DataFrames, and the time spent reading and
+casting is part of the 'write' time and of the executor and Python times.
+"""
+
+from pyspark.accumulators import Accumulator, AccumulatorParam
+from pyspark.sql.session import SparkSession
+from typing import Callable, Dict, List, Optional, TypeVar
+from urllib.error import URLError
+import functools
+import json
+import logging
+import time
+import urllib.request
+
+T = TypeVar("T")
+
+log_prefix = "[py_cubic_ingestion] [load_metrics]"
+
+
+class SecondsAccumulatorParam(AccumulatorParam):
+    """
+    Spark accumulator of seconds, by name.
+
+    Note: a task adds to its own copy of the accumulator, which is sent to the driver once the task
+    is done, so the driver gets the totals of each partition rather than each value's seconds.
+    """
+
+    def zero(self, value: Dict[str, float]) -> Dict[str, float]:
+        return {}
+
+    def addInPlace(self, value1: Dict[str, float], value2: Dict[str, float]) -> Dict[str, float]:
+        for name, seconds in value2.items():
+            value1[name] = value1.get(name, 0.0) + seconds
+
+        return value1
+
+
+def timed(name: str, convert: Callable[..., T], accumulator: "Accumulator[Dict[str, float]]") -> Callable[..., T]:
+    """
+    Wrap a conversion so that the seconds spent in it are added to the accumulator.
+
+    Parameters
+    ----------
+    name : str
+        Key of the seconds in the accumulator
+    convert : Callable
+        Conversion from `custom_udfs` or `vectorized_udfs`
+    accumulator : Accumulator
+        Spark accumulator, from `SecondsAccumulatorParam`, which sums the seconds of the calls in
+        each task
+
+    Returns
+    -------
+    Callable
+        Conversion with the same results and errors, and type hints, as `convert`
+    """
+
+    # note: the update is reused, as the accumulator only reads it, so a call doesn't create a dict
+    update = {name: 0.0}
+
+    @functools.wraps(convert)
+    def wrapper(*args: object) -> T:
+        start = time.perf_counter()
+        try:
+            return convert(*args)
+        finally:
+            update[name] = time.perf_counter() - start
+            accumulator.add(update)
+
+    return wrapper
+
+
+def ui_api(spark: SparkSession, path: str) -> list:
+    """
+    Response of the Spark UI's REST API for the application, such as 'jobs'.
+    """
+
+    ui_url = spark.sparkContext.uiWebUrl
+    if ui_url is None:
+        raise URLError("the Spark UI isn't enabled")
+
+    with urllib.request.urlopen(
+        f"{ui_url}/api/v1/applications/{spark.sparkContext.applicationId}/{path}", timeout=30
+    ) as response:
+        result: list = json.load(response)
+        return result
+
+
+def job_group_metrics(spark: SparkSession, job_group: str) -> Dict[str, float]:
+    """
+    Stage metrics of the Spark jobs of the job group, summed over their stages.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session the jobs ran in
+    job_group : str
+        Job group, as set with `SparkContext.setJobGroup`
+
+    Returns
+    -------
+    dict
+        Rows and bytes read and written, and the executors' run and CPU seconds, empty if the
+        Spark UI isn't available
+    """
+
+    try:
+        stage_ids = {
+            stage_id
+            for job in ui_api(spark, "jobs")
+            if job.get("jobGroup") == job_group
+            for stage_id in job.get("stageIds", [])
+        }
+        stages = [stage for stage_id in sorted(stage_ids) for stage in ui_api(spark, f"stages/{stage_id}")]
+    except (URLError, OSError, ValueError) as error:
+        logging.warning("%s Stage metrics of %s aren't available: %s", log_prefix, job_group, error)
+        return {}
+
+    # skipped stages, whose output was reused, didn't read or write anything
+    stages = [stage for stage in stages if stage.get("status") != "SKIPPED"]
+
+    return {
+        "rows_read": sum(stage.get("inputRecords", 0) for stage in stages),
+        "input_bytes_read": sum(stage.get("inputBytes", 0) for stage in stages),
+        "rows_written": sum(stage.get("outputRecords", 0) for stage in stages),
+        "output_bytes_written": sum(stage.get("outputBytes", 0) for stage in stages),
+        "executor_run_seconds": sum(stage.get("executorRunTime", 0) for stage in stages) / 1000,
+        "executor_cpu_seconds": sum(stage.get("executorCpuTime", 0) for stage in stages) / 1e9,
+    }
+
+
+def log_metrics(metrics: dict) -> None:
+    """
+    Log the metrics as a single line of JSON, after the log prefix.
+    """
+
+    logging.info("%s %s", log_prefix, json.dumps(metrics, sort_keys=True, default=str))
+
+
+def run_summary(job_name: str, load_group_metrics: List[dict], stage_seconds: Dict[str, float]) -> dict:
+    """
+    Summary of a job run, with the metrics of each load group and the totals of the run.
+
+    Parameters
+    ----------
+    job_name : str
+        Name of the Glue job
+    load_group_metrics : list
+        Metrics of each load group
+    stage_seconds : dict
+        Wall seconds by stage, summed over the load groups
+
+    Returns
+    -------
+    dict
+        Summary, as JSON serializable values
+    """
+
+    def total(key: str) -> Optional[float]:
+        values = [metrics[key] for metrics in load_group_metrics if metrics.get(key) is not None]
+        return sum(values) if values else None
+
+    return {
+        "job_name": job_name,
+        "load_groups": load_group_metrics,
+        "stage_seconds": stage_seconds,
+        "input_bytes": total("input_bytes"),
+        "rows_read": total("rows_read"),
+        "rows_written": total("rows_written"),
+        "output_file_count": total("output_file_count"),
+        "output_bytes": total("output_bytes"),
+        "python_seconds": total("python_seconds"),
+    }
@@ -0,0 +1,582 @@
+"""
+The read, cast and write pipeline of `ingest_incoming`, for the loads of a Glue job run. It's kept
+apart from the Glue job, with the Glue and S3 clients and the reading of DynamicFrames passed in,
+so that it can also run on local Spark, such as in the benchmarks.
+"""
+
+from functools import reduce
+from mypy_boto3_glue.client import GlueClient
+from mypy_boto3_s3.client import S3Client
+from py_cubic_ingestion import (
+    cast_accounting,
+    column_profiler,
+    conversion_cache,
+    ct_compaction,
+    data_layout,
+    dfm_schema,
+    file_planner,
+    gzip_rechunk,
+    job_helpers,
+    json_store,
+    load_groups,
+    load_manifests,
+    load_metrics,
+    load_runner,
+    partition_registry,
+    schema_cache,
+    spark_files,
+    writer_profiles,
+)
+from pyspark.sql.dataframe import DataFrame
+from pyspark.sql.session import SparkSession
+from typing import Callable, Dict, Iterator, List, Optional
+import contextlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+
+log_prefix = "[py_cubic_ingestion] [ingest_incoming]"
+
+
+class LoadPipeline:
+    """
+    Pipeline for the loads of a job run, configured with the job's ENV.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session to run the loads with, with dynamic partition overwrite
+    env_dict : dict
+        The job's ENV
+    glue_client : GlueClient
+        Boto3 client for Glue
+    s3_client : S3Client
+        Boto3 client for S3, shared by the loads
+    read_dynamic_frame : Callable
+        Reads a load's Incoming table at a path as a DataFrame, through a DynamicFrame, for the
+        'dynamic_frame' CSV reader
+    """
+
+    def __init__(
+        self,
+        spark: SparkSession,
+        env_dict: dict,
+        glue_client: GlueClient,
+        s3_client: S3Client,
+        read_dynamic_frame: Optional[Callable[[dict, str], DataFrame]] = None,
+    ) -> None:
+        self.spark = spark
+        self.env_dict = env_dict
+        self.glue_client = glue_client
+        self.s3_client = s3_client
+        self.read_dynamic_frame = read_dynamic_frame
+
+        # optionally run the loads concurrently, each in its own FAIR scheduler pool
+        self.load_concurrency = int(env_dict.get("LOAD_CONCURRENCY", 1))
+
+        # fetch the schemas of all the destination tables at once, optionally keeping them in a store
+        schema_store_uri = env_dict.get("SCHEMA_CACHE_URI")
+        self.destination_schemas = schema_cache.GlueSchemaCache(
+            glue_client,
+            env_dict["GLUE_DATABASE_SPRINGBOARD"],
+            json_store.store_from_uri(schema_store_uri, s3_client) if schema_store_uri else None,
+            float(env_dict.get("SCHEMA_CACHE_MAX_AGE_SECONDS", 0)),
+        )
+
+        # optionally read the CSV files with Spark's CSV reader, with the columns of the Incoming tables
+        self.csv_reader = env_dict.get("CSV_READER", "dynamic_frame")
+        if self.csv_reader not in ["dynamic_frame", "spark"]:
+            raise ValueError(f"Unknown CSV reader '{self.csv_reader}', expected 'dynamic_frame' or 'spark'")
+
+        if self.csv_reader == "dynamic_frame" and read_dynamic_frame is None:
+            raise ValueError("The 'dynamic_frame' CSV reader needs a function to read DynamicFrames")
+
+        self.source_schemas = schema_cache.GlueSchemaCache(glue_client, env_dict["GLUE_DATABASE_INCOMING"])
+
+        # optionally check that the columns of ODS loads have the types of their '.dfm' files, see `dfm_schema`
+        self.dfm_schemas = (
+            dfm_schema.DfmSchemaCache(spark) if str(env_dict.get("DFM_TYPES", "false")).lower() == "true" else None
+        )
+
+        # optionally cache converted values in the Python workers, see `conversion_cache`
+        self.cache_size = int(env_dict.get("CONVERSION_CACHE_SIZE", 0))
+        self.cache_stats = (
+            spark.sparkContext.accumulator({}, conversion_cache.StatsAccumulatorParam()) if self.cache_size else None
+        )
+
+        # optionally re-chunk large gzipped loads into splittable pieces under a prefix, see `gzip_rechunk`
+        self.rechunk_threshold_bytes = int(env_dict.get("RECHUNK_THRESHOLD_BYTES", 0))
+        self.rechunk_chunk_size_bytes = int(
+            env_dict.get("RECHUNK_CHUNK_SIZE_BYTES", gzip_rechunk.DEFAULT_CHUNK_SIZE_BYTES)
+        )
+        if self.rechunk_threshold_bytes > 0 and not env_dict.get("RECHUNK_URI"):
+            raise ValueError("RECHUNK_URI is required to re-chunk loads")
+
+        # optionally plan the number of Parquet files of each load from its size, see `file_planner`
+        self.target_file_size_bytes = int(env_dict.get("TARGET_FILE_SIZE_BYTES", 0))
+        self.output_bytes_per_input_byte = float(
+            env_dict.get("OUTPUT_BYTES_PER_INPUT_BYTE", file_planner.DEFAULT_OUTPUT_BYTES_PER_INPUT_BYTE)
+        )
+        self.input_bytes_per_row = float(env_dict.get("INPUT_BYTES_PER_ROW", 0))
+
+        # optionally account for the values that can't be cast and the rows of the loads, see `cast_accounting`
+        self.cast_accounting = str(env_dict.get("CAST_ACCOUNTING", "false")).lower() == "true"
+        self.cast_failure_limit = int(env_dict.get("CAST_FAILURE_LIMIT", 0))
+
+        # optionally write the Parquet files of each table with the writer profile of its loads, see
+        # `writer_profiles`
+        self.writer_profiles = writer_profiles.profiles_from_json(env_dict.get("WRITER_PROFILES"))
+        self.default_writer_profile = env_dict.get("WRITER_PROFILE", writer_profiles.DEFAULT_PROFILE_NAME)
+        if self.default_writer_profile not in self.writer_profiles:
+            raise ValueError(f"Unknown writer profile '{self.default_writer_profile}'")
+
+        # optionally merge the change tracking loads into current-state tables, see `ct_compaction`
+        self.ct_compaction = str(env_dict.get("CT_COMPACTION", "false")).lower() == "true"
+        self.ct_compaction_buckets = int(env_dict.get("CT_COMPACTION_BUCKETS", ct_compaction.DEFAULT_BUCKET_COUNT))
+
+        # optionally profile the columns of the loads instead of ingesting them, see `column_profiler`
+        self.job_mode = env_dict.get("JOB_MODE", "ingest")
+        if self.job_mode not in ["ingest", "profile"]:
+            raise ValueError(f"Unknown job mode '{self.job_mode}', expected 'ingest' or 'profile'")
+        self.profile_uri = env_dict.get("PROFILE_URI")
+        self.profiles: List[dict] = []
+
+        # optionally skip the loads that an earlier attempt of the run already wrote, see `load_manifests`
+        manifest_uri = env_dict.get("MANIFEST_URI")
+        self.manifests = json_store.store_from_uri(manifest_uri, s3_client) if manifest_uri else None
+        self.load_fingerprints: Dict[int, dict] = {}
+        self.skipped_load_ids: List[int] = []
+
+        # optionally register the partitions of the loads in the Glue catalog, see `partition_registry`
+        self.register_partitions = str(env_dict.get("REGISTER_PARTITIONS", "false")).lower() == "true"
+        self.partition_results: Dict[str, dict] = {}
+        self.compacted_partitions: List[dict] = []
+
+        # optionally time the conversions in the Python workers, which adds to the time of each value
+        self.python_timing = str(env_dict.get("PYTHON_WORKER_TIMING", "false")).lower() == "true"
+        # optionally write a summary of the run's metrics, see `load_metrics`
+        self.metrics_uri = env_dict.get("METRICS_URI")
+
+        # seconds spent in each stage, summed over the loads, and the metrics of each load group
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_seconds_lock = threading.Lock()
+        self.load_group_metrics: List[dict] = []
+        # note: the job groups of the writes are unique to the run, as runs can share a Spark
+        # application, see `ingest_service`
+        self.run_id = uuid.uuid4().hex[:8]
+
+    @contextlib.contextmanager
+    def timed(self, stage: str, group_seconds: Optional[Dict[str, float]] = None) -> Iterator[None]:
+        """
+        Add the time spent in the block to the stage's seconds, and to the load group's.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self.stage_seconds_lock:
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0) + seconds
+
+            if group_seconds is not None:
+                group_seconds[stage] = group_seconds.get(stage, 0) + seconds
+
+    def prefetch(self, loads: List[dict]) -> None:
+        """
+        Fetch the schemas of the tables of all the loads, with a batched call for each database.
+        """
+
+        with self.timed("schemas"):
+            self.destination_schemas.prefetch(load["destination_table_name"] for load in loads)
+            if self.csv_reader == "spark":
+                self.source_schemas.prefetch(load["source_table_name"] for load in loads)
+
+    def loads_to_run(self, loads: List[dict]) -> List[dict]:
+        """
+        Loads without a manifest of an earlier attempt, with their fingerprints kept for their
+        manifests, see `load_manifests`.
+        """
+
+        assert self.manifests is not None
+        loads_to_run = []
+        with self.timed("manifests"):
+            for load in loads:
+                # note: the fingerprint is taken before the load is read, so a source object replaced
+                # while it's read doesn't match the manifest
+                self.load_fingerprints[load["id"]] = load_manifests.load_fingerprint(self.s3_client, load)
+                if load_manifests.is_complete(self.manifests, self.spark, load, self.load_fingerprints[load["id"]]):
+                    logging.info("%s Skipping load %s, written by an earlier attempt", log_prefix, load["id"])
+                    self.skipped_load_ids.append(load["id"])
+                else:
+                    loads_to_run.append(load)
+
+        return loads_to_run
+
+    def register_load_partitions(self, loads: List[dict]) -> None:
+        """
+        Register the partitions of the loads, and of the key buckets of the compacted tables, with a
+        batched call for each destination table, see `partition_registry`.
+        """
+
+        with self.timed("partitions"):
+            self.partition_results.update(
+                partition_registry.register_loads(
+                    self.glue_client, self.destination_schemas, loads + self.compacted_partitions
+                )
+            )
+
+    def writer_options(self, load: dict) -> Dict[str, str]:
+        """
+        Options of the Parquet writer for the load's writer profile.
+        """
+
+        name = writer_profiles.profile_name(load, self.default_writer_profile)
+        if name not in self.writer_profiles:
+            raise ValueError(f"Unknown writer profile '{name}' of load {load['id']}")
+
+        return writer_profiles.writer_options(self.writer_profiles[name])
+
+    def read_load(self, load: dict, source_path: str) -> DataFrame:
+        """
+        Reads the CSV file(s) of a load, at the source path.
+        """
+
+        if self.csv_reader == "spark":
+            return job_helpers.df_from_csv(
+                self.spark, source_path, self.source_schemas.schema_fields(load["source_table_name"])
+            )
+
+        assert self.read_dynamic_frame is not None
+        return self.read_dynamic_frame(load, source_path)
+
+    def ingest_load_group(self, load_group: dict) -> None:
+        """
+        Reads the CSV files of a group of loads for the same destination table (see `load_groups`),
+        and writes them as Parquet with the Springboard schema, in one write.
+        """
+
+        loads = load_group["loads"]
+        group_seconds: Dict[str, float] = {}
+        python_seconds = (
+            self.spark.sparkContext.accumulator({}, load_metrics.SecondsAccumulatorParam())
+            if self.python_timing
+            else None
+        )
+        cast_failures = (
+            self.spark.sparkContext.accumulator({}, cast_accounting.FailuresAccumulatorParam())
+            if self.cast_accounting
+            else None
+        )
+
+        # loads of a group share the destination table, path and partition column names
+        with self.timed("schema", group_seconds):
+            destination_schema_fields = self.destination_schemas.schema_fields(loads[0]["destination_table_name"])
+            if self.dfm_schemas is not None and dfm_schema.is_ods_load(loads[0]):
+                mismatched_columns = dfm_schema.mismatched_columns(
+                    destination_schema_fields,
+                    self.dfm_schemas.schema_fields(loads[0]["source_table_name"], loads[0]["source_s3_key"]),
+                )
+                if mismatched_columns:
+                    raise ValueError(
+                        f"Columns {mismatched_columns} of {loads[0]['destination_table_name']} don't have the types of "
+                        "the '.dfm' file, the table needs to be migrated first, with `dfm_migration`"
+                    )
+        partition_column_names = [column["name"] for column in loads[0].get("partition_columns", [])]
+
+        rechunked_paths = {}
+        try:
+            table_dfs = []
+            for load in loads:
+                source_path = load["source_s3_key"]
+                if 0 < self.rechunk_threshold_bytes <= load.get("s3_size", 0):
+                    source_path = f"{self.env_dict['RECHUNK_URI'].rstrip('/')}/{load['id']}/"
+                    with self.timed("rechunk", group_seconds):
+                        rechunked_paths[source_path] = gzip_rechunk.rechunk_s3_object(
+                            self.s3_client, load["source_s3_key"], source_path, self.rechunk_chunk_size_bytes
+                        )
+
+                with self.timed("read", group_seconds):
+                    table_dfs.append(self.read_load(load, source_path))
+
+            table_df = load_groups.df_with_loads(table_dfs, loads)
+
+            # cast columns with the springboard schema, keeping the partition columns
+            with self.timed("cast", group_seconds):
+                updated_table_df = job_helpers.df_with_updated_schema(
+                    table_df,
+                    destination_schema_fields + [{"name": name, "type": "string"} for name in partition_column_names],
+                    self.env_dict.get("CAST_ENGINE", "udf"),
+                    self.cache_size,
+                    self.cache_stats,
+                    python_seconds,
+                    cast_failures,
+                )
+
+            max_records_per_file = 0
+            if self.target_file_size_bytes > 0:
+                input_bytes = sum(load.get("s3_size", 0) for load in loads)
+                with self.timed("plan", group_seconds):
+                    file_plan = file_planner.plan_files(
+                        input_bytes,
+                        file_planner.estimated_row_count(input_bytes, self.input_bytes_per_row),
+                        self.target_file_size_bytes,
+                        self.output_bytes_per_input_byte,
+                    )
+                updated_table_df = file_planner.df_with_file_plan(
+                    updated_table_df, file_plan, partition_column_names if len(loads) > 1 else []
+                )
+                # note: only the loads written together need the records limit, see `df_with_file_plan`
+                if len(loads) > 1:
+                    max_records_per_file = file_plan.max_records_per_file
+
+            # optionally sort the rows of each file with the layout of the table, see `data_layout`
+            if data_layout.cluster_columns(loads[0]):
+                with self.timed("layout", group_seconds):
+                    updated_table_df = data_layout.df_with_layout(updated_table_df, loads[0], partition_column_names)
+
+            # write out to springboard bucket using the same prefix as incoming, in a job group for
+            # the stage metrics of the write
+            # note: Spark is lazy, so this is also when the files are read and cast
+            job_group = f"load_group_{load_group['id']}_{self.run_id}"
+            self.spark.sparkContext.setJobGroup(job_group, f"Write loads {load_group['id']}")
+            try:
+                with self.timed("write", group_seconds):
+                    job_helpers.write_partitioned_parquet(
+                        updated_table_df,
+                        partition_column_names,
+                        loads[0]["destination_path"],
+                        max_records_per_file,
+                        {**self.writer_options(loads[0]), **data_layout.bloom_filter_options(loads[0])},
+                    )
+            finally:
+                self.spark.sparkContext.setLocalProperty("spark.jobGroup.id", None)  # type: ignore[arg-type]
+                self.spark.sparkContext.setLocalProperty("spark.job.description", None)  # type: ignore[arg-type]
+
+            partition_paths = {
+                load["id"]: file_planner.partition_path(load["destination_path"], load.get("partition_columns", []))
+                for load in loads
+            }
+            files_by_load = {
+                load_id: file_planner.written_files(self.spark, path) for load_id, path in partition_paths.items()
+            }
+            file_sizes_by_load = {load_id: list(files.values()) for load_id, files in files_by_load.items()}
+
+            metrics = {
+                "load_ids": [load["id"] for load in loads],
+                "destination_table_name": loads[0]["destination_table_name"],
+                "writer_profile": writer_profiles.profile_name(loads[0], self.default_writer_profile),
+                "seconds": group_seconds,
+                "input_bytes": sum(load.get("s3_size", 0) for load in loads),
+                "output_file_count": sum(len(file_sizes) for file_sizes in file_sizes_by_load.values()),
+                "output_bytes": sum(sum(file_sizes) for file_sizes in file_sizes_by_load.values()),
+                "output_files_by_load": {
+                    str(load_id): {"file_count": len(file_sizes), "bytes": sum(file_sizes)}
+                    for load_id, file_sizes in file_sizes_by_load.items()
+                },
+                "python_seconds": sum(python_seconds.value.values()) if python_seconds is not None else None,
+                **load_metrics.job_group_metrics(self.spark, job_group),
+            }
+
+            rejection_reasons = []
+            if cast_failures is not None:
+                with self.timed("accounting", group_seconds):
+                    # note: only the ODS loads have '.dfm' files with their record count, and the loads
+                    # of a group are for the same table
+                    record_count = None
+                    rows_written = None
+                    if dfm_schema.is_ods_load(loads[0]):
+                        record_count = sum(
+                            cast_accounting.dfm_record_count(self.spark, load["source_s3_key"]) for load in loads
+                        )
+                        # note: the rows are counted from the Parquet footers, as the task metrics of
+                        # the write (see `load_metrics`) are updated asynchronously, and can lag
+                        rows_written = spark_files.written_row_count(self.spark, list(partition_paths.values()))
+                    rejection_reasons = cast_accounting.rejection_reasons(
+                        cast_failures.value, self.cast_failure_limit, rows_written, record_count
+                    )
+
+                metrics.update(
+                    {
+                        "record_count": record_count,
+                        "cast_failures": cast_failures.value,
+                        "rejected": bool(rejection_reasons),
+                    }
+                )
+
+            load_metrics.log_metrics(metrics)
+            self.load_group_metrics.append(metrics)
+
+            if rejection_reasons:
+                # remove the rejected loads from springboard, instead of leaving partial data behind
+                spark_files.delete_paths(self.spark, list(partition_paths.values()))
+                raise cast_accounting.LoadRejectedError([load["id"] for load in loads], rejection_reasons)
+
+            if self.ct_compaction and loads[0]["destination_table_name"].endswith("__ct"):
+                with self.timed("compact", group_seconds):
+                    self.compact_load_group(loads, list(partition_paths.values()))
+
+            if self.manifests is not None:
+                with self.timed("manifests", group_seconds):
+                    for load in loads:
+                        # note: the rows written are only counted by load for a single load
+                        rows_written = metrics.get("rows_written") if len(loads) == 1 else None
+                        if rows_written is None:
+                            rows_written = spark_files.written_row_count(self.spark, [partition_paths[load["id"]]])
+                        load_manifests.write_manifest(
+                            self.manifests,
+                            load,
+                            self.load_fingerprints[load["id"]],
+                            files_by_load[load["id"]],
+                            int(rows_written),
+                        )
+
+            if self.target_file_size_bytes > 0:
+                for load in loads:
+                    file_sizes = file_sizes_by_load[load["id"]]
+                    logging.info(
+                        "%s Load %s: planned %s file(s) of %s estimated bytes for %s load(s), "
+                        "wrote %s file(s) of sizes %s",
+                        log_prefix,
+                        load["id"],
+                        file_plan.file_count,
+                        file_plan.estimated_bytes,
+                        len(loads),
+                        len(file_sizes),
+                        file_sizes,
+                    )
+        finally:
+            for source_path, chunk_count in rechunked_paths.items():
+                gzip_rechunk.delete_s3_chunks(self.s3_client, source_path, chunk_count)
+
+    def compact_load_group(self, loads: List[dict], partition_paths: List[str]) -> None:
+        """
+        Merges the changes of a group of change tracking loads, as written to Springboard, into the
+        compacted table of each of their snapshots.
+        """
+
+        keys = ct_compaction.primary_keys(spark_files.read_dfm(self.spark, loads[0]["source_s3_key"]))
+        # note: the changes are read back from the Parquet files, with their partition columns
+        changes_df = self.spark.read.option("basePath", loads[0]["destination_path"]).parquet(*partition_paths)
+
+        for snapshot in sorted({row.snapshot for row in changes_df.select("snapshot").distinct().collect()}):
+            buckets = ct_compaction.compact_changes(
+                self.spark,
+                changes_df.where(changes_df.snapshot == snapshot),
+                loads[0]["destination_path"],
+                snapshot,
+                keys,
+                self.ct_compaction_buckets,
+                self.writer_options(loads[0]),
+            )
+            self.compacted_partitions.extend(ct_compaction.compacted_partitions(loads[0], snapshot, buckets))
+            logging.info(
+                "%s Compacted loads %s into snapshot %s, in %s key bucket(s)",
+                log_prefix,
+                [load["id"] for load in loads],
+                snapshot,
+                len(buckets),
+            )
+
+    def profile_load_group(self, load_group: dict) -> None:
+        """
+        Profiles the columns of a group of loads for the same destination table, as read from CSV,
+        and proposes a Springboard schema for the table, without writing the loads.
+        """
+
+        loads = load_group["loads"]
+        with self.timed("read"):
+            table_df = reduce(DataFrame.unionByName, [self.read_load(load, load["source_s3_key"]) for load in loads])
+
+        with self.timed("profile"):
+            profile = {
+                "table_name": loads[0]["destination_table_name"],
+                "load_ids": [load["id"] for load in loads],
+                **column_profiler.profile_df(table_df),
+            }
+
+        logging.info(
+            "%s Proposed schema of %s: %s",
+            log_prefix,
+            profile["table_name"],
+            json.dumps(profile["columns"]),
+        )
+        self.profiles.append(profile)
+
+        if self.profile_uri:
+            json_store.store_from_uri(self.profile_uri, self.s3_client).write(profile["table_name"], profile)
+
+    def run(self, loads: List[dict], job_name: str = "", job_run_id: str = "") -> dict:
+        """
+        Run the pipeline for the loads of a job run.
+
+        Parameters
+        ----------
+        loads : list
+            Loads from the job's INPUT
+        job_name : str
+            Name of the Glue job, for the run's summary
+        job_run_id : str
+            Id of the Glue job run, the summary is written as '<METRICS_URI>/<job_run_id>.json'
+
+        Returns
+        -------
+        dict
+            Summary of the run's metrics, see `load_metrics.run_summary`, with the 'profiles' of the
+            tables in the 'profile' job mode, the 'skipped_load_ids' with a MANIFEST_URI, and the
+            results of the 'partitions' of the loads with REGISTER_PARTITIONS (and of the key buckets
+            of the compacted tables, by partition path)
+        """
+
+        # note: the partitions of the loads skipped by their manifest are registered too, in case
+        # the earlier attempt failed before registering them
+        input_loads = loads
+        if self.manifests is not None and self.job_mode == "ingest":
+            loads = self.loads_to_run(loads)
+
+        self.prefetch(loads)
+
+        # optionally write the loads for the same destination table together, which are always
+        # profiled together
+        if str(self.env_dict.get("GROUP_LOADS", "false")).lower() == "true" or self.job_mode == "profile":
+            load_groups_to_run = load_groups.group_loads(loads)
+        else:
+            load_groups_to_run = [load_groups.load_group([load]) for load in loads]
+        run_load_group = self.profile_load_group if self.job_mode == "profile" else self.ingest_load_group
+
+        # run glue transformations for each group of cubic loads
+        if self.load_concurrency > 1:
+            load_runner.run_loads(self.spark.sparkContext, load_groups_to_run, run_load_group, self.load_concurrency)
+        else:
+            for load_group in load_groups_to_run:
+                run_load_group(load_group)
+
+        if self.register_partitions and self.job_mode == "ingest":
+            self.register_load_partitions(input_loads)
+
+        if self.cache_stats is not None:
+            logging.info("%s Conversion cache stats: %s", log_prefix, self.cache_stats.value)
+
+        summary = load_metrics.run_summary(job_name, self.load_group_metrics, self.stage_seconds)
+        if self.job_mode == "profile":
+            summary["profiles"] = self.profiles
+        if self.manifests is not None:
+            summary["skipped_load_ids"] = self.skipped_load_ids
+        if self.register_partitions:
+            summary["partitions"] = self.partition_results
+        # note: the metrics of each group, and the profiles, are only in the summary written to the METRICS_URI
+        load_metrics.log_metrics(
+            {key: value for key, value in summary.items() if key not in ["load_groups", "profiles"]}
+        )
+
+        if self.metrics_uri and job_run_id:
+            json_store.store_from_uri(self.metrics_uri, self.s3_client).write(job_run_id, summary)
+
+        # note: the job fails once the summary has the result of each load, so that the loads are retried
+        if any(result["status"] == "failed" for result in self.partition_results.values()):
+            raise partition_registry.PartitionRegistrationError(self.partition_results)
+
+        return summary
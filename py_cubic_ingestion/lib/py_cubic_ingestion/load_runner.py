@@ -0,0 +1,169 @@
+"""
+Running the loads of a Glue job run concurrently, as parallel Spark jobs submitted from a
+bounded pool of driver threads, so that small loads don't leave the executors idle.
+
+Each thread submits its Spark jobs to its own FAIR scheduler pool, which requires the Spark
+context to be created with 'spark.scheduler.mode' set to 'FAIR'. The pool, and the job group of
+the load's stage metrics (see `load_metrics`), are local properties of the thread, which PySpark
+only keeps for each Python thread in its pinned thread mode: otherwise, the calls of a Python
+thread go through whichever JVM thread is free, so that the jobs of concurrent loads get each
+other's pools and job groups. The entry points set PYSPARK_PIN_THREAD (see `pin_threads`), which
+is the default from Spark 3.2, and without the pinned thread mode, the loads run one at a time.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from py4j.clientserver import ClientServer
+from pyspark.context import SparkContext
+from typing import Callable, List, NamedTuple, Optional
+import logging
+import os
+import time
+
+
+log_prefix = "[py_cubic_ingestion] [load_runner]"
+
+
+class LoadResult(NamedTuple):
+    """
+    Outcome of running a load.
+    """
+
+    load: dict
+    duration_seconds: float
+    # None if the load succeeded
+    error: Optional[Exception]
+
+
+class LoadsFailedError(Exception):
+    """
+    Raised after all the loads have run, if any of them failed.
+    """
+
+    def __init__(self, failed_results: List[LoadResult]) -> None:
+        self.failed_results = failed_results
+        load_ids = ", ".join(str(result.load.get("id")) for result in failed_results)
+        super().__init__(f"{len(failed_results)} load(s) failed: {load_ids}")
+
+
+def pin_threads() -> None:
+    """
+    Turn on PySpark's pinned thread mode, unless it's set otherwise, before the Spark context is
+    created. The JVM and Python have to agree on the mode, so it's left as it is for a JVM that was
+    started before the Python process, which passes its gateway's port.
+    """
+
+    if "PYSPARK_GATEWAY_PORT" not in os.environ:
+        os.environ.setdefault("PYSPARK_PIN_THREAD", "true")
+
+
+def pinned_threads(spark_context: SparkContext) -> bool:
+    """
+    Whether the Spark context runs in PySpark's pinned thread mode, where each Python thread has
+    its own JVM thread, and so its own local properties.
+    """
+
+    # pylint: disable=protected-access
+    return isinstance(spark_context._gateway, ClientServer)
+
+
+def max_thread_concurrency(spark_context: SparkContext, max_concurrency: int) -> int:
+    """
+    Concurrency of the threads submitting Spark jobs with their own local properties, which is 1
+    without the pinned thread mode, see the module's documentation.
+    """
+
+    if max_concurrency > 1 and not pinned_threads(spark_context):
+        logging.warning(
+            "%s PySpark isn't in its pinned thread mode (PYSPARK_PIN_THREAD), running one at a time", log_prefix
+        )
+        return 1
+
+    return max(max_concurrency, 1)
+
+
+def scheduler_pool(load: dict) -> str:
+    """
+    Name of the FAIR scheduler pool for the load's Spark jobs.
+    """
+
+    return f"load_{load.get('id')}"
+
+
+def run_load(spark_context: SparkContext, run: Callable[[dict], None], load: dict) -> LoadResult:
+    """
+    Run the load in the current thread, capturing any error.
+
+    Parameters
+    ----------
+    spark_context : SparkContext
+        Context the load's Spark jobs are submitted to
+    run : Callable
+        Function running a single load
+    load : dict
+        Load from the job's INPUT
+
+    Returns
+    -------
+    LoadResult
+        Outcome of the load
+    """
+
+    spark_context.setLocalProperty("spark.scheduler.pool", scheduler_pool(load))
+    start = time.monotonic()
+    error = None
+
+    try:
+        run(load)
+    except Exception as exc:  # pylint: disable=broad-except
+        # isolate the failure to this load, it's reported once all the loads have run
+        error = exc
+        logging.exception("%s Load %s failed", log_prefix, load.get("id"))
+    finally:
+        spark_context.setLocalProperty("spark.scheduler.pool", None)  # type: ignore[arg-type]
+
+    return LoadResult(load, time.monotonic() - start, error)
+
+
+def run_loads(
+    spark_context: SparkContext, loads: List[dict], run: Callable[[dict], None], max_concurrency: int
+) -> List[LoadResult]:
+    """
+    Run the loads concurrently, at most `max_concurrency` at a time, in PySpark's pinned thread mode.
+    A failure of one load doesn't stop the other loads, and is reported by raising a
+    `LoadsFailedError` once they have all run.
+
+    Parameters
+    ----------
+    spark_context : SparkContext
+        Context the loads' Spark jobs are submitted to
+    loads : list
+        Loads from the job's INPUT
+    run : Callable
+        Function running a single load
+    max_concurrency : int
+        Maximum number of loads running at the same time
+
+    Returns
+    -------
+    list
+        Outcome of each load, in the order of `loads`
+    """
+
+    max_workers = max_thread_concurrency(spark_context, max_concurrency)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load") as executor:
+        results = list(executor.map(lambda load: run_load(spark_context, run, load), loads))
+
+    for result in results:
+        logging.info(
+            "%s Load %s %s in %.1f seconds",
+            log_prefix,
+            result.load.get("id"),
+            "failed" if result.error else "succeeded",
+            result.duration_seconds,
+        )
+
+    failed_results = [result for result in results if result.error is not None]
+    if failed_results:
+        raise LoadsFailedError(failed_results)
+
+    return results
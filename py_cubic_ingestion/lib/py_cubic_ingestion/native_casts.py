@@ -0,0 +1,302 @@
+"""
+Casts equivalent to the functions in `custom_udfs`, built only out of Spark SQL expressions,
+so no Python worker is needed to run them.
+
+Values that can't be cast raise an error in the Spark job, with the value in the message, the
+same as the `custom_udfs` functions. Some layouts that `dateutil`'s `isoparse` accepts, such as
+ISO week dates ('2022-W01-1') and ordinal dates ('2022001'), are not supported, and also raise.
+"""
+
+from pyspark.sql.column import Column
+from pyspark.sql.functions import (
+    array,
+    col,
+    concat,
+    expr,
+    lit,
+    raise_error,
+    regexp_extract,
+    regexp_replace,
+    to_utc_timestamp,
+    transform,
+    when,
+)
+from pyspark.sql.types import (
+    ByteType,
+    DataType,
+    DateType,
+    DecimalType,
+    DoubleType,
+    IntegerType,
+    LongType,
+    ShortType,
+    TimestampType,
+)
+from typing import Callable, Optional
+import re
+
+# note: Java regular expressions, with '(?U)' so '\s' includes the Unicode whitespace that
+# Python's 'isspace' also matches (plus the separator control characters)
+WHITESPACE = r"[\s\x{1c}-\x{1f}]"
+BLANK_PATTERN = rf"(?U)^{WHITESPACE}*$"
+LONG_PATTERN = rf"(?U)^{WHITESPACE}*([+-]?[0-9]+){WHITESPACE}*$"
+DOUBLE_PATTERN = (
+    rf"(?U)^{WHITESPACE}*([+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?|(?i:[+-]?inf(?:inity)?|nan))"
+    rf"{WHITESPACE}*$"
+)
+DECIMAL_PATTERN = rf"(?U)^{WHITESPACE}*([+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?){WHITESPACE}*$"
+# integral types narrower than LongType, by type name, with their range
+INTEGRAL_TYPES = {
+    "byte": (ByteType(), -(2**7), 2**7 - 1),
+    "short": (ShortType(), -(2**15), 2**15 - 1),
+    "integer": (IntegerType(), -(2**31), 2**31 - 1),
+}
+# ISO 8601 layouts accepted by 'dateutil.parser.isoparse' that we support. a time is only allowed
+# after a full date, the date/time separator can be any character, and the use of ':' in the
+# time has to be consistent
+DATETIME_PATTERN = (
+    r"^(?:[0-9]{4}(?:-[0-9]{2})?|(?:[0-9]{4}-[0-9]{2}-[0-9]{2}|[0-9]{8})"
+    r"(?:.[0-9]{2}(?:(:?)[0-9]{2}(?:\1[0-9]{2}(?:[.,][0-9]+)?)?)?(?:[Zz]|[+-][0-9]{2}(?::?[0-9]{2})?)?)?)$"
+)
+# replacements, applied in order, that turn a value matching `DATETIME_PATTERN` into the
+# 'yyyy-MM-dd HH:mm:ss[.SSSSSS][+HH:mm]' layout
+DATETIME_NORMALIZATIONS = [
+    # dates
+    (r"^([0-9]{4})$", "$1-01-01"),
+    (r"^([0-9]{4})-([0-9]{2})$", "$1-$2-01"),
+    (r"^([0-9]{4})([0-9]{2})([0-9]{2})", "$1-$2-$3"),
+    (r"^(.{10})$", "$1 00"),
+    # times
+    (r"^(.{10}).", "$1 "),
+    (r"^(.{13}):?([0-9]{2})", "$1:$2"),
+    (r"^(.{13})(?![:0-9])", "$1:00"),
+    (r"^(.{16}):?([0-9]{2})", "$1:$2"),
+    (r"^(.{16})(?![:0-9])", "$1:00"),
+    # fractions of a second, truncated to microseconds
+    (r"^(.{19}),", "$1."),
+    (r"^(.{19}\.[0-9]{1,6})[0-9]*", "$1"),
+    # UTC offsets
+    (r"[Zz]$", "+00:00"),
+    (r"([+-][0-9]{2})$", "$1:00"),
+    (r"([+-][0-9]{2})([0-9]{2})$", "$1:$2"),
+]
+OFFSET_PATTERN = r"[+-][0-9]{2}:[0-9]{2}$"
+END_OF_DAY_PATTERN = r"^(?<date>.{11})24(?<time>:00:00(?:\.0*)?)$"
+
+
+def is_blank(value: Column) -> Column:
+    """
+    Whether `custom_udfs.optional` would turn the value into NULL.
+    """
+
+    return value.isNull() | value.rlike(BLANK_PATTERN)
+
+
+def cast_error(value: Column, data_type: DataType) -> Column:
+    """
+    Fails the Spark job with an error message that includes the value, similar to `capture_error`.
+    """
+
+    return raise_error(concat(lit("'"), value, lit(f"', Unable to cast to Spark {data_type} data type.")))
+
+
+def checked_cast(value: Column, result: Column, data_type: DataType) -> Column:
+    """
+    NULL for blank values, the result if the value could be cast, and an error otherwise.
+
+    Parameters
+    ----------
+    value : Column
+        Column with the original string value
+    result : Column
+        Expression casting the value, NULL if the value couldn't be cast
+    data_type : DataType
+        Type the value is cast to
+
+    Returns
+    -------
+    Column
+        Column of type `data_type`
+    """
+
+    return (
+        when(is_blank(value), lit(None).cast(data_type))
+        .when(result.isNotNull(), result)
+        .otherwise(cast_error(value, data_type))
+    )
+
+
+def with_bound(value: Column, function: Callable[[Column], Column]) -> Column:
+    """
+    Apply the function to the value, evaluating the value only once however many times the
+    function refers to it. This keeps the size of the generated code down for long expressions.
+    """
+
+    return transform(array(value), function).getItem(0)
+
+
+def normalized_datetime(value: Column) -> Column:
+    """
+    ISO 8601 value in the 'yyyy-MM-dd HH:mm:ss[.SSSSSS][+HH:mm]' layout, NULL if the layout of
+    the value isn't supported.
+    """
+
+    normalized = value
+    for pattern, replacement in DATETIME_NORMALIZATIONS:
+        normalized = regexp_replace(normalized, pattern, replacement)
+
+    return when(value.rlike(DATETIME_PATTERN) & ~value.startswith("0000"), normalized)
+
+
+def local_timestamp(normalized: Column) -> Column:
+    """
+    Date and time of a normalized value, ignoring any UTC offset, as a timestamp in the session's
+    timezone. NULL if the value isn't a valid date/time.
+    """
+
+    local = regexp_replace(normalized, OFFSET_PATTERN, "")
+    # 24:00:00 is midnight at the end of the day
+    timestamp = regexp_replace(local, END_OF_DAY_PATTERN, "${date}00${time}").cast(TimestampType())
+
+    return when(local.rlike(END_OF_DAY_PATTERN), timestamp + expr("INTERVAL 1 DAY")).otherwise(timestamp)
+
+
+def long_value(value: Column) -> Column:
+    """
+    Value cast like `custom_udfs.as_long`, NULL if it can't be cast or is blank.
+    """
+
+    return regexp_extract(value, LONG_PATTERN, 1).cast(LongType())
+
+
+def double_value(value: Column) -> Column:
+    """
+    Value cast like `custom_udfs.as_double`, NULL if it can't be cast or is blank.
+    """
+
+    return regexp_extract(value, DOUBLE_PATTERN, 1).cast(DoubleType())
+
+
+def date_value(value: Column) -> Column:
+    """
+    Value cast like `custom_udfs.as_date`, NULL if it can't be cast or is blank.
+    """
+
+    return with_bound(normalized_datetime(value), lambda normalized: local_timestamp(normalized).cast(DateType()))
+
+
+def timestamp_value(value: Column) -> Column:
+    """
+    Value cast like `custom_udfs.as_timestamp`, NULL if it can't be cast or is blank.
+    """
+
+    return with_bound(
+        normalized_datetime(value),
+        lambda normalized: when(
+            normalized.rlike(OFFSET_PATTERN),
+            to_utc_timestamp(local_timestamp(normalized), regexp_extract(normalized, OFFSET_PATTERN, 0)),
+        ).otherwise(local_timestamp(normalized)),
+    )
+
+
+def as_long(column_name: str) -> Column:
+    """
+    Equivalent of `custom_udfs.as_long`. Values outside of the range of LongType fail the cast.
+    """
+
+    value = col(column_name)
+
+    return checked_cast(value, long_value(value), LongType())
+
+
+def as_double(column_name: str) -> Column:
+    """
+    Equivalent of `custom_udfs.as_double`.
+    """
+
+    value = col(column_name)
+
+    return checked_cast(value, double_value(value), DoubleType())
+
+
+def as_date(column_name: str) -> Column:
+    """
+    Equivalent of `custom_udfs.as_date`. The date is the one in the value, even if the value has
+    a UTC offset.
+    """
+
+    value = col(column_name)
+
+    return checked_cast(value, date_value(value), DateType())
+
+
+def as_timestamp(column_name: str) -> Column:
+    """
+    Equivalent of `custom_udfs.as_timestamp`. Values with a UTC offset are converted to the time
+    in UTC, which is then read in the session's timezone, like the naive datetimes the UDF returns.
+    """
+
+    value = col(column_name)
+
+    return checked_cast(value, timestamp_value(value), TimestampType())
+
+
+def integral_value(value: Column, type_name: str) -> Column:
+    """
+    Value cast like `custom_udfs.as_long`, to a narrower integral type of `INTEGRAL_TYPES`, NULL if
+    it can't be cast, is out of the type's range, or is blank.
+    """
+
+    data_type, minimum, maximum = INTEGRAL_TYPES[type_name]
+
+    return with_bound(long_value(value), lambda long: when(long.between(minimum, maximum), long.cast(data_type)))
+
+
+def decimal_value(value: Column, data_type: DecimalType) -> Column:
+    """
+    Value cast to the decimal type, rounded to its scale, NULL if it can't be cast, doesn't fit the
+    type's precision, or is blank.
+    """
+
+    return regexp_extract(value, DECIMAL_PATTERN, 1).cast(data_type)
+
+
+def precise_cast(type_name: str) -> Optional[Callable[[str], Column]]:
+    """
+    Cast to a type more precise than the ones of `custom_udfs`, such as the types of the columns
+    of a '.dfm' file: 'byte', 'short', 'integer' or 'decimal(<precision>,<scale>)'. None for other
+    types. Values that can't be cast fail the Spark job, like the other casts.
+
+    Parameters
+    ----------
+    type_name : str
+        Spark type name
+
+    Returns
+    -------
+    Callable
+        Cast of a column, by name, to the type, or None
+    """
+
+    if type_name in INTEGRAL_TYPES:
+        data_type: DataType = INTEGRAL_TYPES[type_name][0]
+
+        def cast_integral(column_name: str) -> Column:
+            value = col(column_name)
+
+            return checked_cast(value, integral_value(value, type_name), data_type)
+
+        return cast_integral
+
+    decimal_match = re.fullmatch(r"decimal\(\s*([0-9]+)\s*,\s*([0-9]+)\s*\)", type_name)
+    if decimal_match:
+        decimal_type = DecimalType(int(decimal_match.group(1)), int(decimal_match.group(2)))
+
+        def cast_decimal(column_name: str) -> Column:
+            value = col(column_name)
+
+            return checked_cast(value, decimal_value(value, decimal_type), decimal_type)
+
+        return cast_decimal
+
+    return None
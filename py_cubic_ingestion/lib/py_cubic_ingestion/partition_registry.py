@@ -0,0 +1,173 @@
+"""
+Registration of the partitions written by the loads in the Glue catalog, in place of the Athena
+`ALTER TABLE ... ADD PARTITION` query that the `ex_cubic_ingestion` app runs for each load.
+
+The partitions are known from the layout of `job_helpers.write_parquet`: one directory for each
+of the load's partition columns, such as 'snapshot=<snapshot>/identifier=<file name>', under its
+destination path. The partitions of the loads of each destination table are created with batched
+`batch_create_partition` calls, of up to BATCH_SIZE partitions, each with the storage descriptor
+of the table (as Athena does) and the location of the partition.
+
+Every writer of Springboard tables registers its partitions this way, when its job's ENV has
+REGISTER_PARTITIONS: `load_pipeline` (along with the key buckets of the compacted tables, see
+`ct_compaction`), `arrow_ingest` and `stream_ingest`.
+
+The result of each load is 'created', 'exists' for a partition that is already in the catalog,
+such as one written again, or 'failed' with the error of the Glue API, for its partition or for
+the whole call of its batch, such as throttling, in which case the other batches still run.
+"""
+
+from botocore.exceptions import ClientError
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import file_planner, schema_cache
+from typing import Dict, List, Tuple
+import logging
+
+
+log_prefix = "[py_cubic_ingestion] [partition_registry]"
+
+# maximum number of partitions of a `batch_create_partition` call
+BATCH_SIZE = 100
+
+
+class PartitionRegistrationError(Exception):
+    """
+    Raised when the partitions of some loads couldn't be registered, once the results of all the
+    loads are known.
+    """
+
+    def __init__(self, results: Dict[str, dict]) -> None:
+        self.load_ids = [load_id for load_id, result in results.items() if result["status"] == "failed"]
+        super().__init__(f"Partitions of loads {self.load_ids} couldn't be registered")
+
+
+def catalog_location(path: str) -> str:
+    """
+    Location in the Glue catalog of a path, with 's3' instead of the 's3a' protocol of Spark.
+    """
+
+    return path.rstrip("/").replace("s3a://", "s3://", 1)
+
+
+def partition_input(storage_descriptor: dict, load: dict) -> dict:
+    """
+    Input of the `batch_create_partition` call for the partition of a load, with the storage
+    descriptor of its table.
+    """
+
+    return {
+        "Values": [column["value"] for column in load.get("partition_columns", [])],
+        "StorageDescriptor": {
+            **storage_descriptor,
+            "Location": catalog_location(
+                file_planner.partition_path(load["destination_path"], load.get("partition_columns", []))
+            ),
+        },
+    }
+
+
+def register_partitions(
+    glue_client: GlueClient, database_name: str, storage_descriptor: dict, loads: List[dict]
+) -> Dict[str, dict]:
+    """
+    Create the partitions of the loads of a destination table in the Glue catalog.
+
+    Parameters
+    ----------
+    glue_client : GlueClient
+        Boto3 client for Glue
+    database_name : str
+        Glue database of the table, GLUE_DATABASE_SPRINGBOARD
+    storage_descriptor : dict
+        Storage descriptor of the table, as returned by the Glue API
+    loads : list
+        Loads of the table, from the job's INPUT
+
+    Returns
+    -------
+    dict
+        Result of each load, by id (as a string, as in JSON), with its 'status' and the 'error'
+        of a failed one
+    """
+
+    table_name = loads[0]["destination_table_name"]
+    results: Dict[str, dict] = {}
+
+    for start in range(0, len(loads), BATCH_SIZE):
+        batch = loads[start : start + BATCH_SIZE]
+        inputs = [partition_input(storage_descriptor, load) for load in batch]
+        load_ids_by_values: Dict[Tuple[str, ...], List[str]] = {}
+        for load, load_input in zip(batch, inputs):
+            load_ids_by_values.setdefault(tuple(load_input["Values"]), []).append(str(load["id"]))
+            results[str(load["id"])] = {"status": "created"}
+
+        try:
+            response = glue_client.batch_create_partition(
+                DatabaseName=database_name,
+                TableName=table_name,
+                PartitionInputList=inputs,  # type: ignore[arg-type]
+            )
+        except ClientError as batch_error:
+            logging.exception("%s Batch of partitions of %s failed", log_prefix, table_name)
+            error_detail = batch_error.response.get("Error", {})
+            for load in batch:
+                results[str(load["id"])] = {
+                    "status": "failed",
+                    "error": f"{error_detail.get('Code')}: {error_detail.get('Message')}",
+                }
+            continue
+
+        for error in response.get("Errors", []):
+            error_code = error.get("ErrorDetail", {}).get("ErrorCode")
+            for load_id in load_ids_by_values.get(tuple(error.get("PartitionValues", [])), []):
+                if error_code == "AlreadyExistsException":
+                    results[load_id] = {"status": "exists"}
+                else:
+                    results[load_id] = {
+                        "status": "failed",
+                        "error": f"{error_code}: {error.get('ErrorDetail', {}).get('ErrorMessage')}",
+                    }
+
+    logging.info("%s Registered the partitions of %s: %s", log_prefix, table_name, results)
+
+    return results
+
+
+def register_loads(
+    glue_client: GlueClient, destination_schemas: schema_cache.GlueSchemaCache, loads: List[dict]
+) -> Dict[str, dict]:
+    """
+    Create the partitions of the loads in the Glue catalog, with a batched call for each destination
+    table, see `register_partitions`.
+
+    Parameters
+    ----------
+    glue_client : GlueClient
+        Boto3 client for Glue
+    destination_schemas : GlueSchemaCache
+        Schemas of the Springboard tables, for the tables' storage descriptors
+    loads : list
+        Loads, from the job's INPUT
+
+    Returns
+    -------
+    dict
+        Result of each load, by id, see `register_partitions`
+    """
+
+    loads_by_table: Dict[str, List[dict]] = {}
+    for load in loads:
+        loads_by_table.setdefault(load["destination_table_name"], []).append(load)
+
+    results: Dict[str, dict] = {}
+    for table_name, table_loads in loads_by_table.items():
+        results.update(
+            register_partitions(
+                glue_client,
+                destination_schemas.database_name,
+                destination_schemas.storage_descriptor(table_name),
+                table_loads,
+            )
+        )
+
+    return results
@@ -0,0 +1,182 @@
+"""
+Cache of the schema fields of Glue tables, used in place of a `get_table` call per load.
+
+The schemas of all the tables of a Glue job run are fetched with one batched (paginated)
+`get_tables` call. Optionally, schemas can be kept in a store, on local disk or in S3 (such as
+the operations prefix, see `json_store`), by '<database name>/<table name>', with the table's
+'version', the time it was 'fetched_at' (seconds since the epoch) and its 'fields'. A stored
+schema that is newer than `max_age_seconds` is used without any API calls, and older ones are
+refreshed by the batched call, which also updates the stored version.
+"""
+
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import json_store
+from typing import Dict, Iterable, Optional
+import logging
+import re
+import time
+
+
+log_prefix = "[py_cubic_ingestion] [schema_cache]"
+
+# Spark types of the Athena types of the Glue tables' columns, the other types are kept as strings
+athena_type_to_spark_type = {
+    "string": "string",
+    "tinyint": "byte",
+    "smallint": "short",
+    "int": "integer",
+    "bigint": "long",
+    "double": "double",
+    "date": "date",
+    "timestamp": "timestamp",
+}
+
+
+def schema_fields_from_table(table: dict) -> list:
+    """
+    Schema fields of a table, as returned by the Glue API, with the field types converted from
+    Athena types to Spark types.
+
+    Parameters
+    ----------
+    table : dict
+        Glue data catalog table
+
+    Returns
+    -------
+    list
+        List of fields with name and type.
+    """
+
+    return [
+        {"name": column["Name"], "type": spark_type(column["Type"])} for column in table["StorageDescriptor"]["Columns"]
+    ]
+
+
+def spark_type(athena_type: str) -> str:
+    """
+    Spark type of an Athena type, 'string' for the types that aren't supported. Decimal types keep
+    their precision and scale, as in 'decimal(10,2)'.
+    """
+
+    decimal_match = re.fullmatch(r"decimal\(\s*([0-9]+)\s*,\s*([0-9]+)\s*\)", athena_type)
+    if decimal_match:
+        return f"decimal({decimal_match.group(1)},{decimal_match.group(2)})"
+
+    return athena_type_to_spark_type.get(athena_type, "string")
+
+
+def table_version(table: dict) -> str:
+    """
+    Version of a Glue table, its 'VersionId', or its 'UpdateTime' if it doesn't have one.
+    """
+
+    return str(table.get("VersionId") or table.get("UpdateTime") or "")
+
+
+class GlueSchemaCache:
+    """
+    Schema fields of the tables of a Glue database, as returned by
+    `job_helpers.get_glue_table_schema_fields_by_load`.
+    """
+
+    def __init__(
+        self,
+        glue_client: GlueClient,
+        database_name: str,
+        store: Optional[json_store.JsonStore] = None,
+        max_age_seconds: float = 0,
+    ) -> None:
+        self.glue_client = glue_client
+        self.database_name = database_name
+        self.store = store
+        self.max_age_seconds = max_age_seconds
+        self.schema_fields_by_table: Dict[str, list] = {}
+        # note: the storage descriptors are only kept in memory, for the tables fetched from the API
+        self.storage_descriptors_by_table: Dict[str, dict] = {}
+
+    def store_key(self, table_name: str) -> str:
+        return f"{self.database_name}/{table_name}"
+
+    def prefetch(self, table_names: Iterable[str]) -> None:
+        """
+        Fetch the schemas of the tables that aren't in the cache yet, or fresh in the store, with a
+        single batched `get_tables` call.
+
+        Parameters
+        ----------
+        table_names : Iterable
+            Names of the tables, duplicates are fetched once
+        """
+
+        missing_table_names = set(table_names) - set(self.schema_fields_by_table)
+
+        if self.store is not None and self.max_age_seconds > 0:
+            for table_name in sorted(missing_table_names):
+                entry = self.store.read(self.store_key(table_name))
+                if entry is not None and time.time() - entry["fetched_at"] < self.max_age_seconds:
+                    self.schema_fields_by_table[table_name] = entry["fields"]
+                    missing_table_names.remove(table_name)
+
+        if not missing_table_names:
+            return
+
+        # note: tables that don't match exactly are ignored, and missing ones are left to 'get_table'
+        paginator = self.glue_client.get_paginator("get_tables")
+        expression = "|".join(re.escape(table_name) for table_name in sorted(missing_table_names))
+        for page in paginator.paginate(DatabaseName=self.database_name, Expression=expression):
+            for table in page["TableList"]:
+                if table["Name"] in missing_table_names:
+                    self.add_table(dict(table))
+
+    def add_table(self, table: dict) -> None:
+        """
+        Cache the schema fields of a table from the Glue API, and store them if there is a store.
+        """
+
+        fields = schema_fields_from_table(table)
+        self.schema_fields_by_table[table["Name"]] = fields
+        self.storage_descriptors_by_table[table["Name"]] = dict(table.get("StorageDescriptor", {}))
+
+        if self.store is None:
+            return
+
+        key = self.store_key(table["Name"])
+        previous_entry = self.store.read(key)
+        version = table_version(table)
+        if previous_entry is not None and previous_entry.get("version") != version:
+            logging.info("%s Schema of %s changed to version %s", log_prefix, key, version)
+
+        self.store.write(key, {"version": version, "fetched_at": time.time(), "fields": fields})
+
+    def schema_fields(self, table_name: str) -> list:
+        """
+        Schema fields of the table, from the cache if it's been fetched already.
+
+        Parameters
+        ----------
+        table_name : str
+            Glue data catalog table name
+
+        Returns
+        -------
+        list
+            List of fields with name and type.
+        """
+
+        if table_name not in self.schema_fields_by_table:
+            response = self.glue_client.get_table(DatabaseName=self.database_name, Name=table_name)
+            self.add_table(dict(response["Table"]))
+
+        return self.schema_fields_by_table[table_name]
+
+    def storage_descriptor(self, table_name: str) -> dict:
+        """
+        Storage descriptor of the table, from the cache if it's been fetched already.
+        """
+
+        if table_name not in self.storage_descriptors_by_table:
+            response = self.glue_client.get_table(DatabaseName=self.database_name, Name=table_name)
+            self.add_table(dict(response["Table"]))
+
+        return self.storage_descriptors_by_table[table_name]
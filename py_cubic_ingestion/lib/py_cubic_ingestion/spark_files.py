@@ -0,0 +1,61 @@
+"""
+Files read and written with Spark, using Hadoop's file system so that they work for local paths
+and S3 alike: the '.dfm' files of the ODS loads, and the Parquet files written to Springboard.
+"""
+
+from pyspark.sql.session import SparkSession
+from typing import List
+import json
+
+
+def dfm_path(source_path: str) -> str:
+    """
+    Path of the '.dfm' file of a load's '.csv.gz' file, as in `ExCubicIngestion.SchemaFetch`.
+    """
+
+    if source_path.endswith(".csv.gz"):
+        source_path = source_path[: -len(".csv.gz")]
+
+    return f"{source_path}.dfm"
+
+
+def read_dfm(spark: SparkSession, source_path: str) -> dict:
+    """
+    '.dfm' file of a load, read with Spark.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session to read the file with
+    source_path : str
+        Path of the load's '.csv.gz' file, such as its `source_s3_key`
+
+    Returns
+    -------
+    dict
+        Contents of the '.dfm' file
+    """
+
+    dfm: dict = json.loads(spark.read.text(dfm_path(source_path), wholetext=True).collect()[0][0])
+
+    return dfm
+
+
+def written_row_count(spark: SparkSession, paths: List[str]) -> int:
+    """
+    Number of rows in the Parquet files written to the paths, rather than from the write's stage
+    metrics (see `load_metrics.job_group_metrics`), which can lag. Only the files' footers are read.
+    """
+
+    return spark.read.parquet(*paths).count()
+
+
+def delete_paths(spark: SparkSession, paths: List[str]) -> None:
+    """
+    Delete the directories at the paths, such as the partitions of a rejected load group.
+    """
+
+    for path in paths:
+        # pylint: disable=protected-access
+        hadoop_path = spark._jvm.org.apache.hadoop.fs.Path(path)  # type: ignore[union-attr]
+        hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration()).delete(hadoop_path, True)
@@ -0,0 +1,246 @@
+"""
+Continuous ingestion of the CSV files of Incoming tables with Spark Structured Streaming, run by
+`ingest_incoming.run_stream`. It's an alternative to the loads that the `ex_cubic_ingestion` app
+batches into runs of `ingest_incoming.run`, so that files are in Springboard seconds after they
+arrive instead of minutes.
+
+Each table is streamed from its Incoming prefix with Spark's file source. Each micro-batch of new
+files is cast with the Springboard schema, as by `ingest_incoming`, and written to the table's
+Springboard path, partitioned by 'identifier', the name of the file the rows are from, as the
+loads are.
+
+The files processed are recorded in the stream's checkpoint, so a restarted stream carries on from
+the files it hasn't processed. A micro-batch that runs again after a failure overwrites the same
+partitions, with dynamic partition overwrite, so the rows of each file are written exactly once.
+
+The tables are in the job's INPUT, as {"tables": [...]} with for each table:
+
+- 'source_table_name' and 'destination_table_name': Glue tables, as for the loads
+- 'source_path': Incoming prefix of the table, such as
+  's3://<bucket>/<prefix>cubic/dmap/agg_sample/'
+- 'destination_path': Springboard path of the table, as for the loads
+- 'writer_profile': optional, see `writer_profiles`
+
+The job's ENV has the Glue databases and:
+
+- STREAM_CHECKPOINT_URI: the checkpoint of each table is at
+  '<STREAM_CHECKPOINT_URI>/<destination_table_name>'
+- STREAM_TRIGGER_SECONDS: seconds between micro-batches, or 0 to process the files there are and
+  stop (the default)
+- STREAM_MAX_FILES_PER_TRIGGER: maximum number of files in a micro-batch, or 0 for no limit (the
+  default)
+- CAST_ENGINE, WRITER_PROFILES and WRITER_PROFILE, as for `ingest_incoming`
+- REGISTER_PARTITIONS: whether the partitions of the files of each micro-batch are registered in
+  the Glue catalog once they're written, see `partition_registry`. A micro-batch fails if any of
+  them couldn't be, and runs again when the stream is restarted
+
+Note: the files must stay in the Incoming prefix until the stream has processed them, which means
+the stream's tables shouldn't also be ingested, and archived, by the app.
+
+Note: only DMAP tables can be streamed. The loads of ODS tables are also partitioned by
+'snapshot', which the app keeps track of and the file source can't know, and Qlik reuses file
+names such as 'LOAD1.csv.gz' across snapshots, which the file source would skip as already
+processed. `start_stream` rejects the tables under an 'ods_qlik' prefix.
+"""
+
+from py_cubic_ingestion import job_helpers, partition_registry, schema_cache, writer_profiles
+from pyspark.sql.dataframe import DataFrame
+from pyspark.sql.functions import element_at, input_file_name, split
+from pyspark.sql.session import SparkSession
+from pyspark.sql.streaming import StreamingQuery
+from typing import Dict, List, Optional
+import logging
+
+
+log_prefix = "[py_cubic_ingestion] [stream_ingest]"
+
+# files of the Incoming prefixes that are streamed
+CSV_FILE_GLOB = "*.csv.gz"
+
+
+def df_with_identifier(df: DataFrame) -> DataFrame:
+    """
+    Add the 'identifier' partition column, the name of the file each row is from, as for the loads.
+    """
+
+    return df.withColumn("identifier", element_at(split(input_file_name(), "/"), -1))
+
+
+def register_micro_batch(
+    destination_schemas: schema_cache.GlueSchemaCache, table: dict, identifiers: List[str]
+) -> Dict[str, dict]:
+    """
+    Register the partitions of the files of a micro-batch, as the loads of the files would be.
+
+    Parameters
+    ----------
+    destination_schemas : GlueSchemaCache
+        Schemas of the Springboard tables, for the table's storage descriptor
+    table : dict
+        Table from the job's INPUT
+    identifiers : list
+        Names of the files of the micro-batch
+
+    Returns
+    -------
+    dict
+        Result of each file's partition, by file name, see `partition_registry.register_partitions`
+    """
+
+    results = partition_registry.register_partitions(
+        destination_schemas.glue_client,
+        destination_schemas.database_name,
+        destination_schemas.storage_descriptor(table["destination_table_name"]),
+        [
+            {
+                "id": identifier,
+                "destination_table_name": table["destination_table_name"],
+                "destination_path": table["destination_path"],
+                "partition_columns": [{"name": "identifier", "value": identifier}],
+            }
+            for identifier in identifiers
+        ],
+    )
+    if any(result["status"] == "failed" for result in results.values()):
+        raise partition_registry.PartitionRegistrationError(results)
+
+    return results
+
+
+def write_micro_batch(
+    df: DataFrame,
+    destination_fields: List[dict],
+    table: dict,
+    env_dict: dict,
+    writer_options: Dict[str, str],
+    destination_schemas: Optional[schema_cache.GlueSchemaCache] = None,
+) -> None:
+    """
+    Cast the rows of a micro-batch with the Springboard schema, and write them to the partitions of
+    their files, then optionally register the partitions.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Rows of the micro-batch, with their 'identifier'
+    destination_fields : list
+        Fields of the Springboard table
+    table : dict
+        Table from the job's INPUT, with its 'destination_path'
+    env_dict : dict
+        The job's ENV, with the optional CAST_ENGINE
+    writer_options : dict
+        Options of the Parquet writer, from the table's writer profile
+    destination_schemas : GlueSchemaCache
+        Schemas of the Springboard tables, to register the partitions with, if any
+    """
+
+    if destination_schemas is not None:
+        # note: the rows are kept for the files' names, so that the files aren't read again
+        df = df.persist()
+
+    try:
+        job_helpers.write_partitioned_parquet(
+            job_helpers.df_with_updated_schema(
+                df,
+                destination_fields + [{"name": "identifier", "type": "string"}],
+                env_dict.get("CAST_ENGINE", "udf"),
+            ),
+            ["identifier"],
+            table["destination_path"],
+            writer_options=writer_options,
+        )
+
+        if destination_schemas is not None:
+            identifiers = sorted(row.identifier for row in df.select("identifier").distinct().collect())
+            if identifiers:
+                register_micro_batch(destination_schemas, table, identifiers)
+    finally:
+        if destination_schemas is not None:
+            df.unpersist()
+
+
+def start_stream(
+    spark: SparkSession,
+    table: dict,
+    source_fields: List[dict],
+    destination_fields: List[dict],
+    env_dict: dict,
+    destination_schemas: Optional[schema_cache.GlueSchemaCache] = None,
+) -> StreamingQuery:
+    """
+    Start streaming the CSV files of a table's Incoming prefix to Springboard. ODS tables are
+    rejected, see the module's documentation.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        Spark session to run the stream with, with dynamic partition overwrite
+    table : dict
+        Table from the job's INPUT, see the module's documentation
+    source_fields : list
+        Fields of the Incoming table, only their names are used
+    destination_fields : list
+        Fields of the Springboard table
+    env_dict : dict
+        The job's ENV, see the module's documentation
+    destination_schemas : GlueSchemaCache
+        Schemas of the Springboard tables, needed with REGISTER_PARTITIONS
+
+    Returns
+    -------
+    StreamingQuery
+        Query of the stream, named after the destination table
+    """
+
+    if "/ods_qlik/" in table["source_path"]:
+        raise ValueError(
+            f"ODS table {table['destination_table_name']} can't be streamed, as its loads are partitioned by snapshot"
+        )
+
+    profiles = writer_profiles.profiles_from_json(env_dict.get("WRITER_PROFILES"))
+    profile_name = writer_profiles.profile_name(
+        table, env_dict.get("WRITER_PROFILE", writer_profiles.DEFAULT_PROFILE_NAME)
+    )
+    if profile_name not in profiles:
+        raise ValueError(f"Unknown writer profile '{profile_name}' of table {table['destination_table_name']}")
+    writer_options = writer_profiles.writer_options(profiles[profile_name])
+
+    register_partitions = str(env_dict.get("REGISTER_PARTITIONS", "false")).lower() == "true"
+    if register_partitions and destination_schemas is None:
+        raise ValueError("The Springboard schemas are needed to register the partitions of the stream")
+
+    reader = (
+        spark.readStream.schema(job_helpers.csv_schema(source_fields))
+        .options(**job_helpers.csv_options)
+        .option("pathGlobFilter", CSV_FILE_GLOB)
+    )
+    max_files_per_trigger = int(env_dict.get("STREAM_MAX_FILES_PER_TRIGGER", 0))
+    if max_files_per_trigger > 0:
+        reader = reader.option("maxFilesPerTrigger", max_files_per_trigger)
+
+    writer = (
+        df_with_identifier(reader.csv(table["source_path"]))
+        .writeStream.queryName(table["destination_table_name"])
+        .option("checkpointLocation", f"{env_dict['STREAM_CHECKPOINT_URI']}/{table['destination_table_name']}")
+        .foreachBatch(
+            lambda df, _batch_id: write_micro_batch(
+                df,
+                destination_fields,
+                table,
+                env_dict,
+                writer_options,
+                destination_schemas if register_partitions else None,
+            )
+        )
+    )
+    # note: without 'availableNow', which is only in Spark 3.3+, the available files are processed in one micro-batch
+    trigger_seconds = int(env_dict.get("STREAM_TRIGGER_SECONDS", 0))
+    if trigger_seconds > 0:
+        writer = writer.trigger(processingTime=f"{trigger_seconds} seconds")
+    else:
+        writer = writer.trigger(once=True)
+
+    logging.info("%s Streaming %s to %s", log_prefix, table["source_path"], table["destination_path"])
+
+    return writer.start()
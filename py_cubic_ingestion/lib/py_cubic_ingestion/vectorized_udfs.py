@@ -0,0 +1,185 @@
+"""
+Vectorized counterparts to the functions in `custom_udfs`, to be used as Spark pandas UDFs.
+
+Each function receives a whole batch of values as a pandas Series, and casts the values
+in the layouts we usually see from Cubic with vectorized operations. Any other values are
+passed one at a time to the matching `custom_udfs` function, so the results (and errors)
+are the same as with the row-at-a-time UDFs.
+"""
+
+from py_cubic_ingestion import custom_udfs
+from typing import Any, Callable, Optional
+import numpy as np
+import pandas as pd
+
+# layouts that are cast in bulk, everything else falls back to 'custom_udfs'
+# note: longs are limited to 18 digits, so they can never be out of range
+LONG_PATTERN = r"\s*[+-]?[0-9]{1,18}\s*"
+DOUBLE_PATTERN = r"\s*[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\s*"
+# note: the 'T' date/time separator is replaced with a space before parsing
+DATETIME_FORMATS = {
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}": "%Y-%m-%d",
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}[ T][0-9]{2}:[0-9]{2}:[0-9]{2}": "%Y-%m-%d %H:%M:%S",
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}[ T][0-9]{2}:[0-9]{2}:[0-9]{2}\.[0-9]{1,9}": "%Y-%m-%d %H:%M:%S.%f",
+}
+
+
+def blank_mask(values: pd.Series) -> pd.Series:
+    """
+    Mask of the values that `custom_udfs.optional` turns into NULL.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Batch of string values
+
+    Returns
+    -------
+    pd.Series
+        Boolean Series, true where the value is None, empty or only whitespace
+    """
+
+    return values.isna() | (values.str.strip() == "")
+
+
+def match_mask(values: pd.Series, pattern: str) -> pd.Series:
+    """
+    Mask of the values that fully match the regular expression `pattern`.
+    """
+
+    return values.str.fullmatch(pattern, na=False).astype(bool)
+
+
+def cast_objects(
+    values: pd.Series,
+    bulk: pd.Series,
+    bulk_cast: Callable[[pd.Series], pd.Series],
+    as_type: Callable[[Optional[str]], Any],
+) -> np.ndarray:
+    """
+    Cast into an array of Python objects, with None for NULL values. The values marked in
+    `bulk` are cast together, and any other non-blank values are cast by `as_type`, one at
+    a time.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Batch of string values
+    bulk : pd.Series
+        Boolean Series, true where the value can be cast in bulk
+    bulk_cast : Callable
+        Vectorized cast for the values in bulk
+    as_type : Callable
+        Function from `custom_udfs` to cast the remaining values with, such as `column_as_date()`
+
+    Returns
+    -------
+    np.ndarray
+        Cast values
+    """
+
+    result = np.full(len(values), None, dtype=object)
+
+    if bulk.any():
+        result[bulk.to_numpy()] = bulk_cast(values[bulk]).to_numpy(dtype=object)
+
+    remaining = ~bulk & ~blank_mask(values)
+    if remaining.any():
+        # raises the same 'ValueError' as the row-at-a-time UDFs for bad values
+        result[remaining.to_numpy()] = [as_type(value) for value in values[remaining]]
+
+    return result
+
+
+def parse_datetimes(values: pd.Series) -> pd.Series:
+    """
+    Parse the values in the layouts of `DATETIME_FORMATS`, truncating fractional seconds to
+    microseconds as `dateutil` does. Values that can't be parsed, such as invalid dates or
+    dates outside of pandas' range, are NaT.
+    """
+
+    normalized = values.str.slice_replace(10, 11, " ").where(values.str.len() > 10, values)
+    result = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+
+    for pattern, datetime_format in DATETIME_FORMATS.items():
+        layout = match_mask(values, pattern)
+        if layout.any():
+            result[layout] = pd.to_datetime(normalized[layout], format=datetime_format, errors="coerce")
+
+    return result - pd.to_timedelta(result.dt.nanosecond, unit="ns")
+
+
+def as_long(values: pd.Series) -> pd.Series:
+    """
+    Vectorized `custom_udfs.as_long`.
+    """
+
+    return pd.Series(
+        cast_objects(
+            values,
+            match_mask(values, LONG_PATTERN),
+            lambda bulk: bulk.str.strip().astype("int64"),
+            custom_udfs.as_long,
+        ),
+        index=values.index,
+    )
+
+
+def as_double(values: pd.Series) -> pd.Series:
+    """
+    Vectorized `custom_udfs.as_double`.
+
+    Note: Spark treats NaN as NULL when reading the results of a pandas UDF, so a 'nan' value
+    is NULL here, where `custom_udfs.as_double` would give NaN.
+    """
+
+    return pd.Series(
+        cast_objects(
+            values,
+            match_mask(values, DOUBLE_PATTERN),
+            lambda bulk: bulk.str.strip().astype("float64"),
+            custom_udfs.as_double,
+        ),
+        index=values.index,
+        dtype="float64",
+    )
+
+
+def as_date(values: pd.Series) -> pd.Series:
+    """
+    Vectorized `custom_udfs.as_date`.
+    """
+
+    parsed = parse_datetimes(values)
+
+    return pd.Series(
+        cast_objects(values, parsed.notna(), lambda bulk: parsed[bulk.index].dt.date, custom_udfs.column_as_date()),
+        index=values.index,
+    )
+
+
+def as_timestamp(values: pd.Series) -> pd.Series:
+    """
+    Vectorized `custom_udfs.as_timestamp`.
+
+    Note: timestamps outside of pandas' range (years 1677 to 2262), like '9999-12-31 00:00:00',
+    are returned as Python datetimes, which Spark reads as UTC regardless of the session timezone.
+    """
+
+    parsed = parse_datetimes(values)
+    remaining = parsed.isna() & ~blank_mask(values)
+
+    if not remaining.any():
+        return parsed
+
+    # raises the same 'ValueError' as the row-at-a-time UDFs for bad values
+    column_as_timestamp = custom_udfs.column_as_timestamp()
+    remaining_values = [column_as_timestamp(value) for value in values[remaining]]
+
+    try:
+        parsed[remaining] = pd.to_datetime(remaining_values)
+    except (OverflowError, pd.errors.OutOfBoundsDatetime):
+        parsed = parsed.astype(object).where(parsed.notna(), None)
+        parsed[remaining] = remaining_values
+
+    return parsed
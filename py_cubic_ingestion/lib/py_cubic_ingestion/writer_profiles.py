@@ -0,0 +1,117 @@
+"""
+Profiles of the Parquet writer, picked for each destination table, as Athena bills and queries by
+the bytes it scans. A profile is a dict, which can come from JSON, with any of:
+
+- 'compression': codec of the column chunks, such as 'snappy' (Spark's default), 'zstd' or 'gzip'
+- 'dictionary': whether columns are dictionary encoded, when they have few enough distinct values
+- 'dictionary_page_size_bytes': size of the dictionary of a column chunk before falling back to
+  plain encoding
+- 'row_group_size_bytes': size of the row groups, Athena's unit of work and of skipping by
+  min/max statistics
+- 'page_size_bytes': size of the pages within the column chunks
+- 'statistics_truncate_length': length the min/max statistics of string columns are truncated to
+- 'columns': the 'dictionary' setting of each column, by name, to override the profile's
+
+Settings that aren't in the profile keep the Parquet writer's default. The profile of a load is its
+'writer_profile' in the job's payload, if any, or else the job's default (see `profile_name`).
+
+Note: with the Parquet version of Spark 3.1 (Glue 3.0), Parquet 1.10, 'zstd' needs Hadoop's native
+zstd library, and both 'statistics_truncate_length' and the settings of 'columns' are ignored, as
+they are only supported from Parquet 1.12 (Spark 3.2).
+"""
+
+from typing import Dict, Optional
+import json
+
+
+DEFAULT_PROFILE_NAME = "default"
+
+PROFILES: Dict[str, dict] = {
+    # Spark's defaults: snappy, with 128 MB row groups and 1 MB pages
+    "default": {},
+    "snappy": {"compression": "snappy"},
+    "zstd": {"compression": "zstd"},
+    "gzip": {"compression": "gzip"},
+}
+
+COMPRESSION_CODECS = ["uncompressed", "snappy", "gzip", "lzo", "brotli", "lz4", "zstd"]
+
+# Parquet writer options of the profiles' settings, other than 'compression' and 'columns'
+setting_options = {
+    "dictionary": "parquet.enable.dictionary",
+    "dictionary_page_size_bytes": "parquet.dictionary.page.size",
+    "row_group_size_bytes": "parquet.block.size",
+    "page_size_bytes": "parquet.page.size",
+    "statistics_truncate_length": "parquet.statistics.truncate.length",
+}
+
+
+def option_value(value: object) -> str:
+    """
+    Value of a writer option, with booleans in lowercase as Hadoop expects them.
+    """
+
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+def writer_options(profile: dict) -> Dict[str, str]:
+    """
+    Options of Spark's Parquet writer for a profile.
+
+    Parameters
+    ----------
+    profile : dict
+        Writer profile, see the module's documentation
+
+    Returns
+    -------
+    dict
+        Options for `DataFrameWriter.options`
+    """
+
+    options = {}
+
+    for setting, value in profile.items():
+        if setting == "compression":
+            if value not in COMPRESSION_CODECS:
+                raise ValueError(f"Unknown Parquet compression '{value}', expected one of {COMPRESSION_CODECS}")
+            options["compression"] = value
+        elif setting == "columns":
+            for column_name, column_settings in value.items():
+                for column_setting, column_value in column_settings.items():
+                    if column_setting != "dictionary":
+                        raise ValueError(f"Unknown writer setting '{column_setting}' of column '{column_name}'")
+                    options[f"{setting_options['dictionary']}#{column_name}"] = option_value(column_value)
+        elif setting in setting_options:
+            options[setting_options[setting]] = option_value(value)
+        else:
+            raise ValueError(f"Unknown writer setting '{setting}'")
+
+    return options
+
+
+def profiles_from_json(profiles_json: Optional[str]) -> Dict[str, dict]:
+    """
+    Writer profiles by name, the built-in `PROFILES` along with the ones in the JSON object, such
+    as the job's WRITER_PROFILES, which replace the built-in profiles of the same name.
+    """
+
+    profiles = dict(PROFILES)
+    if profiles_json:
+        profiles.update(json.loads(profiles_json))
+
+    # fail before any loads are written if a profile isn't valid
+    for profile in profiles.values():
+        writer_options(profile)
+
+    return profiles
+
+
+def profile_name(load: dict, default_profile_name: str = DEFAULT_PROFILE_NAME) -> str:
+    """
+    Name of the writer profile of a load, its 'writer_profile' if it has one.
+    """
+
+    name: str = load.get("writer_profile") or default_profile_name
+
+    return name
@@ -4,6 +4,7 @@ Test configurations, setups, and fixtures
 
 from botocore.stub import Stubber
 from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import load_runner
 from pyspark.sql import SparkSession
 from pyspark.sql.session import SparkSession as SparkSessionType
 from typing import Iterator, Tuple
@@ -23,6 +24,8 @@ def fixture_spark_session() -> SparkSessionType:
         Spark Session available to use in tests
     """
 
+    # note: as for the job, so that concurrent loads have their own scheduler pools and job groups
+    load_runner.pin_threads()
     spark = SparkSession.builder.master("local").appName("test").getOrCreate()
     spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
 
@@ -0,0 +1,262 @@
+"""
+Testing module for `arrow_ingest.py`.
+"""
+
+from botocore.stub import Stubber
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import arrow_ingest, job_helpers
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import Tuple
+import gzip
+import pathlib
+import pyarrow.parquet
+import pytest
+
+
+source_fields = [{"name": name, "type": "string"} for name in ["sample_id", "sample_name", "sample_date", "sample_dtm"]]
+destination_fields = [
+    {"name": "sample_id", "type": "long"},
+    {"name": "sample_name", "type": "string"},
+    {"name": "sample_date", "type": "date"},
+    {"name": "sample_dtm", "type": "timestamp"},
+]
+
+# blank values, quoted or not, quoted line breaks and commas, multibyte characters, and timestamps
+# with time zones and with more digits than microseconds
+csv_rows = [
+    "SAMPLE_ID,SAMPLE_NAME,SAMPLE_DATE,SAMPLE_DTM",
+    '1,"Sample 1 🔥",2021-12-01,2021-12-01 11:20:30.4444444',
+    '2,"Sample 2, with a ""quote""\nand a line break",2021-12-02,2021-12-01T11:20:30-05:00',
+    '3,"",,""',
+    "4, ,  ,2021-12-01 11:20:30",
+]
+
+
+def write_csv(path: pathlib.Path, rows: list) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as csv_file:
+        csv_file.write("\n".join(rows) + "\n")
+
+
+def arrow_load(tmp_path: pathlib.Path, rows: list) -> dict:
+    """
+    Load of a CSV file with the rows, written under the temporary directory.
+    """
+
+    write_csv(tmp_path / "incoming" / "LOAD1.csv.gz", rows)
+
+    return {
+        "id": 1,
+        "source_table_name": "cubic_ods_qlik__edw_sample",
+        "source_s3_key": str(tmp_path / "incoming" / "LOAD1.csv.gz"),
+        "destination_table_name": "cubic_ods_qlik__edw_sample",
+        "destination_path": f"file://{tmp_path}/springboard/EDW.SAMPLE",
+        "partition_columns": [
+            {"name": "snapshot", "value": "20211201T000000Z"},
+            {"name": "identifier", "value": "LOAD1.csv.gz"},
+        ],
+    }
+
+
+def test_ingest_load(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that a load is written like with Spark, with the same schema and values, in the same
+    partition layout.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    load = arrow_load(tmp_path, csv_rows + csv_rows[1:] * 50)
+    spark_path = str(tmp_path / "spark")
+    job_helpers.write_parquet(
+        job_helpers.df_with_updated_schema(
+            job_helpers.df_from_csv(spark_session, load["source_s3_key"], source_fields), destination_fields
+        ),
+        load["partition_columns"],
+        spark_path,
+    )
+
+    # small blocks and row groups, so that the file is read and written in several of them
+    metrics = arrow_ingest.ingest_load(
+        load, source_fields, destination_fields, {"row_group_size_bytes": 4096}, block_size_bytes=1024
+    )
+
+    spark_df = spark_session.read.parquet(spark_path)
+    arrow_df = spark_session.read.parquet(load["destination_path"])
+
+    assert spark_df.dtypes == arrow_df.dtypes
+    assert sorted(spark_df.collect()) == sorted(arrow_df.collect())
+    assert 204 == metrics["rows_written"]
+
+    [path] = list((tmp_path / "springboard" / "EDW.SAMPLE").glob("snapshot=*/identifier=*/part-*.snappy.parquet"))
+    metadata = pyarrow.parquet.read_metadata(path)
+
+    assert metadata.num_row_groups > 1
+    assert path.stat().st_size == metrics["output_bytes"]
+    assert "INT96" == metadata.schema.column(3).physical_type
+
+
+def test_ingest_load_overwrite(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that the partition's files are replaced, except by a load without rows or one that fails.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    load = arrow_load(tmp_path, csv_rows)
+    arrow_ingest.ingest_load(load, source_fields, destination_fields, {})
+    arrow_ingest.ingest_load(load, source_fields, destination_fields, {"compression": "gzip"})
+
+    partition_path = tmp_path / "springboard" / "EDW.SAMPLE" / "snapshot=20211201T000000Z" / "identifier=LOAD1.csv.gz"
+    [path] = list(partition_path.iterdir())
+
+    assert path.name.endswith(".gz.parquet")
+    assert 4 == spark_session.read.parquet(str(partition_path)).count()
+
+    load = arrow_load(tmp_path, csv_rows[:1])
+    metrics = arrow_ingest.ingest_load(load, source_fields, destination_fields, {})
+
+    assert 0 == metrics["rows_written"]
+    assert [path] == list(partition_path.iterdir())
+
+    load = arrow_load(tmp_path, csv_rows + ["five,Sample 5,,"])
+    with pytest.raises(ValueError, match="'five', invalid literal"):
+        arrow_ingest.ingest_load(load, source_fields, destination_fields, {}, block_size_bytes=64)
+
+    assert [path] == list(partition_path.iterdir())
+
+
+def test_parquet_writer_options() -> None:
+    column_names = ["sample_id", "sample_name", "sample_date"]
+
+    assert {"compression": "snappy", "use_dictionary": True} == arrow_ingest.parquet_writer_options({}, column_names)
+    # the columns that aren't overridden keep the profile's setting
+    assert {"compression": "none", "use_dictionary": ["sample_id", "sample_date"], "data_page_size": 65536} == (
+        arrow_ingest.parquet_writer_options(
+            {
+                "compression": "uncompressed",
+                "page_size_bytes": 65536,
+                "columns": {"sample_name": {"dictionary": False}},
+            },
+            column_names,
+        )
+    )
+    assert {"compression": "snappy", "use_dictionary": ["sample_name"]} == arrow_ingest.parquet_writer_options(
+        {"dictionary": False, "columns": {"sample_name": {"dictionary": True}}}, column_names
+    )
+
+    with pytest.raises(ValueError, match="Parquet compression 'lzo' isn't supported"):
+        arrow_ingest.parquet_writer_options({"compression": "lzo"}, column_names)
+
+    with pytest.raises(ValueError, match="Types not supported by the arrow engine"):
+        arrow_ingest.arrow_schema([{"name": "sample_amount", "type": "decimal(10,2)"}])
+
+
+def test_run_loads(glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path) -> None:
+    """
+    Test that the loads are ingested with the schemas of their Glue tables, and their writer profile,
+    and that their partitions are registered.
+
+    Parameters
+    ----------
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    for database_name, types in [
+        ("springboard", ["bigint", "string", "date", "timestamp"]),
+        ("incoming", ["string"] * 4),
+    ]:
+        stubber.add_response(
+            "get_tables",
+            {
+                "TableList": [
+                    {
+                        "Name": "cubic_ods_qlik__edw_sample",
+                        "StorageDescriptor": {
+                            "Columns": [
+                                {"Name": field["name"], "Type": column_type}
+                                for field, column_type in zip(source_fields, types)
+                            ]
+                        },
+                    }
+                ]
+            },
+            {"DatabaseName": database_name, "Expression": "cubic_ods_qlik__edw_sample"},
+        )
+
+    load = {**arrow_load(tmp_path, csv_rows), "writer_profile": "zstd"}
+    stubber.add_response(
+        "batch_create_partition",
+        {},
+        {
+            "DatabaseName": "springboard",
+            "TableName": "cubic_ods_qlik__edw_sample",
+            "PartitionInputList": [
+                {
+                    "Values": ["20211201T000000Z", "LOAD1.csv.gz"],
+                    "StorageDescriptor": {
+                        "Columns": [
+                            {"Name": field["name"], "Type": column_type}
+                            for field, column_type in zip(source_fields, ["bigint", "string", "date", "timestamp"])
+                        ],
+                        "Location": f"{load['destination_path']}/snapshot=20211201T000000Z/identifier=LOAD1.csv.gz",
+                    },
+                }
+            ],
+        },
+    )
+    metrics_by_load = arrow_ingest.run_loads(
+        [load],
+        {
+            "GLUE_DATABASE_INCOMING": "incoming",
+            "GLUE_DATABASE_SPRINGBOARD": "springboard",
+            "REGISTER_PARTITIONS": "true",
+        },
+        glue_client,
+    )
+
+    assert [4] == [metrics["rows_written"] for metrics in metrics_by_load]
+    assert 1 == len(list((tmp_path / "springboard").glob("**/*.zstd.parquet")))
+
+
+def test_ingest_load_column_dictionary(tmp_path: pathlib.Path) -> None:
+    """
+    Test that turning off the dictionary of one column keeps the dictionaries of the others.
+
+    Parameters
+    ----------
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    load = arrow_load(tmp_path, csv_rows)
+    arrow_ingest.ingest_load(
+        load, source_fields, destination_fields, {"columns": {"sample_name": {"dictionary": False}}}
+    )
+
+    [path] = list((tmp_path / "springboard" / "EDW.SAMPLE").glob("snapshot=*/identifier=*/part-*.parquet"))
+    row_group = pyarrow.parquet.read_metadata(path).row_group(0)
+
+    assert {
+        "sample_id": True,
+        "sample_name": False,
+        "sample_date": True,
+        "sample_dtm": True,
+    } == {
+        row_group.column(index).path_in_schema: row_group.column(index).has_dictionary_page
+        for index in range(row_group.num_columns)
+    }
@@ -0,0 +1,67 @@
+"""
+Testing module for `cast_accounting.py`.
+"""
+
+from py_cubic_ingestion import cast_accounting, custom_udfs
+from pyspark.sql.session import SparkSession as SparkSessionType
+import pathlib
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik"
+
+
+def test_failures_accumulator_param() -> None:
+    param = cast_accounting.FailuresAccumulatorParam(sample_size=2)
+
+    assert not param.zero({})
+    assert {
+        "a": {"count": 3, "samples": ["x", "y"]},
+        "b": {"count": 1, "samples": ["z"]},
+    } == param.addInPlace(
+        {"a": {"count": 2, "samples": ["x", "y"]}},
+        {"a": {"count": 1, "samples": ["w"]}, "b": {"count": 1, "samples": ["z"]}},
+    )
+
+
+def test_accounted(spark_session: SparkSessionType) -> None:
+    """
+    Test that values that can't be converted are added to the accumulator, and converted to None.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    cast_failures = spark_session.sparkContext.accumulator({}, cast_accounting.FailuresAccumulatorParam())
+    as_long = cast_accounting.accounted("sample_id", custom_udfs.as_long, cast_failures)
+
+    assert 1 == as_long("1")
+    assert as_long("") is None
+    assert as_long("one") is None
+    assert {"sample_id": {"count": 1, "samples": ["one"]}} == cast_failures.value
+
+
+def test_dfm_record_count(spark_session: SparkSessionType) -> None:
+    """
+    Test reading the number of rows of loads from their '.dfm' files.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    assert 2 == cast_accounting.dfm_record_count(spark_session, str(sample_path / "EDW.SAMPLE" / "LOAD1.csv.gz"))
+    assert 1 == cast_accounting.dfm_record_count(spark_session, str(sample_path / "EDW.SAMPLE" / "LOAD2.csv.gz"))
+
+
+def test_rejection_reasons() -> None:
+    cast_failures = {"sample_id": {"count": 2, "samples": ["one", "two"]}}
+
+    assert not cast_accounting.rejection_reasons({}, 0, 3, 3)
+    assert not cast_accounting.rejection_reasons(cast_failures, 2, 3, 3)
+    assert 1 == len(cast_accounting.rejection_reasons(cast_failures, 1, 3, 3))
+    assert 1 == len(cast_accounting.rejection_reasons({}, 0, 2, 3))
+    assert 2 == len(cast_accounting.rejection_reasons(cast_failures, 0, 2, 3))
+    # loads without a '.dfm' file
+    assert not cast_accounting.rejection_reasons({}, 0, None, None)
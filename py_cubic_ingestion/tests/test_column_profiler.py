@@ -0,0 +1,87 @@
+"""
+Testing module for `column_profiler.py`.
+"""
+
+from py_cubic_ingestion import column_profiler
+from pyspark.sql.session import SparkSession as SparkSessionType
+
+
+def test_profile_df(spark_session: SparkSessionType) -> None:
+    """
+    Test that each column gets the narrowest type that all its values can be cast to.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    data = [
+        ("1", "1.5", "2021-12-01", "2021-12-01 11:20:30.4444444", "1", "", "9223372036854775808", "007", "1"),
+        (" 2 ", "2", "20211202", "2021-12-01T11:20:30Z", "one", None, "1", "12", "0.1"),
+        ("", "", "2021-12-03 00:00:00", "2021-12-01", "two", " ", "2", "", "20210915031230320000000000000000041"),
+    ]
+    df = spark_session.createDataFrame(
+        data,
+        "long_col string, double_col string, date_col string, timestamp_col string, "
+        "string_col string, blank_col string, overflow_col string, code_col string, change_seq_col string",
+    )
+
+    profile = column_profiler.profile_df(df)
+
+    assert 3 == profile["row_count"]
+    assert [
+        {"Name": "long_col", "Type": "bigint"},
+        {"Name": "double_col", "Type": "double"},
+        {"Name": "date_col", "Type": "date"},
+        {"Name": "timestamp_col", "Type": "timestamp"},
+        {"Name": "string_col", "Type": "string"},
+        {"Name": "blank_col", "Type": "string"},
+        {"Name": "overflow_col", "Type": "string"},
+        {"Name": "code_col", "Type": "string"},
+        {"Name": "change_seq_col", "Type": "string"},
+    ] == profile["columns"]
+
+    evidence = profile["evidence"]
+    assert 1 / 3 == evidence["long_col"]["null_rate"]
+    assert {"failure_count": 1, "counterexamples": ["1.5"]} == evidence["double_col"]["types"]["long"]
+    assert 2 == evidence["timestamp_col"]["types"]["date"]["failure_count"]
+    assert {"failure_count": 3, "counterexamples": ["1", "two"]} == evidence["string_col"]["types"]["timestamp"]
+    assert 0 == evidence["blank_col"]["non_blank_count"]
+    assert ["9223372036854775808"] == evidence["overflow_col"]["types"]["long"]["counterexamples"]
+    assert ["007"] == evidence["code_col"]["types"]["long"]["counterexamples"]
+    assert ["007"] == evidence["code_col"]["types"]["double"]["counterexamples"]
+    assert ["20210915031230320000000000000000041"] == evidence["change_seq_col"]["types"]["double"]["counterexamples"]
+
+
+def test_double_failure(spark_session: SparkSessionType) -> None:
+    """
+    Test that only the numbers that are the same after a round-trip through a double can be cast.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    values = {
+        "1.5": False,
+        " -0.25 ": False,
+        "1e3": False,
+        "0.000001": False,
+        "123456789012345": False,
+        "9223372036854775807": True,
+        "9223372036854775808": True,
+        "1234567890.1234567": True,
+        "00.5": True,
+        "1e400": True,
+        "1e-400": True,
+        "inf": True,
+        "one": True,
+    }
+    df = spark_session.createDataFrame([(value,) for value in values], "value string")
+
+    assert values == {
+        row.value: row.failure
+        for row in df.select("value", column_profiler.double_failure(df.value).alias("failure")).collect()
+    }
@@ -0,0 +1,70 @@
+"""
+Tests for the caches of converted values
+"""
+
+from py_cubic_ingestion import conversion_cache, custom_udfs
+from typing import Iterator
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> Iterator[None]:
+    """
+    Start each test without any caches in the process.
+    """
+    conversion_cache.caches.clear()
+
+    yield
+
+    conversion_cache.caches.clear()
+
+
+def test_lru_cache() -> None:
+    cache = conversion_cache.LRUCache("long", 2)
+
+    assert 1 == cache.get("1", custom_udfs.as_long)
+    assert 2 == cache.get("2", custom_udfs.as_long)
+    assert 1 == cache.get("1", custom_udfs.as_long)
+    # evicts '2', the least recently used
+    assert 3 == cache.get("3", custom_udfs.as_long)
+
+    assert ["1", "3"] == list(cache.values)
+    assert {"hits": 1, "misses": 3, "evictions": 1} == cache.stats
+
+
+def test_lru_cache_error() -> None:
+    """
+    Checks that a bad value raises every time, and isn't cached
+    """
+    cache = conversion_cache.LRUCache("long", 2)
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="'invalid'"):
+            cache.get("invalid", custom_udfs.as_long)
+
+    assert 0 == len(cache.values)
+    assert {"hits": 0, "misses": 2, "evictions": 0} == cache.stats
+
+
+def test_cached() -> None:
+    as_long = conversion_cache.cached("long", custom_udfs.as_long, 10)
+    as_timestamp = conversion_cache.cached("timestamp", custom_udfs.column_as_timestamp(), 10)
+
+    values = ["2021-12-01 11:20:30.4444444", "2021-12-01 11:20:30.4444444", "", None]
+    assert [custom_udfs.as_timestamp(value) for value in values] == [as_timestamp(value) for value in values]
+    assert [1, 1, None] == [as_long(value) for value in ["1", "1", None]]
+
+    # a conversion with the same name shares the cache
+    assert 1 == conversion_cache.cached("long", custom_udfs.as_long, 10)("1")
+
+    assert {
+        "long": {"hits": 2, "misses": 1, "evictions": 0, "size": 1},
+        "timestamp": {"hits": 1, "misses": 2, "evictions": 0, "size": 2},
+    } == conversion_cache.stats()
+
+
+def test_stats_accumulator_param() -> None:
+    param = conversion_cache.StatsAccumulatorParam()
+
+    assert not param.zero({})
+    assert {"long.hits": 3, "long.misses": 1} == param.addInPlace({"long.hits": 1, "long.misses": 1}, {"long.hits": 2})
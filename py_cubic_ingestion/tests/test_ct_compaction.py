@@ -0,0 +1,207 @@
+"""
+Testing module for `ct_compaction.py`.
+"""
+
+from py_cubic_ingestion import ct_compaction, spark_files
+from pyspark.sql.session import SparkSession as SparkSessionType
+import concurrent.futures
+import pathlib
+import pytest
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik"
+
+snapshot = "20211201T000000Z"
+
+
+def write_changes(spark_session: SparkSessionType, ct_path: pathlib.Path, identifier: str, changes: list) -> None:
+    """
+    Write changes of 'EDW.SAMPLE__ct' to its Springboard table, as (sequence, operation, id, name).
+    """
+
+    changes_df = spark_session.createDataFrame(
+        [(seq, oper, "2021-10-08 13:12:31", sample_id, name) for seq, oper, sample_id, name in changes],
+        "header__change_seq string, header__change_oper string, header__timestamp string, "
+        "sample_id long, sample_name string",
+    )
+
+    changes_df.selectExpr("*", f"'{snapshot}' AS snapshot", f"'{identifier}' AS identifier").write.partitionBy(
+        "snapshot", "identifier"
+    ).parquet(str(ct_path), mode="append")
+
+
+def compacted_rows(spark_session: SparkSessionType, compacted_path: pathlib.Path) -> list:
+    return [
+        (row.sample_id, row.sample_name, row.header__change_seq)
+        for row in spark_session.read.parquet(str(compacted_path)).orderBy("sample_id").collect()
+    ]
+
+
+def test_table_paths() -> None:
+    assert ("s3://springboard/EDW.SAMPLE", "s3://springboard/EDW.SAMPLE__compacted") == ct_compaction.table_paths(
+        "s3://springboard/EDW.SAMPLE__ct/"
+    )
+
+    with pytest.raises(ValueError):
+        ct_compaction.table_paths("s3://springboard/EDW.SAMPLE/")
+
+
+def test_primary_keys(spark_session: SparkSessionType) -> None:
+    """
+    Test that the primary key is read from the '.dfm' file, with the names as in Springboard.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    dfm = spark_files.read_dfm(spark_session, str(sample_path / "EDW.SAMPLE__ct" / "20211201-112233444.csv.gz"))
+
+    assert ["sample_id"] == ct_compaction.primary_keys(dfm)
+
+    with pytest.raises(ValueError):
+        ct_compaction.primary_keys({"fileInfo": {"name": "LOAD1.csv"}, "dataInfo": {"columns": [{"name": "A"}]}})
+
+
+def test_compact_changes(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that changes are merged into the snapshot, by primary key, and that only the key buckets
+    with changes are written again.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    ct_path = tmp_path / "EDW.SAMPLE__ct"
+    compacted_path = tmp_path / "EDW.SAMPLE__compacted"
+    spark_session.createDataFrame(
+        [(1, "Sample 1", snapshot, "LOAD1.csv.gz"), (2, "Sample 2", snapshot, "LOAD1.csv.gz")],
+        "sample_id long, sample_name string, snapshot string, identifier string",
+    ).write.partitionBy("snapshot", "identifier").parquet(str(tmp_path / "EDW.SAMPLE"))
+
+    # the first changes start from the snapshot, in all the buckets
+    write_changes(spark_session, ct_path, "1.csv.gz", [("01", "I", 4, "Sample 4"), ("02", "U", 2, "Sample 2 U")])
+    write_changes(spark_session, ct_path, "2.csv.gz", [("02", "U", 2, "Sample 2 UU")])
+    changes_df = spark_session.read.parquet(str(ct_path))
+
+    assert list(range(64)) == ct_compaction.compact_changes(
+        spark_session, changes_df, str(ct_path), snapshot, ["sample_id"], 64
+    )
+    assert [(1, "Sample 1", None), (2, "Sample 2 UU", "02"), (4, "Sample 4", "01")] == compacted_rows(
+        spark_session, compacted_path
+    )
+
+    # then only the buckets of the keys with changes
+    bucket_files = {path: path.stat().st_mtime_ns for path in compacted_path.glob("*/*/*.parquet")}
+    write_changes(spark_session, ct_path, "3.csv.gz", [("03", "D", 1, "Sample 1"), ("03", "U", 4, "Sample 4 U")])
+    changes_df = spark_session.read.parquet(str(ct_path / f"snapshot={snapshot}" / "identifier=3.csv.gz"))
+    changes_df = changes_df.selectExpr("*", "'3.csv.gz' AS identifier")
+
+    buckets = ct_compaction.compact_changes(spark_session, changes_df, str(ct_path), snapshot, ["sample_id"], 64)
+
+    assert 2 == len(buckets)
+    assert [(2, "Sample 2 UU", "02"), (4, "Sample 4 U", "03")] == compacted_rows(spark_session, compacted_path)
+    # the bucket of the deleted row is gone, and the bucket of row 2 wasn't written again
+    assert 2 == len(list(compacted_path.glob("*/*/*.parquet")))
+    assert any(bucket_files.get(path) == path.stat().st_mtime_ns for path in compacted_path.glob("*/*/*.parquet"))
+
+
+def test_compact_changes_bucket_files(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that each key bucket is written as a single file, even from the many partitions of the
+    merge's shuffle without adaptive query execution, which is off by default in Spark 3.1 (Glue
+    3.0), and that the staged rows are deleted.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    ct_path = tmp_path / "EDW.SAMPLE__ct"
+    compacted_path = tmp_path / "EDW.SAMPLE__compacted"
+    spark_session.range(1000).selectExpr(
+        "id AS sample_id",
+        "CONCAT('Sample ', id) AS sample_name",
+        f"'{snapshot}' AS snapshot",
+        "'LOAD1.csv.gz' AS identifier",
+    ).write.partitionBy("snapshot", "identifier").parquet(str(tmp_path / "EDW.SAMPLE"))
+
+    spark_session.conf.set("spark.sql.adaptive.enabled", "false")
+    try:
+        for identifier, sample_id in [("1.csv.gz", 1), ("2.csv.gz", 2)]:
+            write_changes(spark_session, ct_path, identifier, [("01", "U", sample_id, f"Sample {sample_id} U")])
+            changes_df = spark_session.read.parquet(str(ct_path / f"snapshot={snapshot}" / f"identifier={identifier}"))
+            ct_compaction.compact_changes(
+                spark_session,
+                changes_df.selectExpr("*", f"'{identifier}' AS identifier"),
+                str(ct_path),
+                snapshot,
+                ["sample_id"],
+                4,
+            )
+    finally:
+        spark_session.conf.unset("spark.sql.adaptive.enabled")
+
+    assert [1] * 4 == [
+        len(list(bucket_path.glob("*.parquet")))
+        for bucket_path in sorted((compacted_path / f"snapshot={snapshot}").glob("key_bucket=*"))
+    ]
+    assert 1000 == len(compacted_rows(spark_session, compacted_path))
+    assert [(1, "Sample 1 U", "01"), (2, "Sample 2 U", "01")] == compacted_rows(spark_session, compacted_path)[1:3]
+    assert not (compacted_path / ct_compaction.STAGING_DIRECTORY / f"snapshot={snapshot}").exists()
+
+
+def test_compact_changes_concurrently(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that batches of changes merged at the same time into the same buckets are all kept.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    ct_path = tmp_path / "EDW.SAMPLE__ct"
+    compacted_path = tmp_path / "EDW.SAMPLE__compacted"
+    spark_session.createDataFrame(
+        [(1, "Sample 1", snapshot, "LOAD1.csv.gz"), (2, "Sample 2", snapshot, "LOAD1.csv.gz")],
+        "sample_id long, sample_name string, snapshot string, identifier string",
+    ).write.partitionBy("snapshot", "identifier").parquet(str(tmp_path / "EDW.SAMPLE"))
+
+    write_changes(spark_session, ct_path, "1.csv.gz", [("01", "I", 3, "Sample 3")])
+    ct_compaction.compact_changes(
+        spark_session, spark_session.read.parquet(str(ct_path)), str(ct_path), snapshot, ["sample_id"], 1
+    )
+
+    # batches of the changes of different keys, in the single bucket
+    changes_dfs = []
+    for identifier, sample_id in [("2.csv.gz", 1), ("3.csv.gz", 2)]:
+        write_changes(spark_session, ct_path, identifier, [("02", "U", sample_id, f"Sample {sample_id} U")])
+        changes_dfs.append(
+            spark_session.read.parquet(str(ct_path / f"snapshot={snapshot}" / f"identifier={identifier}")).selectExpr(
+                "*", f"'{identifier}' AS identifier"
+            )
+        )
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        list(
+            executor.map(
+                lambda changes_df: ct_compaction.compact_changes(
+                    spark_session, changes_df, str(ct_path), snapshot, ["sample_id"], 1
+                ),
+                changes_dfs,
+            )
+        )
+
+    assert [(1, "Sample 1 U", "02"), (2, "Sample 2 U", "02"), (3, "Sample 3", "01")] == compacted_rows(
+        spark_session, compacted_path
+    )
@@ -88,3 +88,41 @@ def test_as_timestamp() -> None:
     # parsing error
     with pytest.raises(ValueError):
         custom_udfs.as_timestamp("invalid")
+
+
+def test_column_as_date() -> None:
+    as_date = custom_udfs.column_as_date()
+
+    # empty
+    assert as_date(None) is None
+    assert as_date("") is None
+
+    # learned layout, and different ones
+    for value in ["2022-01-01", "2022-01-02", "20220102", "2022-01-03 23:34:56-04:00", "2021-12-01 11:20:30.4444444"]:
+        assert custom_udfs.as_date(value) == as_date(value)
+
+    # parsing error
+    with pytest.raises(ValueError, match="'invalid'"):
+        as_date("invalid")
+
+
+def test_column_as_timestamp() -> None:
+    as_timestamp = custom_udfs.column_as_timestamp()
+
+    # empty
+    assert as_timestamp(None) is None
+    assert as_timestamp("") is None
+
+    # learned layout, and different ones
+    for value in [
+        "2021-12-01 11:20:30.4444444",
+        "2021-12-01 11:20:31.4444444",
+        "2022-01-01 12:34:56-04:00",
+        "2022-01-01 24:00:00",
+        "2022-01-03",
+    ]:
+        assert custom_udfs.as_timestamp(value) == as_timestamp(value)
+
+    # parsing error
+    with pytest.raises(ValueError, match="'2021-02-30 11:20:30.4444444'"):
+        as_timestamp("2021-02-30 11:20:30.4444444")
@@ -0,0 +1,163 @@
+"""
+Testing module for `data_layout.py`.
+"""
+
+from py_cubic_ingestion import data_layout, job_helpers
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import Iterator, List
+import datetime
+import pathlib
+import pyarrow.parquet
+import pytest
+
+
+def bloom_filters(spark: SparkSessionType, path: pathlib.Path) -> List[bool]:
+    """
+    Whether each column of the first row group of the Parquet file has a bloom filter, from the
+    file's footer as read by Parquet's Java library.
+    """
+
+    # pylint: disable=protected-access
+    jvm = spark._jvm
+    input_file = jvm.org.apache.parquet.hadoop.util.HadoopInputFile.fromPath(  # type: ignore[union-attr]
+        jvm.org.apache.hadoop.fs.Path(str(path)), spark._jsc.hadoopConfiguration()  # type: ignore[union-attr]
+    )
+    reader = jvm.org.apache.parquet.hadoop.ParquetFileReader.open(input_file)  # type: ignore[union-attr]
+    try:
+        return [column.getBloomFilterOffset() >= 0 for column in reader.getFooter().getBlocks().get(0).getColumns()]
+    finally:
+        reader.close()
+
+
+def test_cluster_columns() -> None:
+    assert [] == data_layout.cluster_columns({"id": 1})
+    assert ["sample_id", "edw_updated_dtm"] == data_layout.cluster_columns(
+        {"id": 1, "cluster_columns": ["SAMPLE_ID", "EDW_UPDATED_DTM"]}
+    )
+
+
+def test_z_order_value(spark_session: SparkSessionType) -> None:
+    """
+    Test that the bits of the scaled values of the columns are interleaved.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    max_scaled = 2**data_layout.Z_ORDER_BITS - 1
+    df = spark_session.createDataFrame(
+        [
+            (0, datetime.date(2022, 1, 1)),
+            (max_scaled, datetime.date(2022, 1, 1)),
+            (0, datetime.date(2022, 1, 1) + datetime.timedelta(days=max_scaled)),
+            (1, datetime.date(2022, 1, 3)),
+            (None, None),
+        ],
+        "sample_id long, sample_date date",
+    )
+
+    z_values = [
+        row.z for row in df.select(data_layout.z_order_value(df, ["sample_id", "sample_date"]).alias("z")).collect()
+    ]
+
+    # all bits of the first column are the even bits, and of the second column the odd bits
+    assert [0, 0x55555555, 0xAAAAAAAA, 0b1001, 0] == z_values
+
+    with pytest.raises(ValueError, match="Z-ordering needs two columns"):
+        data_layout.z_order_value(df, ["sample_id"])
+
+    with pytest.raises(ValueError, match="Can't Z-order a column of type string"):
+        data_layout.z_order_value(
+            df.withColumn("sample_name", df.sample_id.cast("string")), ["sample_id", "sample_name"]
+        )
+
+
+@pytest.fixture(name="layout_spark_session")
+def fixture_layout_spark_session(spark_session: SparkSessionType) -> Iterator[SparkSessionType]:
+    """
+    Spark session without the planned sort of writes, as set up by the jobs, see
+    `data_layout.disable_planned_write`.
+    """
+
+    data_layout.disable_planned_write(spark_session)
+    yield spark_session
+    spark_session.conf.unset("spark.sql.optimizer.plannedWrite.enabled")
+
+
+@pytest.mark.parametrize("cluster_method", ["sort", "z_order"])
+def test_df_with_layout(layout_spark_session: SparkSessionType, tmp_path: pathlib.Path, cluster_method: str) -> None:
+    """
+    Test that the rows are sorted within each file, so that the min/max statistics of the row groups
+    don't overlap, and that bloom filters are written.
+
+    Parameters
+    ----------
+    layout_spark_session : list
+        Fixture that contains the Spark Session to use, without the planned sort of writes
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    cluster_method : str
+        Cluster method of the load
+    """
+
+    load = {
+        "id": 1,
+        "cluster_columns": ["SAMPLE_ID", "SAMPLE_COUNT"],
+        "cluster_method": cluster_method,
+        "bloom_filter_columns": ["SAMPLE_ID"],
+    }
+    # rows with their ids in a shuffled order, as they arrive
+    df = layout_spark_session.range(50000).selectExpr(
+        "(id * 7919) % 50000 as sample_id", "id as sample_count", "'1' as identifier"
+    )
+
+    job_helpers.write_partitioned_parquet(
+        data_layout.df_with_layout(df.coalesce(1), load, ["identifier"]),
+        ["identifier"],
+        str(tmp_path / "table"),
+        writer_options={"parquet.block.size": "65536", **data_layout.bloom_filter_options(load)},
+    )
+
+    [path] = list((tmp_path / "table").glob("**/*.parquet"))
+    metadata = pyarrow.parquet.read_metadata(path)
+    ranges = [
+        [
+            (
+                metadata.row_group(row_group).column(column).statistics.min,
+                metadata.row_group(row_group).column(column).statistics.max,
+            )
+            for column in range(2)
+        ]
+        for row_group in range(metadata.num_row_groups)
+    ]
+
+    assert metadata.num_row_groups > 2
+    assert 50000 == metadata.num_rows
+    if cluster_method == "sort":
+        # the row groups have ids that don't overlap
+        assert all(previous[0][1] < current[0][0] for previous, current in zip(ranges, ranges[1:]))
+    else:
+        # the first row group is in the lower half of both columns
+        assert ranges[0][0][1] < 25000 and ranges[0][1][1] < 25000
+    assert [True, False] == bloom_filters(layout_spark_session, path)
+
+
+def test_df_with_layout_errors(spark_session: SparkSessionType) -> None:
+    df = spark_session.range(10).selectExpr("id as sample_id")
+
+    assert df is data_layout.df_with_layout(df, {"id": 1}, [])
+
+    with pytest.raises(ValueError, match=r"Unknown cluster columns of load 1: \['sample_count'\]"):
+        data_layout.df_with_layout(df, {"id": 1, "cluster_columns": ["sample_count"]}, [])
+
+    with pytest.raises(ValueError, match="Unknown cluster method 'hilbert'"):
+        data_layout.df_with_layout(df, {"id": 1, "cluster_columns": ["sample_id"], "cluster_method": "hilbert"}, [])
+
+
+def test_bloom_filter_options() -> None:
+    assert {} == data_layout.bloom_filter_options({"id": 1})
+    assert {"parquet.bloom.filter.enabled#sample_id": "true"} == data_layout.bloom_filter_options(
+        {"id": 1, "bloom_filter_columns": ["SAMPLE_ID"]}
+    )
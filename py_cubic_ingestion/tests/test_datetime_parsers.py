@@ -0,0 +1,101 @@
+"""
+Tests for the date/time parsers that learn the layout of a column
+"""
+
+from dateutil import parser
+from py_cubic_ingestion import datetime_parsers
+import datetime
+import pytest
+
+
+def test_learn_layout() -> None:
+    layout = datetime_parsers.learn_layout("2021-12-01 11:20:30.4444444")
+
+    assert layout is not None
+    assert layout.time is not None
+    # truncated to microseconds
+    assert slice(20, 26) == layout.fraction
+    assert 1 == layout.fraction_scale
+    assert layout.offset is None
+
+    # values in the layout
+    assert datetime.datetime(2021, 12, 1, 11, 20, 30, 444444) == layout.parse("2021-12-01 11:20:30.4444444")
+    assert datetime.datetime(2022, 1, 2, 3, 4, 5, 999999) == layout.parse("2022-01-02 03:04:05.9999999")
+    # other layouts, and invalid values
+    assert layout.parse("2021-12-01 11:20:30.444444") is None
+    assert layout.parse("2021-12-01T11:20:30.4444444") is None
+    assert layout.parse("2021-02-30 11:20:30.4444444") is None
+    assert layout.parse("2021-12-01 24:00:00.0000000") is None
+
+    # layouts we don't learn
+    assert datetime_parsers.learn_layout("2022-01") is None
+    assert datetime_parsers.learn_layout("2022-01-01T10:30") is None
+    assert datetime_parsers.learn_layout("2022-W01-1") is None
+    assert datetime_parsers.learn_layout("invalid") is None
+
+
+def test_parse() -> None:
+    """
+    Checks that values parse the same as with 'isoparse', with each value being parsed both when
+    learning its layout and in the learned layout
+    """
+    values = [
+        "2022-01-01",
+        "20220102",
+        "2022-01-03 23:34:56",
+        "2022-01-03T23:34:56",
+        "20220103T233456",
+        "2022-01-03 23:34:56.1",
+        "2022-01-03 23:34:56,123",
+        "2021-12-01 11:20:30.4444444",
+        "2022-01-03 23:34:56Z",
+        "2022-01-03 23:34:56+04",
+        "2022-01-03 23:34:56-04:00",
+        "2022-01-03 23:34:56.123456+0130",
+        "2022-01-01 24:00:00",
+        "2022-01",
+        "2022-01-01T10:30",
+    ]
+
+    for value in values:
+        datetime_parser = datetime_parsers.DatetimeParser()
+
+        assert parser.isoparse(value) == datetime_parser.parse(value)
+        assert parser.isoparse(value) == datetime_parser.parse(value)
+        assert parser.isoparse(value).utcoffset() == datetime_parser.parse(value).utcoffset()
+
+    # parsing errors
+    for value in ["2022-02-30", "2022-01-01 25:00:00", "2022-01-03 23:34:60", "invalid"]:
+        datetime_parser = datetime_parsers.DatetimeParser()
+        datetime_parser.parse("2022-01-01")
+
+        with pytest.raises(ValueError):
+            datetime_parser.parse(value)
+
+    # offsets that 'isoparse' rejects, in a learned layout with an offset
+    for value in ["2022-01-03 23:34:56+02:60", "2022-01-03 23:34:56+24:00"]:
+        datetime_parser = datetime_parsers.DatetimeParser()
+        datetime_parser.parse("2022-01-03 23:34:56+02:00")
+
+        with pytest.raises(ValueError):
+            datetime_parser.parse(value)
+
+
+def test_parse_relearn() -> None:
+    """
+    Checks that the layout is learned again when the values stop matching it
+    """
+    datetime_parser = datetime_parsers.DatetimeParser()
+    datetime_parser.parse("2022-01-01")
+    date_layout = datetime_parser.layout
+
+    for _ in range(datetime_parsers.RELEARN_AFTER - 1):
+        datetime_parser.parse("2022-01-01 12:34:56")
+
+    assert date_layout == datetime_parser.layout
+
+    datetime_parser.parse("2022-01-01 12:34:56")
+
+    assert datetime_parser.layout is not None
+    assert datetime_parser.layout != date_layout
+    assert datetime.datetime(2022, 1, 2, 12, 34, 56) == datetime_parser.layout.parse("2022-01-02 12:34:56")
@@ -0,0 +1,123 @@
+"""
+Testing module for `dfm_migration.py`.
+"""
+
+from botocore.stub import Stubber
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import dfm_migration
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import Tuple
+import pathlib
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik"
+
+
+def sample_table(types: Tuple[str, str, str, str]) -> dict:
+    """
+    Table of 'EDW.SAMPLE', as returned by the Glue API, with the types of its columns.
+    """
+
+    return {
+        "Name": "cubic_ods_qlik__edw_sample",
+        "DatabaseName": "springboard",
+        "CreateTime": "2021-12-01T00:00:00Z",
+        "StorageDescriptor": {
+            "Columns": [
+                {"Name": name, "Type": column_type}
+                for name, column_type in zip(["sample_id", "sample_name", "edw_inserted_dtm", "edw_updated_dtm"], types)
+            ],
+            "Location": "s3://springboard/cubic/ods_qlik/EDW.SAMPLE",
+        },
+        "PartitionKeys": [{"Name": "snapshot", "Type": "string"}],
+        "TableType": "EXTERNAL_TABLE",
+    }
+
+
+def test_athena_type() -> None:
+    assert "int" == dfm_migration.athena_type("integer")
+    assert "bigint" == dfm_migration.athena_type("long")
+    assert "tinyint" == dfm_migration.athena_type("byte")
+    assert "decimal(10,2)" == dfm_migration.athena_type("decimal(10,2)")
+    assert "timestamp" == dfm_migration.athena_type("timestamp")
+
+
+def test_migrated_table_input() -> None:
+    dfm_fields = [{"name": "sample_id", "type": "integer"}, {"name": "sample_amount", "type": "decimal(10,2)"}]
+    table = {
+        "Name": "sample",
+        "DatabaseName": "springboard",
+        "StorageDescriptor": {
+            "Columns": [
+                {"Name": "SAMPLE_ID", "Type": "bigint"},
+                {"Name": "sample_amount", "Type": "double", "Comment": "amount"},
+                {"Name": "sample_name", "Type": "string"},
+            ]
+        },
+    }
+
+    assert {
+        "Name": "sample",
+        "StorageDescriptor": {
+            "Columns": [
+                {"Name": "SAMPLE_ID", "Type": "int"},
+                {"Name": "sample_amount", "Type": "decimal(10,2)", "Comment": "amount"},
+                {"Name": "sample_name", "Type": "string"},
+            ]
+        },
+    } == dfm_migration.migrated_table_input(table, dfm_fields)
+
+
+def test_migrate_table(spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that a table is migrated to the types of the '.dfm' file of one of its loads, and only
+    updated with 'apply'.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    """
+
+    glue_client, stubber = glue_client_stubber
+    source_path = str(sample_path / "EDW.SAMPLE" / "LOAD1.csv.gz")
+    table = sample_table(("string", "string", "string", "string"))
+    expected_update = {
+        "DatabaseName": "springboard",
+        "TableInput": {
+            "Name": "cubic_ods_qlik__edw_sample",
+            "StorageDescriptor": {
+                "Columns": [
+                    {"Name": "sample_id", "Type": "int"},
+                    {"Name": "sample_name", "Type": "string"},
+                    {"Name": "edw_inserted_dtm", "Type": "timestamp"},
+                    {"Name": "edw_updated_dtm", "Type": "timestamp"},
+                ],
+                "Location": "s3://springboard/cubic/ods_qlik/EDW.SAMPLE",
+            },
+            "PartitionKeys": [{"Name": "snapshot", "Type": "string"}],
+            "TableType": "EXTERNAL_TABLE",
+        },
+    }
+    get_table_params = {"DatabaseName": "springboard", "Name": "cubic_ods_qlik__edw_sample"}
+
+    stubber.add_response("get_table", {"Table": table}, get_table_params)
+    assert expected_update == dfm_migration.migrate_table(
+        spark_session, glue_client, "springboard", "cubic_ods_qlik__edw_sample", source_path
+    )
+
+    stubber.add_response("get_table", {"Table": table}, get_table_params)
+    stubber.add_response("update_table", {}, expected_update)
+    assert expected_update == dfm_migration.migrate_table(
+        spark_session, glue_client, "springboard", "cubic_ods_qlik__edw_sample", source_path, apply=True
+    )
+
+    # already migrated
+    stubber.add_response("get_table", {"Table": sample_table(("int", "string", "timestamp", "timestamp"))})
+    assert (
+        dfm_migration.migrate_table(
+            spark_session, glue_client, "springboard", "cubic_ods_qlik__edw_sample", source_path
+        )
+        is None
+    )
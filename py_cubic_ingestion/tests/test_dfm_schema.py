@@ -0,0 +1,62 @@
+"""
+Testing module for `dfm_schema.py`.
+"""
+
+from py_cubic_ingestion import dfm_schema
+from pyspark.sql.session import SparkSession as SparkSessionType
+import pathlib
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik"
+
+
+def test_spark_type() -> None:
+    assert "integer" == dfm_schema.spark_type({"type": "INT4", "precision": 0, "scale": 0})
+    assert "decimal(10,2)" == dfm_schema.spark_type({"type": "NUMERIC", "precision": 10, "scale": 2})
+    assert "string" == dfm_schema.spark_type({"type": "NUMERIC", "precision": 0, "scale": 0})
+    assert "string" == dfm_schema.spark_type({"type": "NUMERIC", "precision": 40, "scale": 2})
+    assert "timestamp" == dfm_schema.spark_type({"type": "DATETIME", "precision": 0, "scale": 0})
+    assert "string" == dfm_schema.spark_type({"type": "WSTRING", "length": 100})
+
+
+def test_mismatched_columns() -> None:
+    dfm_fields = [{"name": "sample_id", "type": "integer"}, {"name": "sample_amount", "type": "decimal(10,2)"}]
+
+    assert [] == dfm_schema.mismatched_columns(
+        [
+            {"name": "sample_id", "type": "integer"},
+            {"name": "sample_amount", "type": "decimal(10,2)"},
+            {"name": "snapshot", "type": "string"},
+        ],
+        dfm_fields,
+    )
+    assert ["SAMPLE_AMOUNT"] == dfm_schema.mismatched_columns(
+        [{"name": "sample_id", "type": "integer"}, {"name": "SAMPLE_AMOUNT", "type": "double"}], dfm_fields
+    )
+
+
+def test_dfm_schema_cache(spark_session: SparkSessionType) -> None:
+    """
+    Test that the '.dfm' file of a table is only read for its first load.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    dfm_schemas = dfm_schema.DfmSchemaCache(spark_session)
+    expected_fields = [
+        {"name": "sample_id", "type": "integer"},
+        {"name": "sample_name", "type": "string"},
+        {"name": "edw_inserted_dtm", "type": "timestamp"},
+        {"name": "edw_updated_dtm", "type": "timestamp"},
+    ]
+
+    assert expected_fields == dfm_schemas.schema_fields(
+        "cubic_ods_qlik__edw_sample", str(sample_path / "EDW.SAMPLE" / "LOAD1.csv.gz")
+    )
+    # cached, even with a load that doesn't exist
+    assert expected_fields == dfm_schemas.schema_fields(
+        "cubic_ods_qlik__edw_sample", str(sample_path / "EDW.SAMPLE" / "LOAD3.csv.gz")
+    )
+    assert dfm_schema.is_ods_load({"source_s3_key": str(sample_path / "EDW.SAMPLE" / "LOAD1.csv.gz")})
@@ -0,0 +1,71 @@
+"""
+Testing module for `file_planner.py`.
+"""
+
+from py_cubic_ingestion import file_planner, job_helpers
+from pyspark.sql.session import SparkSession as SparkSessionType
+import pytest
+
+
+@pytest.mark.parametrize(
+    ["input_bytes", "row_count", "expected_plan"],
+    [
+        # small change tracking loads are written as a single file
+        (400, 10, file_planner.FilePlan(800, 1, 10)),
+        (0, 0, file_planner.FilePlan(0, 1, 0)),
+        # large snapshots are split into files close to the target size
+        (10000, 100, file_planner.FilePlan(20000, 20, 5)),
+        (10001, 100, file_planner.FilePlan(20002, 21, 5)),
+        # no limit when there are fewer rows than files
+        (10000, 10, file_planner.FilePlan(20000, 20, 0)),
+    ],
+)
+def test_plan_files(input_bytes: int, row_count: int, expected_plan: file_planner.FilePlan) -> None:
+    assert expected_plan == file_planner.plan_files(input_bytes, row_count, 1000, 2.0)
+
+
+def test_estimated_row_count() -> None:
+    assert 0 == file_planner.estimated_row_count(1000, 0)
+    assert 34 == file_planner.estimated_row_count(1000, 30)
+
+
+def test_df_with_file_plan(spark_session: SparkSessionType, tmp_path: str) -> None:
+    """
+    Test that the planned number of files are written to the load's partition.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : str
+        Fixture containing the temporary path that we can use to store data
+    """
+
+    partition_columns = [
+        {"name": "snapshot", "value": "snapshot_1"},
+        {"name": "identifier", "value": "identifier_1"},
+    ]
+    source_df = spark_session.range(100).repartition(10)
+
+    for plan, expected_file_count in [
+        (file_planner.FilePlan(0, 3, 0), 3),
+        (file_planner.FilePlan(0, 20, 0), 20),
+        # the records limit splits the files further
+        (file_planner.FilePlan(0, 2, 10), 10),
+    ]:
+        job_helpers.write_parquet(
+            file_planner.df_with_file_plan(source_df, plan),
+            partition_columns,
+            f"{tmp_path}/test.parquet",
+            plan.max_records_per_file,
+        )
+
+        path = file_planner.partition_path(f"{tmp_path}/test.parquet/", partition_columns)
+        assert f"{tmp_path}/test.parquet/snapshot=snapshot_1/identifier=identifier_1" == path
+
+        file_sizes = file_planner.written_file_sizes(spark_session, path)
+        assert expected_file_count == len(file_sizes)
+        assert all(file_size > 0 for file_size in file_sizes)
+        assert 100 == spark_session.read.parquet(path).count()
+
+    assert {} == file_planner.written_files(spark_session, f"{tmp_path}/test.parquet/snapshot=snapshot_2")
@@ -0,0 +1,162 @@
+"""
+Testing module for `gzip_rechunk.py`.
+"""
+
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from py_cubic_ingestion import gzip_rechunk, job_helpers
+from pyspark.sql.functions import input_file_name
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import Dict, List
+import boto3
+import gzip
+import io
+import pathlib
+import pytest
+
+
+header = b"sample_id,sample_name\n"
+lines = [
+    header,
+    b'1,"one"\n',
+    b'2,"two\n',
+    b'lines, with a ""quote"" and ""\n',
+    b'more"\n',
+    b"3,\xf0\x9f\x94\xa5\n",
+    b'4,""""\n',
+]
+
+
+class Chunk(io.BytesIO):
+    """
+    In-memory chunk that keeps its contents once closed.
+    """
+
+    def __init__(self, chunks: Dict[int, bytes], index: int) -> None:
+        super().__init__()
+        self.chunks = chunks
+        self.index = index
+
+    def close(self) -> None:
+        self.chunks[self.index] = self.getvalue()
+        super().close()
+
+
+def rechunk(csv_lines: List[bytes], chunk_size_bytes: int) -> List[bytes]:
+    """
+    Contents of the chunks written by `rechunk_lines`, in order.
+    """
+
+    chunks: Dict[int, bytes] = {}
+    chunk_count = gzip_rechunk.rechunk_lines(csv_lines, lambda index: Chunk(chunks, index), chunk_size_bytes)
+
+    assert list(range(chunk_count)) == sorted(chunks)
+
+    return [chunks[index] for index in range(chunk_count)]
+
+
+def test_rechunk_lines() -> None:
+    """
+    Test that chunks only end on record boundaries, outside of quoted fields.
+    """
+
+    # each record in its own chunk
+    assert [
+        header + b'1,"one"\n',
+        header + b"".join(lines[2:5]),
+        header + lines[5],
+        header + lines[6],
+    ] == rechunk(lines, 1)
+
+    # all records in one chunk
+    assert [b"".join(lines)] == rechunk(lines, gzip_rechunk.DEFAULT_CHUNK_SIZE_BYTES)
+
+    # files without records keep the header
+    assert [header] == rechunk([header], 1)
+    assert [b""] == rechunk([], 1)
+
+
+def test_rechunk_s3_object(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that the chunks are uploaded under the prefix, read as the original file, and deleted.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    s3_client = boto3.client("s3", region_name="us-east-1")
+    source = gzip.compress(b"".join(lines))
+    uploaded_keys = []
+
+    def upload_file(path: str, bucket: str, key: str) -> None:
+        assert "springboard" == bucket
+        uploaded_keys.append(key)
+        (tmp_path / pathlib.Path(key).name).write_bytes(pathlib.Path(path).read_bytes())
+
+    with Stubber(s3_client) as stubber:
+        stubber.add_response(
+            "get_object",
+            {"Body": StreamingBody(io.BytesIO(source), len(source))},
+            expected_params={"Bucket": "incoming", "Key": "cubic/ods_qlik/EDW.SAMPLE/LOAD1.csv.gz"},
+        )
+        stubber.add_response(
+            "delete_objects",
+            {},
+            expected_params={
+                "Bucket": "springboard",
+                "Delete": {"Objects": [{"Key": f"rechunked/1/part-0000{index}.csv.gz"} for index in range(4)]},
+            },
+        )
+        setattr(s3_client, "upload_file", upload_file)
+
+        chunk_count = gzip_rechunk.rechunk_s3_object(
+            s3_client, "s3://incoming/cubic/ods_qlik/EDW.SAMPLE/LOAD1.csv.gz", "s3://springboard/rechunked/1/", 1
+        )
+        gzip_rechunk.delete_s3_chunks(s3_client, "s3://springboard/rechunked/1/", chunk_count)
+
+        stubber.assert_no_pending_responses()
+
+    assert 4 == chunk_count
+    assert [f"rechunked/1/part-0000{index}.csv.gz" for index in range(4)] == uploaded_keys
+
+    schema_fields = [{"name": "sample_id", "type": "string"}, {"name": "sample_name", "type": "string"}]
+    source_path = tmp_path / "LOAD1.csv.gz"
+    source_path.write_bytes(source)
+    chunks_df = job_helpers.df_from_csv(spark_session, str(tmp_path / "part-*.csv.gz"), schema_fields)
+    source_df = job_helpers.df_from_csv(spark_session, str(source_path), schema_fields)
+
+    assert 4 == chunks_df.select(input_file_name()).distinct().count()
+    assert sorted(source_df.collect()) == sorted(chunks_df.collect())
+
+
+@pytest.mark.parametrize("chunk_count", [1000, 1001])
+def test_delete_s3_chunks(chunk_count: int) -> None:
+    """
+    Test that chunks are deleted in batches of up to 1000.
+    """
+
+    s3_client = boto3.client("s3", region_name="us-east-1")
+
+    with Stubber(s3_client) as stubber:
+        for start in range(0, chunk_count, 1000):
+            stubber.add_response(
+                "delete_objects",
+                {},
+                expected_params={
+                    "Bucket": "springboard",
+                    "Delete": {
+                        "Objects": [
+                            {"Key": f"rechunked/1/{gzip_rechunk.chunk_name(index)}"}
+                            for index in range(start, min(start + 1000, chunk_count))
+                        ]
+                    },
+                },
+            )
+
+        gzip_rechunk.delete_s3_chunks(s3_client, "s3://springboard/rechunked/1/", chunk_count)
+
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,182 @@
+"""
+Testing module for `ingest_service.py`.
+"""
+
+from botocore.stub import Stubber
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import ingest_service
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import List, Tuple
+import boto3
+import json
+import pathlib
+import pytest
+import socket
+import threading
+
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik" / "EDW.SAMPLE"
+
+# note: the same ENV as the `ex_cubic_ingestion` app's, without a CSV_READER
+env_dict = {
+    "GLUE_DATABASE_INCOMING": "incoming",
+    "GLUE_DATABASE_SPRINGBOARD": "springboard",
+    "REGISTER_PARTITIONS": "true",
+}
+
+
+def add_table_responses(stubber: Stubber) -> None:
+    """
+    Add the responses for the tables of 'EDW.SAMPLE' in both databases.
+    """
+
+    column_names = ["sample_id", "sample_name", "edw_inserted_dtm", "edw_updated_dtm"]
+    for database_name, types in [
+        ("springboard", ["bigint", "string", "timestamp", "timestamp"]),
+        ("incoming", ["string"] * 4),
+    ]:
+        stubber.add_response(
+            "get_tables",
+            {
+                "TableList": [
+                    {
+                        "Name": "cubic_ods_qlik__edw_sample",
+                        "StorageDescriptor": {
+                            "Columns": [
+                                {"Name": name, "Type": column_type} for name, column_type in zip(column_names, types)
+                            ]
+                        },
+                    }
+                ]
+            },
+            {"DatabaseName": database_name, "Expression": "cubic_ods_qlik__edw_sample"},
+        )
+
+
+def input_arg(destination_path: pathlib.Path) -> str:
+    """
+    INPUT of a batch with a load of a sample file of 'EDW.SAMPLE'.
+    """
+
+    return json.dumps(
+        {
+            "loads": [
+                {
+                    "id": 1,
+                    "source_table_name": "cubic_ods_qlik__edw_sample",
+                    "source_s3_key": str(sample_path / "LOAD1.csv.gz"),
+                    "destination_table_name": "cubic_ods_qlik__edw_sample",
+                    "destination_path": str(destination_path),
+                    "partition_columns": [
+                        {"name": "snapshot", "value": "20211201T000000Z"},
+                        {"name": "identifier", "value": "LOAD1.csv.gz"},
+                    ],
+                }
+            ]
+        }
+    )
+
+
+def test_service(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that batches run with the service's Spark session, that a failed batch doesn't stop the
+    service, and that a drained service doesn't accept batches.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    add_table_responses(stubber)
+    stubber.add_response("batch_create_partition", {}, None)
+    service = ingest_service.IngestService(spark_session, glue_client, boto3.client("s3", region_name="us-east-1"))
+
+    failed_batch_id = service.submit(
+        json.dumps({**env_dict, "WRITER_PROFILE": "lzo"}), input_arg(tmp_path / "springboard" / "EDW.SAMPLE")
+    )
+    batch_id = service.submit(
+        json.dumps({**env_dict, "METRICS_URI": str(tmp_path / "metrics")}),
+        input_arg(tmp_path / "springboard" / "EDW.SAMPLE"),
+        "jr_1",
+    )
+    failed_result = service.result(failed_batch_id, timeout=120)
+    result = service.result(batch_id, timeout=120)
+
+    assert {"batch_id": "batch_1", "status": "failed"} == {key: failed_result[key] for key in ["batch_id", "status"]}
+    assert "Unknown writer profile 'lzo'" in failed_result["error"]
+    assert "succeeded" == result["status"]
+    assert 2 == result["summary"]["rows_written"]
+    assert {"1": {"status": "created"}} == result["summary"]["partitions"]
+    assert result["summary"] == json.loads((tmp_path / "metrics" / "jr_1.json").read_text())
+    assert 2 == spark_session.read.parquet(str(tmp_path / "springboard" / "EDW.SAMPLE")).count()
+
+    with pytest.raises(ValueError, match="Batch 'jr_1' was already submitted"):
+        service.submit(json.dumps(env_dict), input_arg(tmp_path), "jr_1")
+
+    with pytest.raises(ValueError, match="no function to read DynamicFrames"):
+        service.submit(json.dumps({**env_dict, "CSV_READER": "dynamic_frame"}), input_arg(tmp_path))
+
+    with pytest.raises(json.JSONDecodeError):
+        service.submit("{", input_arg(tmp_path))
+
+    with pytest.raises(KeyError, match="Unknown batch 'jr_2'"):
+        service.result("jr_2")
+
+    service.drain()
+    status = service.status()
+
+    assert {"state": "draining", "healthy": True, "queued": 0, "running": 0, "succeeded": 1, "failed": 1} == {
+        key: value for key, value in status.items() if key != "uptime_seconds"
+    }
+
+    with pytest.raises(ingest_service.ServiceDrainingError):
+        service.submit(json.dumps(env_dict), input_arg(tmp_path))
+
+
+def test_server(spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that the server answers each JSON request line, and stops once drained.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    """
+
+    glue_client, _ = glue_client_stubber
+    service = ingest_service.IngestService(spark_session, glue_client, boto3.client("s3", region_name="us-east-1"))
+    server = ingest_service.IngestServer(service, "127.0.0.1", 0)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.start()
+
+    requests = [
+        {"command": "status"},
+        {"command": "submit", "ENV": json.dumps({**env_dict, "WRITER_PROFILE": "lzo"}), "INPUT": "{}", "wait": True},
+        {"command": "result", "batch_id": "batch_1"},
+        {"command": "restart"},
+        {"command": "drain"},
+    ]
+    with socket.create_connection(("127.0.0.1", server.server_address[1])) as connection:
+        connection.sendall(b"".join(json.dumps(request).encode("utf-8") + b"\n" for request in requests))
+        response_lines = connection.makefile("rb")
+        responses: List[dict] = [json.loads(response_lines.readline()) for _ in requests]
+
+    server_thread.join(timeout=30)
+
+    assert not server_thread.is_alive()
+    assert ["running", True] == [responses[0]["state"], responses[0]["healthy"]]
+    assert "failed" == responses[1]["status"]
+    assert responses[1] == responses[2]
+    assert "ValueError: Unknown command 'restart'" in responses[3]["error"]
+    assert ["draining", 1] == [responses[4]["state"], responses[4]["failed"]]
+    server.server_close()
@@ -4,14 +4,16 @@ Testing module for `job_helpers.py`.
 
 from botocore.stub import Stubber
 from mypy_boto3_glue.client import GlueClient
-from py_cubic_ingestion import job_helpers
+from py_cubic_ingestion import cast_accounting, conversion_cache, job_helpers, schema_cache
 from pyspark.sql import Row
 from pyspark.sql.dataframe import DataFrame
 from pyspark.sql.session import SparkSession as SparkSessionType
 from pyspark.sql.utils import PythonException
 from typing import List, Tuple
 import datetime
+import decimal
 import json
+import pathlib
 import pytest
 
 
@@ -288,6 +290,28 @@ def test_df_with_updated_schema(spark_session: SparkSessionType) -> None:
     )
 
 
+def test_df_with_updated_schema_precise_types(spark_session: SparkSessionType) -> None:
+    """
+    Test that the types more precise than the ones of the UDFs are cast with any cast engine.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+    original_df = spark_session.createDataFrame([("123", "123.45")], ["int_col", "decimal_col"])
+    schema_fields = [
+        {"name": "int_col", "type": schema_cache.spark_type("int")},
+        {"name": "decimal_col", "type": schema_cache.spark_type("decimal(10, 2)")},
+    ]
+
+    for cast_engine in job_helpers.cast_engines:
+        updated_df = job_helpers.df_with_updated_schema(original_df, schema_fields, cast_engine)
+
+        assert ["int", "decimal(10,2)"] == [field.dataType.simpleString() for field in updated_df.schema.fields]
+        assert Row(int_col=123, decimal_col=decimal.Decimal("123.45")) == updated_df.first()
+
+
 def test_df_with_updated_schema_long_error(spark_session: SparkSessionType) -> None:
     original_data = [
         (
@@ -404,6 +428,206 @@ def test_df_with_updated_schema_timestamp_error(spark_session: SparkSessionType)
     assert "ValueError: '2022-01-01 12:34:56_error'" in excinfo.value.desc
 
 
+def test_df_with_updated_schema_cast_engines(spark_session: SparkSessionType) -> None:
+    """
+    Test that all the cast engines produce the same data.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+    original_data = [
+        ("test", "123", "123.45", "2022-01-01", "2022-01-01 12:34:56"),
+        ("test 🔥", " -9223372036854775808 ", "1e3", "20220102", "2021-12-01 11:20:30.4444444"),
+        ("", "", "", "2022-01-03 23:34:56-04:00", "2022-01-01 12:34:56-04:00"),
+        (None, None, None, None, "9999-12-31 23:59:59"),
+    ]
+    original_df = spark_session.createDataFrame(
+        original_data,
+        [
+            "string_col",
+            "bigint_col",
+            "double_col",
+            "date_col",
+            "timestamp_col",
+        ],
+    )
+    schema_fields = [
+        {"name": "string_col", "type": "string"},
+        {"name": "bigint_col", "type": "long"},
+        {"name": "double_col", "type": "double"},
+        {"name": "date_col", "type": "date"},
+        {"name": "timestamp_col", "type": "timestamp"},
+    ]
+
+    expected_df = job_helpers.df_with_updated_schema(original_df, schema_fields, "udf")
+
+    for cast_engine in job_helpers.cast_engines:
+        updated_df = job_helpers.df_with_updated_schema(original_df, schema_fields, cast_engine)
+
+        assert updated_df.schema == expected_df.schema
+        assert_equal_collections(updated_df.collect(), expected_df.collect())
+
+    # unknown engine
+    with pytest.raises(ValueError):
+        job_helpers.df_with_updated_schema(original_df, schema_fields, "unknown")
+
+
+def test_df_with_updated_schema_pandas_error(spark_session: SparkSessionType) -> None:
+    original_data = [
+        (
+            "123",
+            "123_error",
+        )
+    ]
+    original_df = spark_session.createDataFrame(
+        original_data,
+        [
+            "bigint_col",
+            "bigint_col_error",
+        ],
+    )
+
+    updated_df = job_helpers.df_with_updated_schema(
+        original_df,
+        [
+            {"name": "bigint_col", "type": "long"},
+            {"name": "bigint_col_error", "type": "long"},
+        ],
+        "pandas",
+    )
+
+    with pytest.raises(PythonException) as excinfo:
+        updated_df.first()
+
+    assert "ValueError: '123_error'" in excinfo.value.desc
+
+
+def test_df_with_updated_schema_cache(spark_session: SparkSessionType) -> None:
+    """
+    Test that caching converted values doesn't change the data, and reports the cache stats.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+    original_data = [("1", "2021-12-01 11:20:30.4444444")] * 4 + [("", None)]
+    # a single partition, so that the same Python worker converts all the values
+    original_df = spark_session.createDataFrame(original_data, ["bigint_col", "timestamp_col"]).coalesce(1)
+    schema_fields = [
+        {"name": "bigint_col", "type": "long"},
+        {"name": "timestamp_col", "type": "timestamp"},
+    ]
+    cache_stats = spark_session.sparkContext.accumulator({}, conversion_cache.StatsAccumulatorParam())
+
+    expected_df = job_helpers.df_with_updated_schema(original_df, schema_fields)
+    updated_df = job_helpers.df_with_updated_schema(original_df, schema_fields, "udf", 10, cache_stats)
+
+    assert updated_df.schema == expected_df.schema
+    assert_equal_collections(updated_df.collect(), expected_df.collect())
+    # the worker's caches may already have the values from a previous run
+    assert 5 == cache_stats.value["long.hits"] + cache_stats.value["long.misses"]
+    assert 4 == cache_stats.value["timestamp.hits"] + cache_stats.value["timestamp.misses"]
+    assert cache_stats.value["timestamp.hits"] >= 3
+
+    # only the 'udf' engine caches
+    with pytest.raises(ValueError):
+        job_helpers.df_with_updated_schema(original_df, schema_fields, "native", 10)
+
+
+def test_df_with_updated_schema_cast_failures(spark_session: SparkSessionType) -> None:
+    """
+    Test that values that can't be cast are cast to NULL and accounted for by column, with the cache.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+    original_data = [("1", "2021-12-01"), ("one", "2021-12-01"), ("one", "yesterday"), ("", None)]
+    original_df = spark_session.createDataFrame(original_data, ["bigint_col", "timestamp_col"])
+    schema_fields = [
+        {"name": "bigint_col", "type": "long"},
+        {"name": "timestamp_col", "type": "timestamp"},
+    ]
+    cast_failures = spark_session.sparkContext.accumulator({}, cast_accounting.FailuresAccumulatorParam())
+
+    updated_df = job_helpers.df_with_updated_schema(original_df, schema_fields, "udf", 10, None, None, cast_failures)
+
+    assert [1, None, None, None] == [row.bigint_col for row in updated_df.collect()]
+    assert {
+        "bigint_col": {"count": 2, "samples": ["one", "one"]},
+        "timestamp_col": {"count": 1, "samples": ["yesterday"]},
+    } == cast_failures.value
+
+    # only the 'udf' engine accounts for cast failures
+    with pytest.raises(ValueError):
+        job_helpers.df_with_updated_schema(original_df, schema_fields, "native", cast_failures=cast_failures)
+
+
+def test_df_from_csv(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test reading CSV files directly with Spark, including quoted multi-line and multibyte fields.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory for the CSV file
+    """
+    schema_fields = [
+        {"name": "sample_id", "type": "string"},
+        {"name": "sample_name", "type": "string"},
+        {"name": "edw_inserted_dtm", "type": "string"},
+        {"name": "edw_updated_dtm", "type": "string"},
+    ]
+
+    # sample data
+    sample_df = job_helpers.df_from_csv(
+        spark_session,
+        str(pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik" / "EDW.SAMPLE" / "LOAD1.csv.gz"),
+        schema_fields,
+    )
+
+    assert ["sample_id", "sample_name", "edw_inserted_dtm", "edw_updated_dtm"] == sample_df.columns
+    assert [
+        {
+            "sample_id": "1",
+            "sample_name": "Sample 1 🔥",
+            "edw_inserted_dtm": "2021-12-01 11:20:30.4444444",
+            "edw_updated_dtm": "2021-12-01 11:20:31.4444444",
+        },
+        {
+            "sample_id": "2",
+            "sample_name": "Sample 2",
+            "edw_inserted_dtm": "2021-12-01 11:20:30.4444444",
+            "edw_updated_dtm": "2021-12-01 11:20:31.4444444",
+        },
+    ] == collection_as_dict(sample_df.collect())
+
+    # quoted fields with line breaks and quotes
+    csv_path = tmp_path / "LOAD1.csv"
+    csv_path.write_text(
+        "SAMPLE_ID,SAMPLE_NAME,EDW_INSERTED_DTM,EDW_UPDATED_DTM\n"
+        '1,"Sample 1 🔥\nline 2, ""quoted""",2021-12-01 11:20:30.4444444,\n'
+        "2,,,\n",
+        encoding="utf-8",
+    )
+
+    assert [
+        {
+            "sample_id": "1",
+            "sample_name": 'Sample 1 🔥\nline 2, "quoted"',
+            "edw_inserted_dtm": "2021-12-01 11:20:30.4444444",
+            "edw_updated_dtm": None,
+        },
+        {"sample_id": "2", "sample_name": None, "edw_inserted_dtm": None, "edw_updated_dtm": None},
+    ] == collection_as_dict(job_helpers.df_from_csv(spark_session, str(csv_path), schema_fields).collect())
+
+
 def test_df_with_partition_columns(spark_session: SparkSessionType) -> None:
     """
     Test creating a DataFrame with the additional 'identifier' columns
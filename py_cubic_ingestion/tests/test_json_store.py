@@ -0,0 +1,50 @@
+"""
+Testing module for `json_store.py`.
+"""
+
+from botocore.stub import Stubber
+from py_cubic_ingestion import json_store
+import boto3
+import pathlib
+import pytest
+
+
+def test_local_store(tmp_path: pathlib.Path) -> None:
+    store = json_store.store_from_uri(str(tmp_path))
+
+    assert store.read("db/table_a") is None
+
+    store.write("db/table_a", {"version": "1"})
+
+    assert {"version": "1"} == store.read("db/table_a")
+    assert (tmp_path / "db" / "table_a.json").exists()
+
+
+def test_s3_store() -> None:
+    s3_client = boto3.client("s3", region_name="us-east-1")
+    store = json_store.store_from_uri("s3://operations/cubic_ingestion/schemas", s3_client)
+
+    with Stubber(s3_client) as stubber:
+        stubber.add_client_error(
+            "get_object",
+            service_error_code="NoSuchKey",
+            expected_params={"Bucket": "operations", "Key": "cubic_ingestion/schemas/db/table_a.json"},
+        )
+        stubber.add_response(
+            "put_object",
+            {},
+            expected_params={
+                "Bucket": "operations",
+                "Key": "cubic_ingestion/schemas/db/table_a.json",
+                "Body": b'{"version": "1"}',
+            },
+        )
+
+        assert store.read("db/table_a") is None
+        store.write("db/table_a", {"version": "1"})
+
+        stubber.assert_no_pending_responses()
+
+    # S3 stores need a client
+    with pytest.raises(ValueError):
+        json_store.store_from_uri("s3://operations/cubic_ingestion/schemas")
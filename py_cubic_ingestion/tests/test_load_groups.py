@@ -0,0 +1,116 @@
+"""
+Testing module for `load_groups.py`.
+"""
+
+from py_cubic_ingestion import job_helpers, load_groups
+from pyspark.sql.session import SparkSession as SparkSessionType
+
+
+def sample_load(load_id: int, table_name: str, identifier: str) -> dict:
+    """
+    Load from the job's INPUT, writing to the 'identifier' partition of the table.
+    """
+
+    return {
+        "id": load_id,
+        "destination_table_name": table_name,
+        "destination_path": f"s3a://springboard/cubic/ods_qlik/{table_name}/",
+        "partition_columns": [
+            {"name": "snapshot", "value": "20220101T000000Z"},
+            {"name": "identifier", "value": identifier},
+        ],
+    }
+
+
+def test_group_loads() -> None:
+    """
+    Test that loads for the same destination table are grouped, unless they write the same partition.
+    """
+
+    loads = [
+        sample_load(1, "edw_sample__ct", "LOAD1.csv.gz"),
+        sample_load(2, "edw_sample", "LOAD1.csv.gz"),
+        sample_load(3, "edw_sample__ct", "LOAD2.csv.gz"),
+        sample_load(4, "edw_sample__ct", "LOAD1.csv.gz"),
+    ]
+
+    assert [
+        {"id": "1+3", "loads": [loads[0], loads[2]]},
+        {"id": "4", "loads": [loads[3]]},
+        {"id": "2", "loads": [loads[1]]},
+    ] == load_groups.group_loads(loads)
+
+    assert [] == load_groups.group_loads([])
+
+
+def test_group_loads_layout() -> None:
+    """
+    Test that loads for the same destination table are only grouped with the loads that have the
+    same layout and writer profile, as the group is written with those of its first load.
+    """
+
+    loads = [
+        sample_load(1, "edw_sample__ct", "LOAD1.csv.gz"),
+        {**sample_load(2, "edw_sample__ct", "LOAD2.csv.gz"), "cluster_columns": ["SAMPLE_ID"]},
+        {**sample_load(3, "edw_sample__ct", "LOAD3.csv.gz"), "cluster_columns": ["sample_id"]},
+        {
+            **sample_load(4, "edw_sample__ct", "LOAD4.csv.gz"),
+            "cluster_columns": ["sample_id"],
+            "cluster_method": "z_order",
+        },
+        {**sample_load(5, "edw_sample__ct", "LOAD5.csv.gz"), "bloom_filter_columns": ["sample_id"]},
+        {**sample_load(6, "edw_sample__ct", "LOAD6.csv.gz"), "writer_profile": "zstd"},
+        {**sample_load(7, "edw_sample__ct", "LOAD7.csv.gz"), "writer_profile": None},
+    ]
+
+    assert [
+        {"id": "1+7", "loads": [loads[0], loads[6]]},
+        {"id": "2+3", "loads": [loads[1], loads[2]]},
+        {"id": "4", "loads": [loads[3]]},
+        {"id": "5", "loads": [loads[4]]},
+        {"id": "6", "loads": [loads[5]]},
+    ] == load_groups.group_loads(loads)
+
+
+def test_df_with_loads(spark_session: SparkSessionType, tmp_path: str) -> None:
+    """
+    Test that writing a group of loads at once gives the same partitions as writing each load.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : str
+        Fixture containing the temporary path that we can use to store data
+    """
+
+    loads = [
+        sample_load(1, "edw_sample__ct", "LOAD1.csv.gz"),
+        sample_load(2, "edw_sample__ct", "LOAD2.csv.gz"),
+    ]
+    dfs = [
+        spark_session.createDataFrame([("1", "2022-01-01"), ("2", "2022-01-02")], ["id", "date"]),
+        spark_session.createDataFrame([("3", "2022-01-03")], ["id", "date"]),
+    ]
+    schema_fields = [{"name": "id", "type": "long"}, {"name": "date", "type": "date"}]
+
+    for df, load in zip(dfs, loads):
+        job_helpers.write_parquet(
+            job_helpers.df_with_updated_schema(df, schema_fields),
+            load["partition_columns"],
+            f"{tmp_path}/loads.parquet",
+        )
+
+    partition_fields = [{"name": "snapshot", "type": "string"}, {"name": "identifier", "type": "string"}]
+    job_helpers.write_partitioned_parquet(
+        job_helpers.df_with_updated_schema(load_groups.df_with_loads(dfs, loads), schema_fields + partition_fields),
+        ["snapshot", "identifier"],
+        f"{tmp_path}/group.parquet",
+    )
+
+    loads_df = spark_session.read.parquet(f"{tmp_path}/loads.parquet")
+    group_df = spark_session.read.parquet(f"{tmp_path}/group.parquet")
+
+    assert loads_df.schema == group_df.schema
+    assert sorted(loads_df.collect()) == sorted(group_df.collect())
+    assert 3 == group_df.count()
@@ -0,0 +1,81 @@
+"""
+Testing module for `load_manifests.py`.
+"""
+
+from botocore.stub import Stubber
+from py_cubic_ingestion import job_helpers, json_store, load_manifests
+from pyspark.sql.session import SparkSession as SparkSessionType
+import boto3
+import os
+import pathlib
+
+
+def test_source_fingerprint(tmp_path: pathlib.Path) -> None:
+    """
+    Test that the fingerprint of an S3 object has its ETag, and of a local file its modification time.
+
+    Parameters
+    ----------
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    s3_client = boto3.client("s3", region_name="us-east-1")
+    with Stubber(s3_client) as stubber:
+        stubber.add_response(
+            "head_object",
+            {"ContentLength": 1024, "ETag": '"abc"'},
+            {"Bucket": "incoming", "Key": "cubic/ods_qlik/EDW.SAMPLE/LOAD1.csv.gz"},
+        )
+
+        assert {"size": 1024, "etag": '"abc"'} == load_manifests.source_fingerprint(
+            s3_client, "s3://incoming/cubic/ods_qlik/EDW.SAMPLE/LOAD1.csv.gz"
+        )
+
+    (tmp_path / "LOAD1.csv.gz").write_bytes(b"1234")
+    os.utime(tmp_path / "LOAD1.csv.gz", ns=(1000, 2000))
+
+    assert {"size": 4, "modified_ns": 2000} == load_manifests.source_fingerprint(
+        s3_client, str(tmp_path / "LOAD1.csv.gz")
+    )
+
+
+def test_is_complete(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that a load is complete with the fingerprint of its manifest and the files of its partition.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    store = json_store.LocalJsonStore(str(tmp_path / "manifests"))
+    (tmp_path / "LOAD1.csv.gz").write_bytes(b"1234")
+    load: dict = {
+        "id": 1,
+        "source_s3_key": str(tmp_path / "LOAD1.csv.gz"),
+        "destination_path": str(tmp_path / "springboard"),
+        "partition_columns": [{"name": "identifier", "value": "LOAD1.csv.gz"}],
+    }
+    fingerprint = load_manifests.load_fingerprint(boto3.client("s3", region_name="us-east-1"), load)
+
+    assert not load_manifests.is_complete(store, spark_session, load, fingerprint)
+
+    job_helpers.write_parquet(spark_session.range(10).coalesce(1), load["partition_columns"], load["destination_path"])
+    [path] = list((tmp_path / "springboard" / "identifier=LOAD1.csv.gz").glob("*.parquet"))
+    load_manifests.write_manifest(store, load, fingerprint, {path.name: path.stat().st_size}, 10)
+
+    assert 10 == store.read("1")["rows_written"]  # type: ignore[index]
+    assert load_manifests.is_complete(store, spark_session, load, fingerprint)
+    assert not load_manifests.is_complete(store, spark_session, load, {**fingerprint, "size": 5})
+    assert not load_manifests.is_complete(
+        store, spark_session, {**load, "destination_path": str(tmp_path / "other")}, fingerprint
+    )
+
+    # the partition was written again since
+    job_helpers.write_parquet(spark_session.range(10).coalesce(1), load["partition_columns"], load["destination_path"])
+
+    assert not load_manifests.is_complete(store, spark_session, load, fingerprint)
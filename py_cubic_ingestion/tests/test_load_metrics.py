@@ -0,0 +1,95 @@
+"""
+Testing module for `load_metrics.py`.
+"""
+
+from py_cubic_ingestion import custom_udfs, job_helpers, load_metrics
+from pyspark.sql.session import SparkSession as SparkSessionType
+import pathlib
+
+
+def test_timed(spark_session: SparkSessionType) -> None:
+    """
+    Test that timed conversions have the same results, and add their seconds to the accumulator.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    python_seconds = spark_session.sparkContext.accumulator({}, load_metrics.SecondsAccumulatorParam())
+    as_long = load_metrics.timed("long", custom_udfs.as_long, python_seconds)
+
+    assert 1 == as_long("1")
+    assert as_long("") is None
+    assert "as_long" == as_long.__name__
+    assert ["long"] == list(python_seconds.value)
+    assert python_seconds.value["long"] > 0
+
+
+def test_timed_udf_casts(spark_session: SparkSessionType) -> None:
+    """
+    Test that the seconds of the timed casts, summed in each task, add up in the driver by type.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    python_seconds = spark_session.sparkContext.accumulator({}, load_metrics.SecondsAccumulatorParam())
+    casts = job_helpers.udf_casts(python_seconds=python_seconds)
+    df = spark_session.createDataFrame([(str(number), "2022-01-01") for number in range(100)], ["id", "day"])
+
+    assert 100 == len(df.repartition(4).select(casts["long"]("id"), casts["date"]("day")).collect())
+    assert ["date", "long"] == sorted(python_seconds.value)
+    assert all(isinstance(seconds, float) and seconds > 0 for seconds in python_seconds.value.values())
+
+
+def test_seconds_accumulator_param() -> None:
+    param = load_metrics.SecondsAccumulatorParam()
+
+    assert not param.zero({})
+    assert {"long": 3.5, "date": 0.25} == param.addInPlace({"long": 1.5, "date": 0.25}, {"long": 2.0})
+
+
+def test_job_group_metrics(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that the stage metrics are summed over the jobs of the job group.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture of a temporary directory to write to
+    """
+
+    spark_session.sparkContext.setJobGroup("test_job_group_metrics", "Test")
+    spark_session.range(10).write.parquet(str(tmp_path / "range"))
+    spark_session.sparkContext.setLocalProperty("spark.jobGroup.id", None)  # type: ignore[arg-type]
+
+    metrics = load_metrics.job_group_metrics(spark_session, "test_job_group_metrics")
+
+    assert 10 == metrics["rows_written"]
+    assert metrics["executor_run_seconds"] >= 0
+    assert 0 == load_metrics.job_group_metrics(spark_session, "unknown_job_group")["rows_written"]
+
+
+def test_run_summary() -> None:
+    """
+    Test that the run's totals skip the load groups without the metric.
+    """
+
+    load_group_metrics = [
+        {"load_ids": [1], "input_bytes": 10, "rows_read": 2, "python_seconds": None},
+        {"load_ids": [2, 3], "input_bytes": 20, "rows_read": 3, "python_seconds": None},
+    ]
+
+    summary = load_metrics.run_summary("ingest_incoming", load_group_metrics, {"write": 1.5})
+
+    assert load_group_metrics == summary["load_groups"]
+    assert 30 == summary["input_bytes"]
+    assert 5 == summary["rows_read"]
+    assert summary["python_seconds"] is None
+    assert summary["output_bytes"] is None
@@ -0,0 +1,744 @@
+"""
+Testing module for `load_pipeline.py`.
+"""
+
+from botocore.stub import Stubber
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import cast_accounting, load_metrics, load_pipeline, load_runner, partition_registry
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import Dict, List, Tuple
+import boto3
+import datetime
+import json
+import logging
+import pathlib
+import pytest
+import shutil
+
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik" / "EDW.SAMPLE"
+
+env_dict = {
+    "GLUE_DATABASE_INCOMING": "incoming",
+    "GLUE_DATABASE_SPRINGBOARD": "springboard",
+    "CSV_READER": "spark",
+}
+
+
+def glue_table(types: Tuple[str, str, str, str]) -> dict:
+    """
+    Table of 'EDW.SAMPLE', as returned by the Glue API, with the types of its columns.
+    """
+
+    return {
+        "Name": "cubic_ods_qlik__edw_sample",
+        "StorageDescriptor": {
+            "Columns": [
+                {"Name": name, "Type": column_type}
+                for name, column_type in zip(["sample_id", "sample_name", "edw_inserted_dtm", "edw_updated_dtm"], types)
+            ]
+        },
+    }
+
+
+def sample_load(load_id: int, file_name: str, destination_path: str, table_suffix: str = "") -> dict:
+    """
+    Load of a sample file of 'EDW.SAMPLE', or of 'EDW.SAMPLE__ct' with the '__ct' suffix.
+    """
+
+    source_path = sample_path.parent / f"EDW.SAMPLE{table_suffix}" / file_name
+
+    return {
+        "id": load_id,
+        "s3_size": source_path.stat().st_size,
+        "source_table_name": f"cubic_ods_qlik__edw_sample{table_suffix}",
+        "source_s3_key": str(source_path),
+        "destination_table_name": f"cubic_ods_qlik__edw_sample{table_suffix}",
+        "destination_path": destination_path,
+        "partition_columns": [
+            {"name": "snapshot", "value": "20211201T000000Z"},
+            {"name": "identifier", "value": file_name},
+        ],
+    }
+
+
+@pytest.mark.parametrize("group_loads", ["false", "true"])
+def test_run(
+    spark_session: SparkSessionType,
+    glue_client_stubber: Tuple[GlueClient, Stubber],
+    tmp_path: pathlib.Path,
+    group_loads: str,
+) -> None:
+    """
+    Test that the loads are read from CSV, cast with the Springboard schema, and written as Parquet.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    group_loads : str
+        Whether the loads are written together
+    """
+
+    glue_client, stubber = glue_client_stubber
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("bigint", "string", "timestamp", "timestamp"))]},
+        {"DatabaseName": "springboard", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("string", "string", "string", "string"))]},
+        {"DatabaseName": "incoming", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    loads = [
+        {**sample_load(load_id, file_name, destination_path), "cluster_columns": ["SAMPLE_ID"]}
+        for load_id, file_name in [(1, "LOAD1.csv.gz"), (2, "LOAD2.csv.gz")]
+    ]
+
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        {
+            **env_dict,
+            "GROUP_LOADS": group_loads,
+            "PYTHON_WORKER_TIMING": "true",
+            "CAST_ACCOUNTING": "true",
+            "METRICS_URI": str(tmp_path / "metrics"),
+            "WRITER_PROFILE": "gzip",
+        },
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+    summary = pipeline.run(loads, "ingest_incoming", "jr_1")
+
+    rows = spark_session.read.parquet(destination_path).orderBy("sample_id").collect()
+
+    assert [1, 2, 3] == [row.sample_id for row in rows]
+    assert ["LOAD1.csv.gz", "LOAD1.csv.gz", "LOAD2.csv.gz"] == [row.identifier for row in rows]
+    assert datetime.datetime(2021, 12, 1, 11, 21, 30, 444444) == rows[2].edw_inserted_dtm
+
+    # metrics of the run, and of each load group
+    assert {"schemas", "schema", "read", "cast", "layout", "write", "accounting"} == set(pipeline.stage_seconds)
+    assert (1 if group_loads == "true" else 2) == len(summary["load_groups"])
+    assert sum(load["s3_size"] for load in loads) == summary["input_bytes"]
+    assert 3 == summary["rows_read"]
+    assert 3 == summary["rows_written"]
+    assert summary["output_file_count"] >= 2
+    assert summary["output_bytes"] > 0
+    assert summary["python_seconds"] > 0
+    assert 3 == sum(metrics["record_count"] for metrics in summary["load_groups"])
+    assert not any(metrics["rejected"] or metrics["cast_failures"] for metrics in summary["load_groups"])
+    assert {"gzip"} == {metrics["writer_profile"] for metrics in summary["load_groups"]}
+    assert all(path.name.endswith(".gz.parquet") for path in pathlib.Path(destination_path).glob("**/*.parquet"))
+    assert summary == json.loads((tmp_path / "metrics" / "jr_1.json").read_text())
+
+
+def test_run_file_plan(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that a load is written to the planned number of files, from its size.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("bigint", "string", "timestamp", "timestamp"))]},
+        {"DatabaseName": "springboard", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("string", "string", "string", "string"))]},
+        {"DatabaseName": "incoming", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    load = sample_load(1, "LOAD1.csv.gz", destination_path)
+
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        # 2 files for the 2 rows of the load
+        {**env_dict, "TARGET_FILE_SIZE_BYTES": str(load["s3_size"] // 2 + 1)},
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+    summary = pipeline.run([load])
+
+    assert 2 == summary["output_file_count"]
+    assert 2 == spark_session.read.parquet(destination_path).count()
+
+
+def test_run_rejected(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that with cast accounting, a load with values that can't be cast is rejected, and removed
+    from Springboard, instead of failing on the first value.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("bigint", "bigint", "timestamp", "timestamp"))]},
+        {"DatabaseName": "springboard", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("string", "string", "string", "string"))]},
+        {"DatabaseName": "incoming", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        {**env_dict, "CAST_ACCOUNTING": "true", "CAST_FAILURE_LIMIT": "1"},
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+
+    with pytest.raises(cast_accounting.LoadRejectedError) as exc_info:
+        pipeline.run([sample_load(1, "LOAD1.csv.gz", destination_path)])
+
+    assert [1] == exc_info.value.load_ids
+    assert "sample_name (2, such as ['Sample 1 🔥', 'Sample 2'])" in exc_info.value.reasons[0]
+    assert {"sample_name": {"count": 2, "samples": ["Sample 1 🔥", "Sample 2"]}} == pipeline.load_group_metrics[0][
+        "cast_failures"
+    ]
+    assert 2 == pipeline.load_group_metrics[0]["record_count"]
+    assert not (
+        tmp_path / "springboard" / "EDW.SAMPLE" / "snapshot=20211201T000000Z" / "identifier=LOAD1.csv.gz"
+    ).exists()
+
+
+def test_run_dmap_cast_accounting(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that with cast accounting, the rows of DMAP loads, which don't have '.dfm' files, aren't
+    reconciled.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    for database_name, column_type in [("springboard", "bigint"), ("incoming", "string")]:
+        stubber.add_response(
+            "get_tables",
+            {
+                "TableList": [
+                    {
+                        "Name": "cubic_dmap__agg_sample",
+                        "StorageDescriptor": {
+                            "Columns": [
+                                {"Name": "sample_id", "Type": column_type},
+                                {"Name": "sample_name", "Type": "string"},
+                                {"Name": "sample_count", "Type": column_type},
+                            ]
+                        },
+                    }
+                ]
+            },
+            {"DatabaseName": database_name, "Expression": "cubic_dmap__agg_sample"},
+        )
+
+    source_path = sample_path.parents[1] / "dmap" / "agg_sample" / "agg_sample_20220517.csv.gz"
+    destination_path = str(tmp_path / "springboard" / "agg_sample")
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        {**env_dict, "CAST_ACCOUNTING": "true"},
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+    pipeline.run(
+        [
+            {
+                "id": 1,
+                "s3_size": source_path.stat().st_size,
+                "source_table_name": "cubic_dmap__agg_sample",
+                "source_s3_key": str(source_path),
+                "destination_table_name": "cubic_dmap__agg_sample",
+                "destination_path": destination_path,
+                "partition_columns": [{"name": "identifier", "value": source_path.name}],
+            }
+        ]
+    )
+
+    assert [(None, False)] == [
+        (metrics["record_count"], metrics["rejected"]) for metrics in pipeline.load_group_metrics
+    ]
+    assert 2 == spark_session.read.parquet(destination_path).count()
+
+
+def test_run_load_concurrency(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that the load groups run concurrently each get the stage metrics of their own jobs.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("bigint", "string", "timestamp", "timestamp"))]},
+        {"DatabaseName": "springboard", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("string", "string", "string", "string"))]},
+        {"DatabaseName": "incoming", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    # the loads each write to their own table, so that their writes don't overlap
+    loads = [
+        sample_load(load_id, file_name, f"{destination_path}_{load_id}")
+        for load_id, file_name in [(1, "LOAD1.csv.gz"), (2, "LOAD2.csv.gz")]
+    ]
+
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        {**env_dict, "LOAD_CONCURRENCY": "2"},
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+    summary = pipeline.run(loads)
+
+    assert load_runner.pinned_threads(spark_session.sparkContext)
+    # LOAD1 has 2 rows and LOAD2 has 1
+    assert {(1,): (2, 2), (2,): (1, 1)} == {
+        tuple(metrics["load_ids"]): (metrics["rows_read"], metrics["rows_written"])
+        for metrics in summary["load_groups"]
+    }
+
+
+def test_run_ct_compaction(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that change tracking loads are merged into the compacted table of their snapshot, with the
+    types of the loads' '.dfm' files, once the tables are migrated to them, and that the partitions
+    of the compacted table are registered along with the loads'.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    tables_by_database: Dict[str, List[dict]] = {}
+    for database_name, types in [
+        ("springboard", ("int", "string", "timestamp", "timestamp")),
+        ("incoming", ("string", "string", "string", "string")),
+    ]:
+        table = glue_table(types)
+        headers = [
+            {"Name": "header__change_seq", "Type": "string"},
+            {"Name": "header__change_oper", "Type": "string"},
+            {"Name": "header__timestamp", "Type": types[2]},
+        ]
+        ct_table = {
+            "Name": "cubic_ods_qlik__edw_sample__ct",
+            "StorageDescriptor": {"Columns": headers + table["StorageDescriptor"]["Columns"]},
+        }
+        tables_by_database[database_name] = [table, ct_table]
+        stubber.add_response(
+            "get_tables",
+            {"TableList": [table, ct_table]},
+            {"DatabaseName": database_name, "Expression": "cubic_ods_qlik__edw_sample|cubic_ods_qlik__edw_sample__ct"},
+        )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    loads = [sample_load(1, "LOAD1.csv.gz", destination_path), sample_load(2, "LOAD2.csv.gz", destination_path)]
+    ct_loads = [
+        sample_load(3, "20211201-112233444.csv.gz", f"{destination_path}__ct", "__ct"),
+        sample_load(4, "20211201-122433444.csv.gz", f"{destination_path}__ct", "__ct"),
+    ]
+
+    # the partitions of the loads, and then the key buckets of the compacted table, are registered
+    compacted_table: dict = {
+        "Name": "cubic_ods_qlik__edw_sample__compacted",
+        "StorageDescriptor": {"Columns": tables_by_database["springboard"][0]["StorageDescriptor"]["Columns"]},
+    }
+    for table, table_loads in zip(tables_by_database["springboard"], [loads, ct_loads]):
+        stubber.add_response(
+            "batch_create_partition",
+            {},
+            {
+                "DatabaseName": "springboard",
+                "TableName": table["Name"],
+                "PartitionInputList": [
+                    {
+                        "Values": ["20211201T000000Z", load["partition_columns"][1]["value"]],
+                        "StorageDescriptor": {
+                            **table["StorageDescriptor"],
+                            "Location": f"{load['destination_path']}/snapshot=20211201T000000Z/"
+                            f"identifier={load['partition_columns'][1]['value']}",
+                        },
+                    }
+                    for load in table_loads
+                ],
+            },
+        )
+    stubber.add_response(
+        "get_table",
+        {"Table": compacted_table},
+        {"DatabaseName": "springboard", "Name": "cubic_ods_qlik__edw_sample__compacted"},
+    )
+    stubber.add_response(
+        "batch_create_partition",
+        {},
+        {
+            "DatabaseName": "springboard",
+            "TableName": "cubic_ods_qlik__edw_sample__compacted",
+            "PartitionInputList": [
+                {
+                    "Values": ["20211201T000000Z", str(bucket)],
+                    "StorageDescriptor": {
+                        **compacted_table["StorageDescriptor"],
+                        "Location": f"{destination_path}__compacted/snapshot=20211201T000000Z/key_bucket={bucket}",
+                    },
+                }
+                for bucket in range(4)
+            ],
+        },
+    )
+
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        {
+            **env_dict,
+            "GROUP_LOADS": "true",
+            "CT_COMPACTION": "true",
+            "CT_COMPACTION_BUCKETS": "4",
+            "DFM_TYPES": "true",
+            "REGISTER_PARTITIONS": "true",
+        },
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+    summary = pipeline.run(loads + ct_loads)
+
+    rows = spark_session.read.parquet(f"{destination_path}__compacted").orderBy("sample_id").collect()
+
+    assert [1, 2, 3, 4, 5] == [row.sample_id for row in rows]
+    assert "Sample 2 🔥🔥" == rows[1].sample_name
+    assert {"20211201T000000Z"} == {row.snapshot for row in rows}
+    assert "compact" in pipeline.stage_seconds
+    # with the types of the '.dfm' files
+    assert "int" == dict(spark_session.read.parquet(f"{destination_path}__compacted").dtypes)["sample_id"]
+    assert {
+        **{str(load_id): {"status": "created"} for load_id in range(1, 5)},
+        **{
+            f"cubic_ods_qlik__edw_sample__compacted/snapshot=20211201T000000Z/key_bucket={bucket}": {
+                "status": "created"
+            }
+            for bucket in range(4)
+        },
+    } == summary["partitions"]
+
+
+def test_run_dfm_types_not_migrated(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that with DFM_TYPES, the loads of a table that doesn't have the types of the '.dfm' files
+    fail, without writing files that the catalog doesn't describe.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    for database_name, types in [
+        ("springboard", ("bigint", "string", "timestamp", "timestamp")),
+        ("incoming", ("string", "string", "string", "string")),
+    ]:
+        stubber.add_response(
+            "get_tables",
+            {"TableList": [glue_table(types)]},
+            {"DatabaseName": database_name, "Expression": "cubic_ods_qlik__edw_sample"},
+        )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session, {**env_dict, "DFM_TYPES": "true"}, glue_client, boto3.client("s3", region_name="us-east-1")
+    )
+
+    with pytest.raises(ValueError, match=r"Columns \['sample_id'\] of cubic_ods_qlik__edw_sample .* migrated first"):
+        pipeline.run([sample_load(1, "LOAD1.csv.gz", destination_path)])
+
+    assert not (tmp_path / "springboard").exists()
+
+
+def test_run_profile(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that in the 'profile' job mode, the loads of a table are profiled together, and not written.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    for database_name in ["springboard", "incoming"]:
+        stubber.add_response(
+            "get_tables",
+            {"TableList": [glue_table(("string", "string", "string", "string"))]},
+            {"DatabaseName": database_name, "Expression": "cubic_ods_qlik__edw_sample"},
+        )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        {**env_dict, "JOB_MODE": "profile", "PROFILE_URI": str(tmp_path / "profiles")},
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+    summary = pipeline.run(
+        [sample_load(1, "LOAD1.csv.gz", destination_path), sample_load(2, "LOAD2.csv.gz", destination_path)]
+    )
+
+    assert 1 == len(summary["profiles"])
+    assert [1, 2] == summary["profiles"][0]["load_ids"]
+    assert 3 == summary["profiles"][0]["row_count"]
+    assert ["bigint", "string", "timestamp", "timestamp"] == [
+        column["Type"] for column in summary["profiles"][0]["columns"]
+    ]
+    assert summary["profiles"][0] == json.loads((tmp_path / "profiles" / "cubic_ods_qlik__edw_sample.json").read_text())
+    assert not (tmp_path / "springboard").exists()
+
+
+def test_run_manifests(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that a run again skips the loads written by an earlier attempt, unless their source
+    changed since.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    loads = []
+    for load_id, file_name in [(1, "LOAD1.csv.gz"), (2, "LOAD2.csv.gz")]:
+        shutil.copy(sample_path / file_name, tmp_path)
+        loads.append({**sample_load(load_id, file_name, destination_path), "source_s3_key": str(tmp_path / file_name)})
+
+    def run() -> dict:
+        pipeline = load_pipeline.LoadPipeline(
+            spark_session,
+            {**env_dict, "MANIFEST_URI": str(tmp_path / "manifests")},
+            glue_client,
+            boto3.client("s3", region_name="us-east-1"),
+        )
+
+        return pipeline.run(loads)
+
+    for _ in range(2):
+        stubber.add_response(
+            "get_tables",
+            {"TableList": [glue_table(("bigint", "string", "timestamp", "timestamp"))]},
+            {"DatabaseName": "springboard", "Expression": "cubic_ods_qlik__edw_sample"},
+        )
+        stubber.add_response(
+            "get_tables",
+            {"TableList": [glue_table(("string", "string", "string", "string"))]},
+            {"DatabaseName": "incoming", "Expression": "cubic_ods_qlik__edw_sample"},
+        )
+
+    summary = run()
+
+    assert [] == summary["skipped_load_ids"]
+    assert {"fingerprint", "load_id", "output_files", "rows_written"} == set(
+        json.loads((tmp_path / "manifests" / "1.json").read_text())
+    )
+    assert [2, 1] == [
+        json.loads((tmp_path / "manifests" / f"{load_id}.json").read_text())["rows_written"] for load_id in [1, 2]
+    ]
+
+    # without any Glue calls, as all the loads are skipped
+    summary = run()
+
+    assert [1, 2] == summary["skipped_load_ids"]
+    assert [] == summary["load_groups"]
+
+    (tmp_path / "LOAD2.csv.gz").touch()
+    summary = run()
+
+    assert [1] == summary["skipped_load_ids"]
+    assert [[2]] == [metrics["load_ids"] for metrics in summary["load_groups"]]
+    assert 3 == spark_session.read.parquet(destination_path).count()
+
+
+def test_run_register_partitions(
+    spark_session: SparkSessionType,
+    glue_client_stubber: Tuple[GlueClient, Stubber],
+    tmp_path: pathlib.Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """
+    Test that the partitions of the loads are registered with one call for their table, and that
+    the run fails once its summary, logged and written, has the result of each load.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    caplog : pytest.LogCaptureFixture
+        Fixture with the logged records
+    """
+
+    caplog.set_level(logging.INFO)
+
+    glue_client, stubber = glue_client_stubber
+    destination_table = glue_table(("bigint", "string", "timestamp", "timestamp"))
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [destination_table]},
+        {"DatabaseName": "springboard", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+    stubber.add_response(
+        "get_tables",
+        {"TableList": [glue_table(("string", "string", "string", "string"))]},
+        {"DatabaseName": "incoming", "Expression": "cubic_ods_qlik__edw_sample"},
+    )
+
+    destination_path = str(tmp_path / "springboard" / "EDW.SAMPLE")
+    loads = [
+        sample_load(load_id, file_name, destination_path)
+        for load_id, file_name in [(1, "LOAD1.csv.gz"), (2, "LOAD2.csv.gz")]
+    ]
+    stubber.add_response(
+        "batch_create_partition",
+        {
+            "Errors": [
+                {
+                    "PartitionValues": ["20211201T000000Z", "LOAD2.csv.gz"],
+                    "ErrorDetail": {"ErrorCode": "InternalServiceException", "ErrorMessage": "Try again."},
+                }
+            ]
+        },
+        {
+            "DatabaseName": "springboard",
+            "TableName": "cubic_ods_qlik__edw_sample",
+            "PartitionInputList": [
+                {
+                    "Values": ["20211201T000000Z", file_name],
+                    "StorageDescriptor": {
+                        **destination_table["StorageDescriptor"],
+                        "Location": f"{destination_path}/snapshot=20211201T000000Z/identifier={file_name}",
+                    },
+                }
+                for file_name in ["LOAD1.csv.gz", "LOAD2.csv.gz"]
+            ],
+        },
+    )
+
+    pipeline = load_pipeline.LoadPipeline(
+        spark_session,
+        {**env_dict, "REGISTER_PARTITIONS": "true", "METRICS_URI": str(tmp_path / "metrics")},
+        glue_client,
+        boto3.client("s3", region_name="us-east-1"),
+    )
+
+    with pytest.raises(partition_registry.PartitionRegistrationError):
+        pipeline.run(loads, "ingest_incoming", "jr_1")
+
+    partition_results = {
+        "1": {"status": "created"},
+        "2": {"status": "failed", "error": "InternalServiceException: Try again."},
+    }
+    assert partition_results == json.loads((tmp_path / "metrics" / "jr_1.json").read_text())["partitions"]
+    [logged_summary] = [
+        json.loads(record.getMessage()[len(load_metrics.log_prefix) :])
+        for record in caplog.records
+        if record.getMessage().startswith(load_metrics.log_prefix) and '"job_name"' in record.getMessage()
+    ]
+    assert partition_results == logged_summary["partitions"]
+    assert "partitions" in pipeline.stage_seconds
+
+
+def test_dynamic_frame_reader(glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that the 'dynamic_frame' CSV reader needs a function to read DynamicFrames.
+    """
+
+    glue_client, _ = glue_client_stubber
+
+    with pytest.raises(ValueError):
+        load_pipeline.LoadPipeline(
+            None,  # type: ignore[arg-type]
+            {**env_dict, "CSV_READER": "dynamic_frame"},
+            glue_client,
+            boto3.client("s3", region_name="us-east-1"),
+        )
@@ -0,0 +1,60 @@
+"""
+Testing module for `load_runner.py`.
+"""
+
+from py_cubic_ingestion import load_runner
+from pyspark.sql.session import SparkSession as SparkSessionType
+import threading
+import pytest
+
+
+def test_run_loads(spark_session: SparkSessionType) -> None:
+    """
+    Test that the loads run concurrently, each with its own scheduler pool.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+    loads = [{"id": load_id} for load_id in range(1, 4)]
+    # all the loads have to be running at the same time to get past the barrier
+    barrier = threading.Barrier(len(loads), timeout=60)
+    pools = {}
+
+    def run(load: dict) -> None:
+        barrier.wait()
+        pools[load["id"]] = spark_session.sparkContext.getLocalProperty("spark.scheduler.pool")
+        assert 10 == spark_session.range(10).count()
+
+    results = load_runner.run_loads(spark_session.sparkContext, loads, run, len(loads))
+
+    assert loads == [result.load for result in results]
+    assert [None, None, None] == [result.error for result in results]
+    assert {1: "load_1", 2: "load_2", 3: "load_3"} == pools
+
+
+def test_run_loads_failure(spark_session: SparkSessionType) -> None:
+    """
+    Test that a failing load doesn't stop the other loads, and is reported once they have run.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+    loads = [{"id": load_id} for load_id in range(1, 5)]
+    ran_load_ids = []
+
+    def run(load: dict) -> None:
+        if load["id"] == 2:
+            raise ValueError("bad load")
+
+        ran_load_ids.append(load["id"])
+
+    with pytest.raises(load_runner.LoadsFailedError, match="1 load\\(s\\) failed: 2") as excinfo:
+        load_runner.run_loads(spark_session.sparkContext, loads, run, 2)
+
+    assert [1, 3, 4] == sorted(ran_load_ids)
+    assert [{"id": 2}] == [result.load for result in excinfo.value.failed_results]
+    assert isinstance(excinfo.value.failed_results[0].error, ValueError)
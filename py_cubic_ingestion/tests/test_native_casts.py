@@ -0,0 +1,114 @@
+"""
+Tests for the Spark SQL versions of our custom UDFs
+"""
+
+from decimal import Decimal
+from py_cubic_ingestion import custom_udfs, native_casts
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import Any, Callable, List, Optional
+import pytest
+
+
+def cast_values(spark_session: SparkSessionType, cast: Callable[[str], Any], values: List[Optional[str]]) -> List[Any]:
+    """
+    Cast a list of string values with one of the `native_casts` functions.
+    """
+
+    df = spark_session.createDataFrame([(value,) for value in values], "value string")
+
+    return [row.value for row in df.select(cast("value").alias("value")).collect()]
+
+
+def test_as_long(spark_session: SparkSessionType) -> None:
+    values = ["-9223372036854775808", "9223372036854775807", " 123 ", "+1", "", " ", None]
+
+    assert [custom_udfs.as_long(value) for value in values] == cast_values(spark_session, native_casts.as_long, values)
+
+    # over the limit, and parsing errors
+    for value in ["9223372036854775808", "1.5", "123_error"]:
+        with pytest.raises(Exception, match=f"'{value}'"):
+            cast_values(spark_session, native_casts.as_long, ["1", value])
+
+
+def test_as_double(spark_session: SparkSessionType) -> None:
+    values = ["-123.45", "123.45", "1e3", ".5", " 2. ", "inf", "-Infinity", "", None]
+
+    assert [custom_udfs.as_double(value) for value in values] == cast_values(
+        spark_session, native_casts.as_double, values
+    )
+
+    # parsing errors
+    for value in ["123_error", "1.5d"]:
+        with pytest.raises(Exception, match=f"'{value}'"):
+            cast_values(spark_session, native_casts.as_double, ["1.0", value])
+
+
+def test_as_date(spark_session: SparkSessionType) -> None:
+    values = [
+        "2022",
+        "2022-01",
+        "2022-01-01",
+        "20220102",
+        "2022-01-03 23:34:56",
+        "2022-01-03T23:34:56.1234567",
+        "2022-01-03 23:34:56-04:00",
+        "2022-01-01 24:00:00",
+        "9999-12-31",
+        "",
+        None,
+    ]
+
+    assert [custom_udfs.as_date(value) for value in values] == cast_values(spark_session, native_casts.as_date, values)
+
+    # parsing errors, including layouts that aren't supported
+    for value in ["2022-02-30", "202201", "2022-W01", "0000-01-01"]:
+        with pytest.raises(Exception, match=f"'{value}'"):
+            cast_values(spark_session, native_casts.as_date, ["2022-01-01", value])
+
+
+def test_as_timestamp(spark_session: SparkSessionType) -> None:
+    values = [
+        "2022-01-01 12:34:56",
+        "2022-01-01T12:34:56",
+        "2022-01-01T1234",
+        "2022-01-01T12",
+        "2021-12-01 11:20:30.4444444",
+        "2022-01-01 12:34:56,5",
+        "2022-01-01 12:34:56-04:00",
+        "2022-01-01 12:34:56+0130",
+        "2022-01-01 12:34:56Z",
+        "2022-01-01 24:00",
+        "20220102 12:34:56",
+        "20220102T123456",
+        "2022-01-03",
+        "9999-12-31 23:59:59",
+        "",
+        None,
+    ]
+
+    assert [custom_udfs.as_timestamp(value) for value in values] == cast_values(
+        spark_session, native_casts.as_timestamp, values
+    )
+
+    # parsing errors, including layouts that aren't supported
+    for value in ["2022-01-01 25:00:00", "2022-01-01 12:34:60", "2022-01-01T12:3456", " 2022-01-01", "invalid"]:
+        with pytest.raises(Exception, match=f"'{value}'"):
+            cast_values(spark_session, native_casts.as_timestamp, ["2022-01-01 12:34:56", value])
+
+
+def test_precise_cast(spark_session: SparkSessionType) -> None:
+    cast_integer = native_casts.precise_cast("integer")
+    cast_decimal = native_casts.precise_cast("decimal(5,2)")
+    assert cast_integer is not None
+    assert cast_decimal is not None
+
+    assert [2147483647, -128, None] == cast_values(spark_session, cast_integer, ["2147483647", " -128 ", ""])
+    assert [Decimal("123.45"), Decimal("-0.50"), Decimal("1.24"), None] == cast_values(
+        spark_session, cast_decimal, ["123.45", "-.5", "1.235", " "]
+    )
+    assert native_casts.precise_cast("long") is None
+
+    # out of range, and parsing errors
+    for cast, value in [(cast_integer, "2147483648"), (cast_integer, "1.5"), (cast_decimal, "1234.5")]:
+        with pytest.raises(Exception, match=f"'{value}'"):
+            cast_values(spark_session, cast, ["1", value])
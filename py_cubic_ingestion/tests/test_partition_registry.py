@@ -0,0 +1,132 @@
+"""
+Testing module for `partition_registry.py`.
+"""
+
+from botocore.stub import Stubber
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import partition_registry
+from typing import Tuple
+
+
+storage_descriptor = {
+    "Columns": [{"Name": "sample_id", "Type": "bigint"}],
+    "Location": "s3://springboard/cubic/ods_qlik/EDW.SAMPLE",
+    "InputFormat": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+}
+
+
+def sample_load(load_id: int, file_name: str) -> dict:
+    return {
+        "id": load_id,
+        "destination_table_name": "cubic_ods_qlik__edw_sample",
+        "destination_path": "s3a://springboard/cubic/ods_qlik/EDW.SAMPLE/",
+        "partition_columns": [
+            {"name": "snapshot", "value": "20211201T000000Z"},
+            {"name": "identifier", "value": file_name},
+        ],
+    }
+
+
+def test_partition_input() -> None:
+    assert {
+        "Values": ["20211201T000000Z", "LOAD1.csv.gz"],
+        "StorageDescriptor": {
+            **storage_descriptor,
+            "Location": "s3://springboard/cubic/ods_qlik/EDW.SAMPLE/snapshot=20211201T000000Z/identifier=LOAD1.csv.gz",
+        },
+    } == partition_registry.partition_input(storage_descriptor, sample_load(1, "LOAD1.csv.gz"))
+
+
+def test_register_partitions(glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that the partitions of the loads are created with one call, and that the ones that exist
+    already aren't failures.
+
+    Parameters
+    ----------
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    """
+
+    glue_client, stubber = glue_client_stubber
+    loads = [sample_load(load_id, f"LOAD{load_id}.csv.gz") for load_id in [1, 2, 3]]
+    stubber.add_response(
+        "batch_create_partition",
+        {
+            "Errors": [
+                {
+                    "PartitionValues": ["20211201T000000Z", "LOAD2.csv.gz"],
+                    "ErrorDetail": {"ErrorCode": "AlreadyExistsException", "ErrorMessage": "Partition already exists."},
+                },
+                {
+                    "PartitionValues": ["20211201T000000Z", "LOAD3.csv.gz"],
+                    "ErrorDetail": {"ErrorCode": "InternalServiceException", "ErrorMessage": "Try again."},
+                },
+            ]
+        },
+        {
+            "DatabaseName": "springboard",
+            "TableName": "cubic_ods_qlik__edw_sample",
+            "PartitionInputList": [partition_registry.partition_input(storage_descriptor, load) for load in loads],
+        },
+    )
+
+    results = partition_registry.register_partitions(glue_client, "springboard", storage_descriptor, loads)
+
+    assert {
+        "1": {"status": "created"},
+        "2": {"status": "exists"},
+        "3": {"status": "failed", "error": "InternalServiceException: Try again."},
+    } == results
+    assert ["3"] == partition_registry.PartitionRegistrationError(results).load_ids
+
+
+def test_register_partitions_batches(glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that the partitions are created in batches of the maximum size of a call.
+
+    Parameters
+    ----------
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    """
+
+    glue_client, stubber = glue_client_stubber
+    loads = [sample_load(load_id, f"LOAD{load_id}.csv.gz") for load_id in range(partition_registry.BATCH_SIZE + 1)]
+    for batch in [loads[: partition_registry.BATCH_SIZE], loads[partition_registry.BATCH_SIZE :]]:
+        stubber.add_response(
+            "batch_create_partition",
+            {},
+            {
+                "DatabaseName": "springboard",
+                "TableName": "cubic_ods_qlik__edw_sample",
+                "PartitionInputList": [partition_registry.partition_input(storage_descriptor, load) for load in batch],
+            },
+        )
+
+    results = partition_registry.register_partitions(glue_client, "springboard", storage_descriptor, loads)
+
+    assert len(loads) == len(results)
+    assert {"created"} == {result["status"] for result in results.values()}
+
+
+def test_register_partitions_batch_error(glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that a call that fails, such as when throttled, fails the loads of its batch only.
+
+    Parameters
+    ----------
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    """
+
+    glue_client, stubber = glue_client_stubber
+    loads = [sample_load(load_id, f"LOAD{load_id}.csv.gz") for load_id in range(partition_registry.BATCH_SIZE + 1)]
+    stubber.add_client_error("batch_create_partition", "ThrottlingException", "Rate exceeded.")
+    stubber.add_response("batch_create_partition", {})
+
+    results = partition_registry.register_partitions(glue_client, "springboard", storage_descriptor, loads)
+
+    assert {"status": "failed", "error": "ThrottlingException: Rate exceeded."} == results["0"]
+    assert {"failed"} == {results[str(load["id"])]["status"] for load in loads[: partition_registry.BATCH_SIZE]}
+    assert {"status": "created"} == results[str(partition_registry.BATCH_SIZE)]
@@ -0,0 +1,116 @@
+"""
+Testing module for `schema_cache.py`.
+"""
+
+from botocore.stub import Stubber
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import json_store, schema_cache
+from typing import Tuple
+import datetime
+import json
+import pathlib
+
+
+def glue_table(table_name: str, version_id: str = "1") -> dict:
+    """
+    Glue table, as returned by the Glue API.
+    """
+
+    return {
+        "Name": table_name,
+        "VersionId": version_id,
+        "UpdateTime": datetime.datetime(2022, 1, 1),
+        "StorageDescriptor": {
+            "Columns": [
+                {"Name": "id", "Type": "bigint"},
+                {"Name": "inserted", "Type": "timestamp"},
+            ]
+        },
+    }
+
+
+expected_schema_fields = [{"name": "id", "type": "long"}, {"name": "inserted", "type": "timestamp"}]
+
+
+def test_prefetch(glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that the schemas of all the tables are fetched with one batched call.
+    """
+    glue_client, stubber = glue_client_stubber
+    stubber.add_response(
+        "get_tables",
+        expected_params={"DatabaseName": "db", "Expression": "table_a|table_b"},
+        service_response={
+            "TableList": [glue_table("table_a"), glue_table("table_a__ct"), glue_table("table_b")],
+        },
+    )
+
+    cache = schema_cache.GlueSchemaCache(glue_client, "db")
+    cache.prefetch(["table_b", "table_a", "table_b"])
+
+    assert expected_schema_fields == cache.schema_fields("table_a")
+    assert expected_schema_fields == cache.schema_fields("table_b")
+    assert ["table_a", "table_b"] == sorted(cache.schema_fields_by_table)
+
+    # already cached
+    cache.prefetch(["table_a"])
+
+
+def test_schema_fields_not_prefetched(glue_client_stubber: Tuple[GlueClient, Stubber]) -> None:
+    """
+    Test that tables not returned by the batched call are fetched on their own.
+    """
+    glue_client, stubber = glue_client_stubber
+    stubber.add_response(
+        "get_tables",
+        expected_params={"DatabaseName": "db", "Expression": "table_a"},
+        service_response={"TableList": []},
+    )
+    stubber.add_response(
+        "get_table",
+        expected_params={"DatabaseName": "db", "Name": "table_a"},
+        service_response={"Table": glue_table("table_a")},
+    )
+
+    cache = schema_cache.GlueSchemaCache(glue_client, "db")
+    cache.prefetch(["table_a"])
+
+    assert expected_schema_fields == cache.schema_fields("table_a")
+    assert expected_schema_fields == cache.schema_fields("table_a")
+    assert glue_table("table_a")["StorageDescriptor"] == cache.storage_descriptor("table_a")
+
+
+def test_local_store(glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path) -> None:
+    """
+    Test that fresh schemas in the store don't need any API calls.
+    """
+    glue_client, stubber = glue_client_stubber
+    stubber.add_response(
+        "get_tables",
+        expected_params={"DatabaseName": "db", "Expression": "table_a"},
+        service_response={"TableList": [glue_table("table_a", "2")]},
+    )
+    store = json_store.store_from_uri(str(tmp_path))
+
+    schema_cache.GlueSchemaCache(glue_client, "db", store, 3600).prefetch(["table_a"])
+    stubber.assert_no_pending_responses()
+
+    entry = json.loads((tmp_path / "db" / "table_a.json").read_text())
+    assert "2" == entry["version"]
+    assert expected_schema_fields == entry["fields"]
+
+    cache = schema_cache.GlueSchemaCache(glue_client, "db", store, 3600)
+    cache.prefetch(["table_a"])
+
+    assert expected_schema_fields == cache.schema_fields("table_a")
+
+    # stale schemas are fetched again
+    stubber.add_response(
+        "get_tables",
+        expected_params={"DatabaseName": "db", "Expression": "table_a"},
+        service_response={"TableList": [glue_table("table_a", "3")]},
+    )
+
+    schema_cache.GlueSchemaCache(glue_client, "db", store, 0).prefetch(["table_a"])
+
+    assert "3" == json.loads((tmp_path / "db" / "table_a.json").read_text())["version"]
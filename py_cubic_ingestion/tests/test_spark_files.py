@@ -0,0 +1,51 @@
+"""
+Testing module for `spark_files.py`.
+"""
+
+from py_cubic_ingestion import spark_files
+from pyspark.sql.session import SparkSession as SparkSessionType
+import pathlib
+
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "ods_qlik"
+
+
+def test_read_dfm(spark_session: SparkSessionType) -> None:
+    """
+    Test reading the '.dfm' file of a load.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    """
+
+    assert str(sample_path / "EDW.SAMPLE" / "LOAD1.dfm") == spark_files.dfm_path(
+        str(sample_path / "EDW.SAMPLE" / "LOAD1.csv.gz")
+    )
+    dfm = spark_files.read_dfm(spark_session, str(sample_path / "EDW.SAMPLE" / "LOAD1.csv.gz"))
+
+    assert 2 == dfm["fileInfo"]["recordCount"]
+
+
+def test_written_row_count_and_delete_paths(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test counting the rows written to partitions, and deleting them.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    spark_session.range(5).selectExpr("id", "id % 2 AS part").write.partitionBy("part").parquet(str(tmp_path / "table"))
+    paths = [str(tmp_path / "table" / "part=0"), str(tmp_path / "table" / "part=1")]
+
+    assert 5 == spark_files.written_row_count(spark_session, paths)
+
+    spark_files.delete_paths(spark_session, paths[:1])
+
+    assert not (tmp_path / "table" / "part=0").exists()
+    assert (tmp_path / "table" / "part=1").exists()
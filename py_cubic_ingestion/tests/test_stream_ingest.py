@@ -0,0 +1,202 @@
+"""
+Testing module for `stream_ingest.py`.
+"""
+
+from botocore.stub import Stubber
+from mypy_boto3_glue.client import GlueClient
+from py_cubic_ingestion import job_helpers, partition_registry, schema_cache, stream_ingest
+from pyspark.sql.session import SparkSession as SparkSessionType
+from typing import Tuple
+import pathlib
+import pytest
+import shutil
+
+
+sample_path = pathlib.Path(__file__).parents[2] / "sample_data" / "cubic" / "dmap" / "agg_sample"
+
+source_fields = [{"name": name, "type": "string"} for name in ["sample_id", "sample_name", "sample_count"]]
+destination_fields = [
+    {"name": "sample_id", "type": "long"},
+    {"name": "sample_name", "type": "string"},
+    {"name": "sample_count", "type": "long"},
+]
+
+
+def test_start_stream(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that the files of the Incoming prefix are cast and written to the partitions of their
+    files, and that a restarted stream only processes the files it hasn't yet.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    # a local directory standing in for the table's Incoming prefix
+    incoming_path = tmp_path / "incoming" / "cubic" / "dmap" / "agg_sample"
+    incoming_path.mkdir(parents=True)
+    destination_path = tmp_path / "springboard" / "cubic" / "dmap" / "agg_sample"
+    table = {
+        "source_table_name": "cubic_dmap__agg_sample",
+        "destination_table_name": "cubic_dmap__agg_sample",
+        "source_path": str(incoming_path),
+        "destination_path": str(destination_path),
+        "writer_profile": "gzip",
+    }
+    env_dict = {"STREAM_CHECKPOINT_URI": str(tmp_path / "checkpoints")}
+
+    def run_stream() -> int:
+        query = stream_ingest.start_stream(spark_session, table, source_fields, destination_fields, env_dict)
+        query.awaitTermination()
+
+        return sum(progress["numInputRows"] for progress in query.recentProgress)
+
+    shutil.copy(sample_path / "agg_sample_20220517.csv.gz", incoming_path)
+
+    assert 2 == run_stream()
+
+    [first_file] = list((destination_path / "identifier=agg_sample_20220517.csv.gz").glob("*.parquet"))
+    first_modified = first_file.stat().st_mtime_ns
+
+    shutil.copy(sample_path / "agg_sample_20220518.csv.gz", incoming_path)
+
+    assert 2 == run_stream()
+    assert 0 == run_stream()
+
+    df = spark_session.read.parquet(str(destination_path))
+    rows = df.orderBy("sample_id").collect()
+
+    assert [("sample_id", "bigint"), ("sample_count", "bigint")] == [
+        (name, data_type) for name, data_type in df.dtypes if name in ["sample_id", "sample_count"]
+    ]
+    assert [
+        (1, "agg_sample_20220517.csv.gz"),
+        (2, "agg_sample_20220517.csv.gz"),
+        (3, "agg_sample_20220518.csv.gz"),
+        (4, "agg_sample_20220518.csv.gz"),
+    ] == [(row.sample_id, row.identifier) for row in rows]
+    assert first_file.name.endswith(".gz.parquet")
+    # the partition of the first file isn't written again
+    assert first_modified == first_file.stat().st_mtime_ns
+
+
+def test_start_stream_ods(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that ODS tables, partitioned by snapshot, can't be streamed.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    table = {
+        "source_table_name": "cubic_ods_qlik__edw_sample",
+        "destination_table_name": "cubic_ods_qlik__edw_sample",
+        "source_path": str(tmp_path / "incoming" / "cubic" / "ods_qlik" / "EDW.SAMPLE"),
+        "destination_path": str(tmp_path / "springboard" / "cubic" / "ods_qlik" / "EDW.SAMPLE"),
+    }
+
+    with pytest.raises(ValueError, match="can't be streamed"):
+        stream_ingest.start_stream(
+            spark_session, table, source_fields, destination_fields, {"STREAM_CHECKPOINT_URI": str(tmp_path)}
+        )
+
+
+def test_write_micro_batch(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that a micro-batch written again, as after a failure, replaces the rows of its files.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    df = stream_ingest.df_with_identifier(
+        job_helpers.df_from_csv(spark_session, str(sample_path / "agg_sample_20220517.csv.gz"), source_fields)
+    )
+
+    for _ in range(2):
+        stream_ingest.write_micro_batch(
+            df, destination_fields, {"destination_path": str(tmp_path / "agg_sample")}, {}, {}
+        )
+
+    assert (
+        2 == spark_session.read.parquet(str(tmp_path / "agg_sample" / "identifier=agg_sample_20220517.csv.gz")).count()
+    )
+
+
+def test_write_micro_batch_register_partitions(
+    spark_session: SparkSessionType, glue_client_stubber: Tuple[GlueClient, Stubber], tmp_path: pathlib.Path
+) -> None:
+    """
+    Test that the partitions of the files of a micro-batch are registered once they're written, and
+    that the micro-batch fails if any of them couldn't be.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    glue_client_stubber : tuple
+        Fixture with a stubbed Glue client
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    glue_client, stubber = glue_client_stubber
+    storage_descriptor = {"Columns": [{"Name": field["name"], "Type": "bigint"} for field in destination_fields]}
+    table = {"destination_table_name": "cubic_dmap__agg_sample", "destination_path": str(tmp_path / "agg_sample")}
+    df = stream_ingest.df_with_identifier(
+        job_helpers.df_from_csv(spark_session, str(sample_path / "agg_sample_2022051*.csv.gz"), source_fields)
+    )
+
+    stubber.add_response(
+        "get_table",
+        {"Table": {"Name": "cubic_dmap__agg_sample", "StorageDescriptor": storage_descriptor}},
+        {"DatabaseName": "springboard", "Name": "cubic_dmap__agg_sample"},
+    )
+    for errors in [
+        [],
+        [
+            {
+                "PartitionValues": ["agg_sample_20220518.csv.gz"],
+                "ErrorDetail": {"ErrorCode": "InternalServiceException", "ErrorMessage": "Try again."},
+            }
+        ],
+    ]:
+        stubber.add_response(
+            "batch_create_partition",
+            {"Errors": errors},
+            {
+                "DatabaseName": "springboard",
+                "TableName": "cubic_dmap__agg_sample",
+                "PartitionInputList": [
+                    {
+                        "Values": [file_name],
+                        "StorageDescriptor": {
+                            **storage_descriptor,
+                            "Location": f"{table['destination_path']}/identifier={file_name}",
+                        },
+                    }
+                    for file_name in ["agg_sample_20220517.csv.gz", "agg_sample_20220518.csv.gz"]
+                ],
+            },
+        )
+
+    destination_schemas = schema_cache.GlueSchemaCache(glue_client, "springboard")
+    stream_ingest.write_micro_batch(df, destination_fields, table, {}, {}, destination_schemas)
+
+    assert 4 == spark_session.read.parquet(table["destination_path"]).count()
+
+    with pytest.raises(partition_registry.PartitionRegistrationError):
+        stream_ingest.write_micro_batch(df, destination_fields, table, {}, {}, destination_schemas)
+
+    assert not df.is_cached
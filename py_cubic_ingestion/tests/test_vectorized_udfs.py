@@ -0,0 +1,93 @@
+"""
+Tests for the vectorized versions of our custom UDFs
+"""
+
+from py_cubic_ingestion import custom_udfs, vectorized_udfs
+import datetime
+import pandas as pd
+import pytest
+
+
+def test_blank_mask() -> None:
+    """
+    Checks that the same values as in the 'optional' path are NULL
+    """
+    values = pd.Series([None, "", "  ", "\t", "\n", "\v", "\f", "\r", "1"])
+
+    assert [True, True, True, True, True, True, True, True, False] == vectorized_udfs.blank_mask(values).tolist()
+
+
+def test_as_long() -> None:
+    values = pd.Series(["-9223372036854775808", "9223372036854775807", " 123 ", "+1", "1_000", "", None])
+
+    assert [custom_udfs.as_long(value) for value in values] == vectorized_udfs.as_long(values).tolist()
+
+    # over the limit
+    with pytest.raises(ValueError, match="'9223372036854775808'"):
+        vectorized_udfs.as_long(pd.Series(["1", "9223372036854775808"]))
+
+    # parsing error
+    with pytest.raises(ValueError, match="'invalid'"):
+        vectorized_udfs.as_long(pd.Series(["1", "invalid"]))
+
+
+def test_as_double() -> None:
+    values = pd.Series(["-123.45", "123.45", "1e3", ".5", " 2. ", "inf", None])
+
+    assert [custom_udfs.as_double(value) for value in values[:-1]] == vectorized_udfs.as_double(values).tolist()[:-1]
+    assert pd.isna(vectorized_udfs.as_double(values).iloc[-1])
+
+    # parsing error
+    with pytest.raises(ValueError, match="'invalid'"):
+        vectorized_udfs.as_double(pd.Series(["1.0", "invalid"]))
+
+
+def test_as_date() -> None:
+    values = pd.Series(
+        [
+            "2022-01-01",
+            "20220102",
+            "2022-01-03 23:34:56",
+            "2022-01-03T23:34:56.1234567",
+            "2022-01-03 23:34:56-04:00",
+            "2022-01-01 24:00:00",
+            "9999-12-31",
+            "",
+            None,
+        ]
+    )
+
+    assert [custom_udfs.as_date(value) for value in values] == vectorized_udfs.as_date(values).tolist()
+
+    # parsing error
+    with pytest.raises(ValueError, match="'2022-02-30'"):
+        vectorized_udfs.as_date(pd.Series(["2022-01-01", "2022-02-30"]))
+
+
+def test_as_timestamp() -> None:
+    values = pd.Series(
+        [
+            "2022-01-01 12:34:56",
+            "2022-01-01T12:34:56",
+            "2021-12-01 11:20:30.4444444",
+            "2022-01-01 12:34:56-04:00",
+            "20220102 12:34:56",
+            "2022-01-03",
+            "",
+            None,
+        ]
+    )
+    actual = vectorized_udfs.as_timestamp(values)
+
+    assert "datetime64[ns]" == str(actual.dtype)
+    assert [custom_udfs.as_timestamp(value) for value in values[:-2]] == actual.tolist()[:-2]
+    assert actual.iloc[-2:].isna().all()
+
+    # outside of pandas' range
+    assert [datetime.datetime(2022, 1, 1, 12, 34, 56), datetime.datetime(9999, 12, 31), None] == (
+        vectorized_udfs.as_timestamp(pd.Series(["2022-01-01 12:34:56", "9999-12-31 00:00:00", None])).tolist()
+    )
+
+    # parsing error
+    with pytest.raises(ValueError, match="'invalid'"):
+        vectorized_udfs.as_timestamp(pd.Series(["2022-01-01 12:34:56", "invalid"]))
@@ -0,0 +1,95 @@
+"""
+Testing module for `writer_profiles.py`.
+"""
+
+from py_cubic_ingestion import job_helpers, writer_profiles
+from pyspark.sql.session import SparkSession as SparkSessionType
+import pathlib
+import pyarrow.parquet
+import pytest
+
+
+def test_writer_options() -> None:
+    assert not writer_profiles.writer_options(writer_profiles.PROFILES["default"])
+    assert {
+        "compression": "zstd",
+        "parquet.enable.dictionary": "true",
+        "parquet.dictionary.page.size": "2097152",
+        "parquet.block.size": "268435456",
+        "parquet.page.size": "1048576",
+        "parquet.statistics.truncate.length": "64",
+        "parquet.enable.dictionary#sample_name": "false",
+    } == writer_profiles.writer_options(
+        {
+            "compression": "zstd",
+            "dictionary": True,
+            "dictionary_page_size_bytes": 2097152,
+            "row_group_size_bytes": 268435456,
+            "page_size_bytes": 1048576,
+            "statistics_truncate_length": 64,
+            "columns": {"sample_name": {"dictionary": False}},
+        }
+    )
+
+    with pytest.raises(ValueError, match="Unknown Parquet compression 'zip'"):
+        writer_profiles.writer_options({"compression": "zip"})
+
+    with pytest.raises(ValueError, match="Unknown writer setting 'block_size'"):
+        writer_profiles.writer_options({"block_size": 1024})
+
+    with pytest.raises(ValueError, match="Unknown writer setting 'statistics' of column 'sample_name'"):
+        writer_profiles.writer_options({"columns": {"sample_name": {"statistics": False}}})
+
+
+def test_profiles_from_json() -> None:
+    assert writer_profiles.PROFILES == writer_profiles.profiles_from_json(None)
+
+    profiles = writer_profiles.profiles_from_json('{"zstd": {"compression": "zstd", "page_size_bytes": 65536}}')
+
+    assert {"compression": "zstd", "page_size_bytes": 65536} == profiles["zstd"]
+    assert {"compression": "gzip"} == profiles["gzip"]
+
+    with pytest.raises(ValueError, match="Unknown Parquet compression"):
+        writer_profiles.profiles_from_json('{"zip": {"compression": "zip"}}')
+
+
+def test_profile_name() -> None:
+    assert "default" == writer_profiles.profile_name({"id": 1})
+    assert "zstd" == writer_profiles.profile_name({"id": 1}, "zstd")
+    assert "gzip" == writer_profiles.profile_name({"id": 1, "writer_profile": "gzip"}, "zstd")
+
+
+def test_write_with_profile(spark_session: SparkSessionType, tmp_path: pathlib.Path) -> None:
+    """
+    Test that the Parquet files are written with the settings of the profile.
+
+    Parameters
+    ----------
+    spark_session : list
+        Fixture that contains the Spark Session to use
+    tmp_path : pathlib.Path
+        Fixture with a temporary directory
+    """
+
+    df = spark_session.range(100000).selectExpr(
+        "id", "cast(id % 7 as string) as name", "cast(id % 5 as string) as code"
+    )
+
+    job_helpers.write_partitioned_parquet(
+        df.coalesce(1),
+        [],
+        str(tmp_path / "table"),
+        writer_options=writer_profiles.writer_options(
+            {"compression": "gzip", "row_group_size_bytes": 65536, "columns": {"name": {"dictionary": False}}}
+        ),
+    )
+
+    [path] = list((tmp_path / "table").glob("*.parquet"))
+    metadata = pyarrow.parquet.read_metadata(path)
+    columns = {column: metadata.row_group(0).column(column) for column in range(metadata.num_columns)}
+
+    assert path.name.endswith(".gz.parquet")
+    assert metadata.num_row_groups > 1
+    assert {"GZIP"} == {column.compression for column in columns.values()}
+    assert not columns[1].has_dictionary_page
+    assert columns[2].has_dictionary_page